@@ -1,15 +1,82 @@
 """Main entry point for the application."""
 
+import argparse
 import logging
+import multiprocessing
 import sys
 
-from src.main import FSEAPP
-from src.ui import FSEditor
-
 logger = logging.getLogger(__name__)
 
 
 def main():
+    # Worker pools use the spawn start method, which needs this in frozen builds.
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(prog="footstep-editor")
+    commands = parser.add_subparsers(dest="command")
+
+    serve_parser = commands.add_parser("serve", help="Run the headless render service")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--unix-socket", help="Listen on a Unix socket instead of TCP")
+    serve_parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    serve_parser.add_argument("--batch-size", type=int, default=8)
+    serve_parser.add_argument("--chunk-size", type=int, default=4)
+
+    atlas_parser = commands.add_parser("atlas", help="Export a sound atlas of the blend layout's materials")
+    atlas_parser.add_argument("output", help="Atlas file (.wav or .ogg)")
+    atlas_parser.add_argument("--seeds", type=int, default=8, help="Variations per blend position")
+    atlas_parser.add_argument("--steps", type=int, default=0, help="Also render a grid of N x N blends")
+    atlas_parser.add_argument("--index", choices=("json", "binary"), default="json")
+    atlas_parser.add_argument("--align", type=int, default=1024, help="Frame alignment of each variation")
+    atlas_parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        from src.service.server import serve
+
+        logging.basicConfig(level=logging.INFO)
+        serve(
+            host=args.host,
+            port=args.port,
+            unix_socket=args.unix_socket,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            chunk_size=args.chunk_size,
+        )
+        return
+
+    if args.command == "atlas":
+        from pathlib import Path
+
+        from src.core.analysis import build_index
+        from src.core.atlas import export_atlas, layout_items
+        from src.core.blend import default_layout
+        from src.core.render import Renderer
+        from src.core.sample_bank import SampleBank
+        from src.utils.cache import cache_dir
+
+        layout = default_layout()
+        bank = SampleBank()
+        bank.load(layout.materials)
+        # Gain-matched and onset-aligned like the editor's renders.
+        build_index(bank, cache_dir() / "analysis.json")
+        output = Path(args.output)
+        entries = export_atlas(
+            Renderer(bank, layout=layout),
+            layout_items(layout, args.seeds, args.steps),
+            output,
+            format=output.suffix.lstrip(".") or "wav",
+            index_format=args.index,
+            align=args.align,
+            workers=args.workers,
+        )
+        print(f"Wrote {len(entries)} variations to {output}")
+        return
+
+    from src.main import FSEAPP
+    from src.ui import FSEditor
+
     app = FSEAPP()
     window = FSEditor()
     sys.exit(app.exec())
@@ -0,0 +1,216 @@
+"""
+Asset analysis index.
+
+Stores, per asset, its RMS level, loudness, peak level and onset offset so
+the renderer can gain-match and align voices without analysing anything at
+trigger time.
+
+Loudness follows the ITU-R BS.1770 K-weighting, applied in the frequency
+domain, without gating (footstep clips are shorter than a gating block).
+Assets are analysed in vectorized batches across a process pool, and the
+index is cached on disk and only recomputed for assets whose content hash
+changed.
+"""
+
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.sample_bank import SampleBank
+
+
+ONSET_THRESHOLD_DB = -20.0
+"""Onset is where the envelope first reaches this level relative to its maximum."""
+ENVELOPE_MS = 1.0
+SILENCE_DB = -120.0
+
+_BATCH_SIZE = 16
+# Below this many stale assets, spawning a pool costs more than it saves.
+_POOL_THRESHOLD = 256
+
+
+@dataclass
+class AssetAnalysis:
+    rms_db: float
+    lufs: float
+    peak_db: float
+    onset_sec: float
+    signature: str = ""
+
+
+def _db(power: np.ndarray) -> np.ndarray:
+    return 10.0 * np.log10(np.maximum(power, 10.0 ** (SILENCE_DB / 10.0)))
+
+
+def _biquad_response(b: Tuple[float, ...], a: Tuple[float, ...], w: np.ndarray) -> np.ndarray:
+    z = np.exp(-1j * w)
+    return (b[0] + b[1] * z + b[2] * z * z) / (a[0] + a[1] * z + a[2] * z * z)
+
+
+def k_weighting_power(sample_rate: int, nfft: int) -> np.ndarray:
+    """Squared magnitude of the BS.1770 K-weighting filter at the rfft bins."""
+    w = 2.0 * np.pi * np.fft.rfftfreq(nfft)
+
+    # High shelf (head effects).
+    f0, gain, q = 1681.974450955533, 3.999843853973347, 0.7071752369554196
+    k = np.tan(np.pi * f0 / sample_rate)
+    vh = 10.0 ** (gain / 20.0)
+    vb = vh ** 0.4996667741545416
+    a0 = 1.0 + k / q + k * k
+    shelf = _biquad_response(
+        ((vh + vb * k / q + k * k) / a0, 2.0 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0),
+        (1.0, 2.0 * (k * k - 1.0) / a0, (1.0 - k / q + k * k) / a0),
+        w,
+    )
+
+    # High pass (RLB weighting).
+    f0, q = 38.13547087602444, 0.5003270373238773
+    k = np.tan(np.pi * f0 / sample_rate)
+    a0 = 1.0 + k / q + k * k
+    highpass = _biquad_response(
+        (1.0, -2.0, 1.0),
+        (1.0, 2.0 * (k * k - 1.0) / a0, (1.0 - k / q + k * k) / a0),
+        w,
+    )
+    return np.abs(shelf * highpass) ** 2
+
+
+def analyze_batch(batch: List[np.ndarray], sample_rate: int) -> List[AssetAnalysis]:
+    """Analyse several ``(frames, channels)`` assets at once."""
+    lengths = np.array([len(samples) for samples in batch])
+    channels = batch[0].shape[1]
+    frames = int(lengths.max())
+
+    stack = np.zeros((len(batch), frames, channels), dtype=np.float32)
+    for i, samples in enumerate(batch):
+        data = np.asarray(samples)
+        stack[i, :len(data)] = data / 32768.0 if data.dtype == np.int16 else data
+
+    peak_db = 20.0 * np.log10(np.maximum(np.abs(stack).max(axis=(1, 2)), 10.0 ** (SILENCE_DB / 20.0)))
+    rms_db = _db((stack ** 2).sum(axis=(1, 2)) / (lengths * channels))
+
+    # Loudness through Parseval: filtered energy from the spectrum, zero-padded against wrap-around.
+    nfft = 1 << int(np.ceil(np.log2(2 * frames)))
+    spectrum = np.abs(np.fft.rfft(stack, n=nfft, axis=1)) ** 2
+    spectrum *= k_weighting_power(sample_rate, nfft)[None, :, None]
+    bin_weight = np.full(spectrum.shape[1], 2.0)
+    bin_weight[0] = 1.0
+    if nfft % 2 == 0:
+        bin_weight[-1] = 1.0
+    energy = (spectrum * bin_weight[None, :, None]).sum(axis=1) / nfft
+    lufs = -0.691 + _db((energy / lengths[:, None]).sum(axis=1))
+
+    # Onset: first point where the short-term envelope reaches the threshold.
+    window = max(1, int(sample_rate * ENVELOPE_MS / 1000.0))
+    power = (stack ** 2).mean(axis=2)
+    cumulative = np.cumsum(np.pad(power, ((0, 0), (1, 0))), axis=1)
+    envelope = (cumulative[:, window:] - cumulative[:, :-window]) / window
+    threshold = envelope.max(axis=1, keepdims=True) * 10.0 ** (ONSET_THRESHOLD_DB / 10.0)
+    onset = np.argmax(envelope >= threshold, axis=1)
+
+    return [
+        AssetAnalysis(float(rms_db[i]), float(lufs[i]), float(peak_db[i]), float(onset[i] / sample_rate))
+        for i in range(len(batch))
+    ]
+
+
+class AnalysisIndex:
+    def __init__(self, entries: Optional[Dict[str, AssetAnalysis]] = None) -> None:
+        self._entries: Dict[str, AssetAnalysis] = entries or {}
+        self._reference: Optional[float] = None
+
+    @staticmethod
+    def key(material: str, idx: int) -> str:
+        return f"{material}/{idx}"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, material: str, idx: int) -> Optional[AssetAnalysis]:
+        return self._entries.get(self.key(material, idx))
+
+    def set(self, material: str, idx: int, analysis: AssetAnalysis) -> None:
+        self._entries[self.key(material, idx)] = analysis
+        self._reference = None
+
+    def subset(self, keys: Iterable[str]) -> "AnalysisIndex":
+        """The entries of ``keys`` only, as a new index."""
+        return AnalysisIndex({key: self._entries[key] for key in keys if key in self._entries})
+
+    def reference_lufs(self) -> float:
+        """Median loudness of the indexed assets, used as the gain-matching target."""
+        if self._reference is None:
+            values = [entry.lufs for entry in self._entries.values()]
+            self._reference = float(np.median(values)) if values else 0.0
+        return self._reference
+
+    def save(self, path: Path) -> None:
+        data = {key: asdict(entry) for key, entry in self._entries.items()}
+        Path(path).write_text(json.dumps(data, indent=1))
+
+    @classmethod
+    def load(cls, path: Path) -> "AnalysisIndex":
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        try:
+            data = json.loads(path.read_text())
+            return cls({key: AssetAnalysis(**entry) for key, entry in data.items()})
+        except (ValueError, TypeError):
+            return cls()
+
+
+def build_index(
+    bank: SampleBank,
+    cache_path: Optional[Path] = None,
+    workers: Optional[int] = None,
+) -> AnalysisIndex:
+    """Analyse every asset of ``bank`` not already up to date in the cache.
+
+    The cache keeps entries of assets the bank does not hold; the index
+    attached to the bank and returned has the bank's assets only, so the
+    gain-matching reference does not depend on what was analysed before.
+    """
+    index = AnalysisIndex.load(cache_path) if cache_path else AnalysisIndex()
+
+    stale: List[Tuple[str, int, str]] = []
+    current: List[str] = []
+    assets = bank.assets
+    for material in bank.materials:
+        for idx in range(1, bank.variations(material) + 1):
+            current.append(index.key(material, idx))
+            asset = assets.get(material, idx) if assets is not None else None
+            signature = asset.content_hash if asset is not None else ""
+            entry = index.get(material, idx)
+            if entry is None or entry.signature != signature or not signature:
+                stale.append((material, idx, signature))
+
+    if stale:
+        batches = [stale[i:i + _BATCH_SIZE] for i in range(0, len(stale), _BATCH_SIZE)]
+        arrays = [[np.asarray(bank.samples(m, i)) for m, i, _ in batch] for batch in batches]
+        rate = bank.format.sample_rate
+        workers = min(workers or os.cpu_count() or 1, len(batches))
+
+        if workers > 1 and len(stale) >= _POOL_THRESHOLD:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                results = list(pool.map(analyze_batch, arrays, [rate] * len(arrays)))
+        else:
+            results = [analyze_batch(batch, rate) for batch in arrays]
+
+        for batch, analyses in zip(batches, results):
+            for (material, idx, signature), analysis in zip(batch, analyses):
+                analysis.signature = signature
+                index.set(material, idx, analysis)
+
+        if cache_path:
+            index.save(cache_path)
+
+    bank.analysis = index.subset(current)
+    return bank.analysis
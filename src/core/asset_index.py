@@ -0,0 +1,239 @@
+"""
+Asset library index.
+
+Finds the footstep files under one or more library folders and records,
+per file, its material, variation number, duration, sample rate, channel
+count and content hash. The index is saved to disk; on startup only files
+whose size or modification time changed are probed again, so a library
+of thousands of files is ready after a pass of ``stat`` calls.
+
+A file's material is the folder it sits in (or, directly under a library
+root, the leading word of its name, as in ``Steps_wood-001.ogg``).
+Variations of a material are numbered from 1 in natural file name order.
+Probing (hashing and reading the header) runs on a thread pool; both
+release the GIL.
+
+Extra library folders are configured with the ``FOOTSTEP_ASSET_DIRS``
+environment variable, separated by ``os.pathsep``.
+"""
+
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import miniaudio
+
+
+AUDIO_EXTENSIONS = (".ogg", ".wav", ".flac", ".mp3")
+ASSET_DIRS_ENV = "FOOTSTEP_ASSET_DIRS"
+
+_INDEX_VERSION = 1
+_HASH_CHUNK = 1 << 20
+_MATERIAL_NAME = re.compile(r"^(?:Steps_)?([A-Za-z]+)")
+_NATURAL = re.compile(r"(\d+)")
+
+
+@dataclass
+class AssetEntry:
+    path: str
+    material: str
+    variation: int
+    duration_sec: float
+    sample_rate: int
+    channels: int
+    content_hash: str
+    size: int
+    mtime_ns: int
+
+
+def library_roots(default: Path) -> List[Path]:
+    """``default`` followed by the folders listed in ``FOOTSTEP_ASSET_DIRS``."""
+    extra = [Path(p) for p in os.environ.get(ASSET_DIRS_ENV, "").split(os.pathsep) if p]
+    return [Path(default), *extra]
+
+
+def content_hash(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        while chunk := file.read(_HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _natural_key(name: str) -> Tuple:
+    return tuple(int(part) if part.isdigit() else part.lower() for part in _NATURAL.split(name))
+
+
+def _walk(directory: Path) -> Iterator[os.DirEntry]:
+    """Audio files under ``directory``, without following links."""
+    stack = [directory]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(Path(entry.path))
+                    elif entry.name.lower().endswith(AUDIO_EXTENSIONS):
+                        yield entry
+        except OSError:
+            continue
+
+
+def _probe(path: str, stat: Tuple[int, int], material: str) -> Optional[AssetEntry]:
+    try:
+        info = miniaudio.get_file_info(path)
+        digest = content_hash(Path(path))
+    except (OSError, miniaudio.MiniaudioError) as e:
+        print(f"Skipping asset '{path}': {e}")
+        return None
+    return AssetEntry(
+        path=path,
+        material=material,
+        variation=0,
+        duration_sec=info.duration,
+        sample_rate=info.sample_rate,
+        channels=info.nchannels,
+        content_hash=digest,
+        size=stat[0],
+        mtime_ns=stat[1],
+    )
+
+
+class AssetIndex:
+    """The audio files of a set of library folders, grouped by material."""
+
+    def __init__(self, roots: Sequence[Path], entries: Optional[Iterable[AssetEntry]] = None) -> None:
+        self.roots = [Path(root).resolve() for root in roots]
+        self._entries: Dict[str, AssetEntry] = {entry.path: entry for entry in entries or ()}
+        self._by_material: Dict[str, List[AssetEntry]] = {}
+        self._number(set(entry.material for entry in self._entries.values()))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def materials(self) -> List[str]:
+        return sorted(self._by_material)
+
+    def variations(self, material: str) -> List[AssetEntry]:
+        """Entries of a material in variation order."""
+        return self._by_material.get(material, [])
+
+    def get(self, material: str, idx: int) -> Optional[AssetEntry]:
+        entries = self._by_material.get(material, [])
+        return entries[idx - 1] if 0 < idx <= len(entries) else None
+
+    def path(self, material: str, idx: int) -> Path:
+        entry = self.get(material, idx)
+        if entry is None:
+            raise KeyError(f"No variation {idx} of material '{material}'")
+        return Path(entry.path)
+
+    def material_of(self, path: Path) -> str:
+        if any(path.parent == root for root in self.roots):
+            match = _MATERIAL_NAME.match(path.stem)
+            return match.group(1).lower() if match else path.stem
+        return path.parent.name
+
+    def scan(self, workers: Optional[int] = None) -> Set[str]:
+        """Bring the index in line with the library folders; returns the materials that changed."""
+        changed = set()
+        for path in [p for p in self._entries if not _is_under(p, self.roots)]:
+            changed.add(self._entries.pop(path).material)
+        self._number(changed)
+        return changed | self.refresh(self.roots, workers)
+
+    def refresh(self, directories: Iterable[Path], workers: Optional[int] = None) -> Set[str]:
+        """Rescan the files under ``directories``; returns the materials that changed.
+
+        Only files that are new or whose size or modification time changed are
+        probed again.
+        """
+        directories = [Path(d).resolve() for d in directories]
+        found: Dict[str, Tuple[int, int]] = {}
+        for directory in directories:
+            for entry in _walk(directory):
+                stat = entry.stat()
+                found[entry.path] = (stat.st_size, stat.st_mtime_ns)
+
+        changed: Set[str] = set()
+        for path in [p for p in self._entries if _is_under(p, directories) and p not in found]:
+            changed.add(self._entries.pop(path).material)
+
+        stale = [
+            (path, stat)
+            for path, stat in found.items()
+            if path not in self._entries
+            or (self._entries[path].size, self._entries[path].mtime_ns) != stat
+        ]
+        if stale:
+            materials = [self.material_of(Path(path)) for path, _ in stale]
+            with ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) + 4)) as pool:
+                probed = list(pool.map(_probe, [p for p, _ in stale], [s for _, s in stale], materials))
+            for (path, _), entry in zip(stale, probed):
+                old = self._entries.pop(path, None)
+                if old is not None:
+                    changed.add(old.material)
+                if entry is not None:
+                    self._entries[path] = entry
+                    changed.add(entry.material)
+
+        self._number(changed)
+        return changed
+
+    def _number(self, materials: Set[str]) -> None:
+        """Number the variations of ``materials`` in natural file name order."""
+        groups: Dict[str, List[AssetEntry]] = {material: [] for material in materials}
+        for entry in self._entries.values():
+            if entry.material in groups:
+                groups[entry.material].append(entry)
+        for material, entries in groups.items():
+            entries.sort(key=lambda entry: _natural_key(Path(entry.path).name))
+            for variation, entry in enumerate(entries, start=1):
+                entry.variation = variation
+            if entries:
+                self._by_material[material] = entries
+            else:
+                self._by_material.pop(material, None)
+
+    def save(self, path: Path) -> None:
+        data = {
+            "version": _INDEX_VERSION,
+            "roots": [str(root) for root in self.roots],
+            "assets": [asdict(entry) for entry in self._entries.values()],
+        }
+        # Written aside and renamed, so the editor and the render service can share the file.
+        path = Path(path)
+        partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        partial.write_text(json.dumps(data))
+        os.replace(partial, path)
+
+    @classmethod
+    def load(cls, path: Path, roots: Sequence[Path]) -> "AssetIndex":
+        """Load a saved index for ``roots``; entries outside them are dropped on the next scan."""
+        path = Path(path)
+        if not path.exists():
+            return cls(roots)
+        try:
+            data = json.loads(path.read_text())
+            if data.get("version") != _INDEX_VERSION:
+                return cls(roots)
+            return cls(roots, [AssetEntry(**entry) for entry in data["assets"]])
+        except (ValueError, TypeError, KeyError):
+            return cls(roots)
+
+
+def open_library(roots: Sequence[Path], cache_path: Optional[Path] = None) -> AssetIndex:
+    """Load the cached index of ``roots``, bring it up to date and save it back."""
+    index = AssetIndex.load(cache_path, roots) if cache_path else AssetIndex(roots)
+    if index.scan() and cache_path:
+        index.save(cache_path)
+    return index
+
+
+def _is_under(path: str, directories: Sequence[Path]) -> bool:
+    return any(path.startswith(os.path.join(directory, "")) for directory in directories)
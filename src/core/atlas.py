@@ -0,0 +1,267 @@
+"""
+Sound-atlas export.
+
+Renders a set of footstep variations (typically every material of a blend
+layout times K seeds) back to back into one audio file, and writes an
+index of where each variation starts and how long it is. Game runtimes
+load or memory-map the single file instead of thousands of small ones.
+
+Variations start on ``align``-frame boundaries, padded with silence, and
+the PCM data of WAV atlases starts on a page boundary of the file. Rendering
+runs on a process pool sharing a memory-mapped bank pack; results go
+through a reorder buffer so the file is written in item order as they
+arrive.
+"""
+
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import struct
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, TypeVar
+
+import numpy as np
+
+from src.core.blend import BlendLayout
+from src.core.encoder import encode_pcm
+from src.core.render import Renderer, segment_to_array
+from src.core.sample_bank import SampleBank
+from src.core.variation import SamplePicker, VariationSettings
+from src.utils import tracing
+
+
+FORMATS = ("wav", "ogg")
+INDEX_FORMATS = ("json", "binary")
+
+DEFAULT_ALIGN = 1024
+"""Frames each variation offset is a multiple of."""
+DATA_ALIGN = 4096
+"""Byte boundary the PCM data of a WAV atlas starts on."""
+
+_BINARY_MAGIC = b"FSAT"
+_BINARY_VERSION = 1
+_CHUNK_SIZE = 16
+# Below this many items, spawning a pool costs more than it saves.
+_POOL_THRESHOLD = 128
+
+_renderer: Optional[Renderer] = None
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+
+@dataclass
+class AtlasItem:
+    name: str
+    x: float
+    y: float
+    seed: int
+
+
+@dataclass
+class AtlasEntry:
+    name: str
+    x: float
+    y: float
+    seed: int
+    offset: int
+    """First frame of the variation in the atlas."""
+    frames: int
+
+
+def layout_items(layout: BlendLayout, seeds: int, steps: int = 0) -> List[AtlasItem]:
+    """Every material of ``layout`` (and optionally a ``steps`` x ``steps`` grid of blends) times ``seeds``."""
+    positions = [(material, px, py) for px, py, material in layout.points]
+    if steps > 1:
+        axis = np.linspace(0.0, 1.0, steps)
+        positions += [(f"blend-{x:.2f}-{y:.2f}", float(x), float(y)) for y in axis for x in axis]
+
+    return [
+        AtlasItem(f"{name}-{seed + 1:03d}", round(x, 4), round(y, 4), seed)
+        for name, x, y in positions
+        for seed in range(seeds)
+    ]
+
+
+def _render_item(renderer: Renderer, item: AtlasItem) -> np.ndarray:
+    rng = random.Random(f"{item.name}:{item.seed}")
+    # A fresh picker per item keeps results independent of how items are chunked.
+    segment = renderer.render(item.x, item.y, rng, picker=SamplePicker(renderer.variation.layers))
+    return segment_to_array(segment)
+
+
+def _init_worker(
+    pack_dir: str,
+    layout: BlendLayout,
+    variation: VariationSettings,
+    gain_match: bool,
+    align_onsets: bool,
+) -> None:
+    global _renderer
+    _renderer = Renderer(
+        SampleBank.open_pack(Path(pack_dir)),
+        variation=variation,
+        layout=layout,
+        gain_match=gain_match,
+        align_onsets=align_onsets,
+    )
+
+
+def _render_chunk(items: List[AtlasItem]) -> List[np.ndarray]:
+    return [_render_item(_renderer, item) for item in items]
+
+
+def ordered(pool: ProcessPoolExecutor, fn: Callable[[_T], _R], chunks: Sequence[_T], window: int) -> Iterator[_R]:
+    """Yield ``fn(chunk)`` for every chunk in order, keeping at most ``window`` chunks in flight."""
+    pending: Dict[Future, int] = {}
+    ready: Dict[int, _R] = {}
+    submitted = 0
+    next_index = 0
+    while next_index < len(chunks):
+        while submitted < len(chunks) and len(pending) + len(ready) < window:
+            pending[pool.submit(fn, chunks[submitted])] = submitted
+            submitted += 1
+
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            ready[pending.pop(future)] = future.result()
+        while next_index in ready:
+            yield ready.pop(next_index)
+            next_index += 1
+
+
+class WavWriter:
+    """Streams 16-bit PCM into a WAV file whose data chunk starts on a ``DATA_ALIGN`` boundary."""
+
+    _HEADER = 12 + 8 + 16
+
+    def __init__(self, file: BinaryIO, sample_rate: int, channels: int) -> None:
+        self.file = file
+        self.channels = channels
+        self.frames = 0
+
+        # A JUNK chunk pads the header so the data chunk payload is aligned.
+        junk = DATA_ALIGN - (self._HEADER + 8 + 8) % DATA_ALIGN
+        self.data_offset = self._HEADER + 8 + junk + 8
+        block_align = channels * 2
+        file.write(b"RIFF\0\0\0\0WAVE")
+        byte_rate = sample_rate * block_align
+        file.write(b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, byte_rate, block_align, 16))
+        file.write(b"JUNK" + struct.pack("<I", junk) + bytes(junk))
+        file.write(b"data\0\0\0\0")
+
+    def write(self, samples: np.ndarray) -> None:
+        self.file.write(np.ascontiguousarray(samples, dtype="<i2").tobytes())
+        self.frames += len(samples)
+
+    def pad(self, frames: int) -> None:
+        self.file.write(bytes(frames * self.channels * 2))
+        self.frames += frames
+
+    def close(self) -> None:
+        size = self.frames * self.channels * 2
+        self.file.seek(4)
+        self.file.write(struct.pack("<I", self.data_offset - 8 + size))
+        self.file.seek(self.data_offset - 4)
+        self.file.write(struct.pack("<I", size))
+
+
+def write_index(path: Path, entries: List[AtlasEntry], header: Dict, index_format: str = "json") -> Path:
+    """Write the atlas index as JSON or as a compact little-endian binary table."""
+    if index_format == "json":
+        path.write_text(json.dumps({**header, "entries": [asdict(e) for e in entries]}, indent=1))
+        return path
+
+    with path.open("wb") as f:
+        f.write(_BINARY_MAGIC)
+        f.write(struct.pack(
+            "<HIIHII", _BINARY_VERSION, len(entries), header["sample_rate"], header["channels"],
+            header["align"], header.get("data_offset", 0),
+        ))
+        for entry in entries:
+            name = entry.name.encode("utf-8")
+            f.write(struct.pack("<QIffIH", entry.offset, entry.frames, entry.x, entry.y, entry.seed, len(name)) + name)
+    return path
+
+
+def export_atlas(
+    renderer: Renderer,
+    items: Sequence[AtlasItem],
+    path: Path,
+    format: str = "wav",
+    index_format: str = "json",
+    align: int = DEFAULT_ALIGN,
+    workers: Optional[int] = None,
+) -> List[AtlasEntry]:
+    """Render ``items`` into one atlas file at ``path`` plus an index next to it.
+
+    Offsets and lengths are in frames of the bank's engine format. OGG atlases
+    keep the same frame offsets; runtimes seek by sample instead of mapping bytes.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unsupported atlas format '{format}', expected one of {list(FORMATS)}")
+    if index_format not in INDEX_FORMATS:
+        raise ValueError(f"Unsupported index format '{index_format}', expected one of {list(INDEX_FORMATS)}")
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fmt = renderer.bank.format
+    chunks = [list(items[i:i + _CHUNK_SIZE]) for i in range(0, len(items), _CHUNK_SIZE)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    wav_path = path if format == "wav" else path.with_suffix(".tmp.wav")
+    entries: List[AtlasEntry] = []
+
+    with tracing.span("atlas.export", items=len(items), workers=workers), wav_path.open("wb") as f:
+        writer = WavWriter(f, fmt.sample_rate, fmt.channels)
+
+        def append(item: AtlasItem, samples: np.ndarray) -> None:
+            writer.pad(-writer.frames % align)
+            entries.append(AtlasEntry(item.name, item.x, item.y, item.seed, writer.frames, len(samples)))
+            writer.write(samples)
+
+        if workers > 1 and len(items) >= _POOL_THRESHOLD:
+            pack_dir = tempfile.mkdtemp(prefix="footstep-atlas-")
+            try:
+                renderer.bank.save_pack(Path(pack_dir))
+                context = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(pack_dir, renderer.layout, renderer.variation, renderer.gain_match, renderer.align_onsets),
+                ) as pool:
+                    for chunk, results in zip(chunks, ordered(pool, _render_chunk, chunks, workers * 2)):
+                        for item, samples in zip(chunk, results):
+                            append(item, samples)
+            finally:
+                shutil.rmtree(pack_dir, ignore_errors=True)
+        else:
+            for item in items:
+                append(item, _render_item(renderer, item))
+
+        writer.close()
+
+    header = {
+        "file": path.name,
+        "sample_rate": fmt.sample_rate,
+        "channels": fmt.channels,
+        "sample_width": 2,
+        "align": align,
+    }
+    if format == "wav":
+        header["data_offset"] = writer.data_offset
+    else:
+        with tracing.span("atlas.encode", format=format):
+            pcm = np.memmap(wav_path, dtype="<i2", mode="r", offset=writer.data_offset)
+            path.write_bytes(encode_pcm(pcm.reshape(-1, fmt.channels), fmt.sample_rate, format))
+            del pcm
+        wav_path.unlink()
+
+    suffix = ".json" if index_format == "json" else ".idx"
+    write_index(path.with_suffix(suffix), entries, header, index_format)
+    return entries
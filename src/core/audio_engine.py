@@ -1,86 +1,133 @@
 import threading
-import time
-from typing import Optional, List, Tuple, Union
-from PySide6.QtCore import QObject, Signal
+from typing import Dict, List, Optional, Union
+
 import miniaudio
+import numpy as np
+
+from src.core.engine_format import DEFAULT_FORMAT, EngineFormat
+from src.core.output_device import DeviceSettings, OutputDevice
+from src.utils import tracing
+from src.utils.events import Event
+
+
+def decode_stream(stream: bytes, format: EngineFormat) -> np.ndarray:
+    """Decode an encoded stream into ``(frames, channels)`` float32 samples in the engine format."""
+    decoded = miniaudio.decode(
+        stream,
+        output_format=miniaudio.SampleFormat.FLOAT32,
+        nchannels=format.channels,
+        sample_rate=format.sample_rate,
+    )
+    return np.frombuffer(decoded.samples, dtype=np.float32).reshape(-1, format.channels)
+
+
+class AudioEngine:
+    """Plays streams through one long-lived output device.
 
+    The device is opened on first use and kept open; :meth:`configure`
+    applies new :class:`DeviceSettings` without stopping playback.
+    """
 
-class _AbstractAudioFile:
-    def __init__(self, stream: bytes):
-        decoded = miniaudio.decode(stream)
-        
-        self.sample_rate = decoded.sample_rate
-        self.nchannels = decoded.nchannels
-        self.duration = len(decoded.samples) / decoded.sample_rate / decoded.nchannels
-        self.position = 0
-
-
-class AudioEngine(QObject):
-    playback_started = Signal()
-    playback_stopped = Signal()
-    
-    def __init__(self) -> None:
-        super().__init__()
-        self._playback_threads: List[threading.Thread] = []
-        self._stop_event = threading.Event()
+    def __init__(
+        self,
+        backends: Optional[List[miniaudio.Backend]] = None,
+        format: EngineFormat = DEFAULT_FORMAT,
+        settings: Optional[DeviceSettings] = None,
+    ) -> None:
+        if settings is None:
+            settings = DeviceSettings(backend=backends[0].name.lower() if backends else None)
+        self.format = format
+        self.playback_started = Event()
+        self.playback_stopped = Event()
+        # Emitted from the device thread with the trigger-to-first-audible-frame latency.
+        self.audible = Event()
         self._lock = threading.Lock()
-        self._active_count = 0
-    
-    def play(self, stream: Union[bytes, List[bytes]]) -> None:        
-        tracks: List[bytes] = []
-        if isinstance(stream, bytes):
-            tracks.append(stream)
-        else:
-            tracks = stream
-            
+
+        self.device = OutputDevice(format, settings)
+        self.device.mixer.idle.connect(self.playback_stopped.emit)
+        self.device.mixer.audible.connect(self._on_audible)
+
+    @property
+    def settings(self) -> DeviceSettings:
+        return self.device.settings
+
+    def play(
+        self,
+        stream: Union[bytes, List[bytes]],
+        triggered_at: Optional[float] = None,
+        start_at: Optional[float] = None,
+    ) -> None:
+        """Play one or several encoded streams.
+
+        ``triggered_at`` is the ``time.perf_counter()`` timestamp of the user
+        action that caused the playback, used to log click-to-sound latency.
+        ``start_at`` schedules the streams on the audio clock at that
+        ``time.perf_counter()`` time instead of starting them right away.
+        """
+        tracks = [stream] if isinstance(stream, bytes) else list(stream)
         if not tracks:
             return
 
+        with tracing.span("engine.decode", tracks=len(tracks)):
+            voices = [decode_stream(track, self.format) for track in tracks]
+        self.play_samples(voices, triggered_at, start_at)
+
+    def play_samples(
+        self,
+        samples: Union[np.ndarray, List[np.ndarray]],
+        triggered_at: Optional[float] = None,
+        start_at: Optional[float] = None,
+    ) -> None:
+        """Play ``(frames, channels)`` float32 voices already in the engine format; see :meth:`play`."""
+        voices = [samples] if isinstance(samples, np.ndarray) else list(samples)
+        voices = [voice for voice in voices if len(voice)]
+        if not voices:
+            return
+
         with self._lock:
+            try:
+                self.device.start()
+            except miniaudio.MiniaudioError as e:
+                print(f"Playback error: {e}")
+                return
             self.playback_started.emit()
-            
-            for stream_data in tracks:
-                t = threading.Thread(
-                    target=self._playback_worker, 
-                    args=(stream_data,), 
-                    daemon=True
-                )
-                self._playback_threads.append(t)
-                self._active_count += 1
-                t.start()
-    
+            for voice in voices:
+                self.device.mixer.add(voice, triggered_at, start_at)
+
+    def loop(self, samples: Optional[np.ndarray], start_at: Optional[float] = None) -> None:
+        """Loop ``(frames, channels)`` float32 samples in the engine format, or stop the loop with None.
+
+        A new loop replaces the playing one at the same position. The
+        samples are read in place, so in-place edits are heard on the next pass.
+        """
+        with self._lock:
+            if samples is not None:
+                try:
+                    self.device.start()
+                except miniaudio.MiniaudioError as e:
+                    print(f"Playback error: {e}")
+                    return
+                self.playback_started.emit()
+            self.device.mixer.set_loop(samples, start_at)
+
     def stop(self) -> None:
         """Stop all currently playing audio."""
-        self._stop_event.set()
+        self.device.mixer.stop()
+
+    def configure(self, settings: DeviceSettings) -> None:
+        """Apply new device settings; playback carries on."""
         with self._lock:
-            self._playback_threads = [t for t in self._playback_threads if t.is_alive()]
-
-    def _playback_worker(self, stream_data: bytes) -> None:
-        try:
-            stream = miniaudio.stream_memory(stream_data)
-            
-            with miniaudio.PlaybackDevice() as device:
-                device.start(stream)
-                device.abstract_audio_file = _AbstractAudioFile(stream_data)
-                self._wait_for_playback(device)
-        except Exception as e:
-            print(f"Playback error for stream data: {e}")
-        finally:
-            with self._lock:
-                self._active_count -= 1
-                if self._active_count <= 0:
-                    self._active_count = 0
-                    self.playback_stopped.emit()
-    
-    def _wait_for_playback(self, device: miniaudio.PlaybackDevice) -> None:
-        start_time = time.time()
-        file_infos = device.abstract_audio_file
-        
-        while not self._stop_event.is_set():
-            elapsed = time.time() - start_time
-            file_infos.position = elapsed
-            
-            time.sleep(0.05)
-
-            if elapsed >= file_infos.duration and file_infos.duration > 0:
-                break
+            self.device.configure(settings)
+
+    def stats(self) -> Dict[str, float]:
+        """Output counters: callbacks, underruns, callback duration and headroom."""
+        return self.device.stats()
+
+    def close(self) -> None:
+        self.stop()
+        self.device.close()
+
+    def _on_audible(self, latency: float, triggered_at: float) -> None:
+        tracing.click_to_sound.record(latency)
+        tracing.complete("click_to_sound", triggered_at, triggered_at + latency)
+        self.audible.emit(latency)
@@ -0,0 +1,296 @@
+"""
+Out-of-process audio output.
+
+Optional replacement for :class:`~src.core.audio_engine.AudioEngine` that
+mixes voices and drives the output device in a separate process, so a
+busy or paused GUI process cannot starve the device. Commands go through
+a queue, decoded audio through a shared-memory ring buffer, and output
+counters (underruns, callback time, headroom) come back through shared
+memory. Enabled in the editor with ``FOOTSTEP_AUDIO_PROCESS=1``.
+
+Calls return without waiting on the audio process: a feeder thread sends
+the commands in order and writes their samples into the ring as the
+audio process drains it.
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple, Union
+
+import miniaudio
+import numpy as np
+
+from src.core.audio_engine import decode_stream
+from src.core.engine_format import DEFAULT_FORMAT, EngineFormat
+from src.core.output_device import DeviceSettings, OutputDevice
+from src.core.ring_buffer import SharedRingBuffer
+from src.core.voice_mixer import COUNTERS, counters_dict, new_counters
+from src.utils import tracing
+from src.utils.events import Event
+
+
+PROCESS_ENV = "FOOTSTEP_AUDIO_PROCESS"
+
+_POLL_SEC = 0.0005
+_CONFIGURE_TIMEOUT_SEC = 10.0
+
+
+def _audio_main(
+    ring_name: str,
+    capacity: int,
+    format: EngineFormat,
+    settings: DeviceSettings,
+    counters_name: str,
+    commands: multiprocessing.Queue,
+    events: multiprocessing.Queue,
+) -> None:
+    ring = SharedRingBuffer(capacity, format.channels, name=ring_name)
+    counters_shm = shared_memory.SharedMemory(name=counters_name)
+    counters = np.ndarray((len(COUNTERS),), dtype=np.float64, buffer=counters_shm.buf)
+
+    output = OutputDevice(format, settings, counters)
+    output.mixer.idle.connect(lambda: events.put(("idle",)))
+    output.mixer.audible.connect(lambda latency, triggered_at: events.put(("audible", latency, triggered_at)))
+
+    try:
+        output.start()
+    except miniaudio.MiniaudioError as e:
+        events.put(("error", str(e)))
+        return
+
+    events.put(("ready",))
+    while True:
+        command = commands.get()
+        if command is None:
+            break
+        if command[0] == "voice":
+            _, frames, triggered_at, start_at = command
+            output.mixer.add(_receive(ring, frames), triggered_at, start_at)
+        elif command[0] == "loop":
+            _, frames, start_at = command
+            output.mixer.set_loop(_receive(ring, frames) if frames is not None else None, start_at)
+        elif command[0] == "stop":
+            output.mixer.stop()
+        elif command[0] == "configure":
+            _, settings, request = command
+            try:
+                output.configure(settings)
+            except miniaudio.MiniaudioError as e:
+                events.put(("configured", request, str(e)))
+            else:
+                events.put(("configured", request, None))
+
+    output.close()
+    del output, counters
+    counters_shm.close()
+    ring.close()
+
+
+def _receive(ring: SharedRingBuffer, frames: int) -> np.ndarray:
+    """Read ``frames`` frames from the ring, waiting for the parent to write them."""
+    blocks = []
+    received = 0
+    while received < frames:
+        block = ring.read(frames - received)
+        if len(block) == 0:
+            time.sleep(_POLL_SEC)
+            continue
+        blocks.append(block)
+        received += len(block)
+    return np.concatenate(blocks) if len(blocks) > 1 else blocks[0]
+
+
+class AudioProcessEngine:
+    """Audio engine whose mixing and device output run in a child process."""
+
+    def __init__(
+        self,
+        backends: Optional[List[miniaudio.Backend]] = None,
+        format: EngineFormat = DEFAULT_FORMAT,
+        settings: Optional[DeviceSettings] = None,
+        ring_seconds: float = 2.0,
+    ) -> None:
+        if settings is None:
+            settings = DeviceSettings(backend=backends[0].name.lower() if backends else None)
+        self.settings = settings
+        self.format = format
+        self.playback_started = Event()
+        self.playback_stopped = Event()
+        self.audible = Event()
+        self.error: Optional[str] = None
+        self._configure_lock = threading.Lock()
+        self._ready = threading.Event()
+        # (command, samples) pairs waiting for the feeder, None to stop it.
+        self._outbox: "queue.Queue[Optional[Tuple[tuple, Optional[np.ndarray]]]]" = queue.Queue()
+        # (request, error) answers to configure commands.
+        self._configured: "queue.Queue[Tuple[int, Optional[str]]]" = queue.Queue()
+        self._configure_requests = 0
+
+        self._ring = SharedRingBuffer(int(ring_seconds * format.sample_rate), format.channels)
+        self._counters_shm = shared_memory.SharedMemory(create=True, size=len(COUNTERS) * 8)
+        self._counters = np.ndarray((len(COUNTERS),), dtype=np.float64, buffer=self._counters_shm.buf)
+        self._counters[:] = new_counters()
+
+        context = multiprocessing.get_context("spawn")
+        self._commands = context.Queue()
+        self._events = context.Queue()
+        self._process = context.Process(
+            target=_audio_main,
+            args=(
+                self._ring.name, self._ring.capacity, format, settings,
+                self._counters_shm.name, self._commands, self._events,
+            ),
+            daemon=True,
+            name="footstep-audio",
+        )
+        self._process.start()
+        self._listener = threading.Thread(target=self._listen, daemon=True)
+        self._listener.start()
+        self._feeder = threading.Thread(target=self._feed, daemon=True)
+        self._feeder.start()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the child process has opened the device."""
+        return self._ready.wait(timeout) and self.error is None
+
+    def play(
+        self,
+        stream: Union[bytes, List[bytes]],
+        triggered_at: Optional[float] = None,
+        start_at: Optional[float] = None,
+    ) -> None:
+        """Play one or several encoded streams; see :meth:`AudioEngine.play`."""
+        tracks = [stream] if isinstance(stream, bytes) else list(stream)
+        if not tracks:
+            return
+
+        with tracing.span("engine.decode", tracks=len(tracks)):
+            voices = [decode_stream(track, self.format) for track in tracks]
+        self.play_samples(voices, triggered_at, start_at)
+
+    def play_samples(
+        self,
+        samples: Union[np.ndarray, List[np.ndarray]],
+        triggered_at: Optional[float] = None,
+        start_at: Optional[float] = None,
+    ) -> None:
+        """Play float32 voices in the engine format; see :meth:`AudioEngine.play_samples`."""
+        voices = [samples] if isinstance(samples, np.ndarray) else list(samples)
+        voices = [voice for voice in voices if len(voice)]
+        if not voices:
+            return
+
+        self.playback_started.emit()
+        for voice in voices:
+            command = ("voice", len(voice), triggered_at, start_at)
+            self._outbox.put((command, np.array(voice, dtype=np.float32)))
+
+    def loop(self, samples: Optional[np.ndarray], start_at: Optional[float] = None) -> None:
+        """Loop samples, or stop the loop with None; see :meth:`AudioEngine.loop`.
+
+        The audio process gets a copy: call again after editing the samples.
+        """
+        if samples is None:
+            self._outbox.put((("loop", None, start_at), None))
+            return
+        self.playback_started.emit()
+        self._outbox.put((("loop", len(samples), start_at), np.array(samples, dtype=np.float32)))
+
+    def _feed(self) -> None:
+        """Send queued commands in order, writing their samples after each."""
+        alive = True
+        while True:
+            item = self._outbox.get()
+            if item is None:
+                return
+            command, samples = item
+            if not alive:
+                continue
+            self._commands.put(command)
+            if samples is not None:
+                alive = self._send(samples)
+
+    def _send(self, samples: np.ndarray) -> bool:
+        """Write samples into the ring as the audio process drains it; False if it died."""
+        written = 0
+        while written < len(samples):
+            count = self._ring.write(samples[written:])
+            if count == 0:
+                if not self._process.is_alive():
+                    return False
+                time.sleep(_POLL_SEC)
+            written += count
+        return True
+
+    def stop(self) -> None:
+        """Stop all currently playing audio."""
+        self._outbox.put((("stop",), None))
+
+    def configure(self, settings: DeviceSettings) -> None:
+        """Reopen the output device of the audio process with new settings.
+
+        Waits for the audio process; raises ``MiniaudioError`` when it could
+        not open the device, in which case it keeps the previous settings.
+        """
+        # Only one configure waits at a time; presses keep flowing meanwhile.
+        with self._configure_lock:
+            self._configure_requests += 1
+            request = self._configure_requests
+            self._outbox.put((("configure", settings, request), None))
+            deadline = time.monotonic() + _CONFIGURE_TIMEOUT_SEC
+            while True:
+                try:
+                    answer, error = self._configured.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    raise miniaudio.MiniaudioError("The audio process did not answer") from None
+                # Late answers to requests that timed out are dropped.
+                if answer == request:
+                    break
+            if error is not None:
+                raise miniaudio.MiniaudioError(error)
+            self.settings = settings
+
+    def stats(self) -> Dict[str, float]:
+        """Output counters of the audio process."""
+        return counters_dict(self._counters)
+
+    def close(self) -> None:
+        """Stop the audio process and release the shared memory."""
+        self._outbox.put(None)
+        self._feeder.join(timeout=5.0)
+        if self._process.is_alive():
+            self._commands.put(None)
+            self._process.join(timeout=5.0)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._events.put(None)
+        self._listener.join(timeout=1.0)
+        del self._counters
+        self._counters_shm.close()
+        self._counters_shm.unlink()
+        self._ring.close()
+
+    def _listen(self) -> None:
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+            kind = event[0]
+            if kind == "ready":
+                self._ready.set()
+            elif kind == "error":
+                self.error = event[1]
+                print(f"Audio process error: {self.error}")
+                self._ready.set()
+            elif kind == "configured":
+                self._configured.put((event[1], event[2]))
+            elif kind == "idle":
+                self.playback_stopped.emit()
+            elif kind == "audible":
+                _, latency, triggered_at = event
+                tracing.click_to_sound.record(latency)
+                tracing.complete("click_to_sound", triggered_at, triggered_at + latency)
+                self.audible.emit(latency)
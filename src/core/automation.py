@@ -0,0 +1,188 @@
+"""
+Mix-parameter automation.
+
+Each timeline track can automate the pad position (``x``, ``y``) and its
+gain (``gain_db``). A lane stores breakpoints as two small float32 arrays,
+interpolated linearly between breakpoints and held before the first and
+after the last one. Recorded moves are thinned with Douglas-Peucker so a
+long take keeps only the breakpoints needed to stay within a tolerance of
+what was played, and every key of a track is evaluated with a single
+``np.interp`` call when the timeline is rendered.
+
+``to_dict`` stores lanes as base64 float32 breakpoints. The editor has no
+project file yet, so nothing saves them so far.
+"""
+
+import base64
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+
+PARAMETERS = ("x", "y", "gain_db")
+DEFAULTS = {"x": 0.5, "y": 0.5, "gain_db": 0.0}
+RANGES: Dict[str, Tuple[float, float]] = {"x": (0.0, 1.0), "y": (0.0, 1.0), "gain_db": (-40.0, 12.0)}
+TOLERANCES = {"x": 0.01, "y": 0.01, "gain_db": 0.5}
+"""Largest error thinning may introduce, matching the pad resolution and a barely audible gain step."""
+
+# Distance of the breakpoints that hold the previous values around a recorded move.
+_ANCHOR_SEC = 1e-3
+
+
+def douglas_peucker(times: np.ndarray, values: np.ndarray, tolerance: float) -> np.ndarray:
+    """Indices of the breakpoints to keep.
+
+    Interpolating through the kept breakpoints stays within ``tolerance`` of
+    every dropped value. The error is measured along the value axis, since
+    time and value have unrelated units.
+    """
+    count = len(times)
+    if count <= 2:
+        return np.arange(count)
+
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, count - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        span = times[last] - times[first]
+        t = (times[first + 1:last] - times[first]) / span if span > 0 else 0.0
+        line = values[first] + (values[last] - values[first]) * t
+        error = np.abs(values[first + 1:last] - line)
+        worst = int(np.argmax(error))
+        if error[worst] > tolerance:
+            split = first + 1 + worst
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return np.flatnonzero(keep)
+
+
+class AutomationLane:
+    """Breakpoints of one parameter, sorted by time."""
+
+    def __init__(
+        self,
+        default: float = 0.0,
+        times: Optional[np.ndarray] = None,
+        values: Optional[np.ndarray] = None,
+    ) -> None:
+        self.default = default
+        self.times = np.asarray(times if times is not None else [], dtype=np.float32)
+        self.values = np.asarray(values if values is not None else [], dtype=np.float32)
+        if self.times.shape != self.values.shape:
+            raise ValueError("Automation times and values must have the same length")
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @property
+    def nbytes(self) -> int:
+        return self.times.nbytes + self.values.nbytes
+
+    def evaluate(self, times: np.ndarray) -> np.ndarray:
+        """Values at ``times``; the default everywhere when the lane is empty."""
+        times = np.asarray(times, dtype=np.float64)
+        if not len(self.times):
+            return np.full(times.shape, self.default, dtype=np.float64)
+        return np.interp(times, self.times, self.values)
+
+    def set_point(self, time: float, value: float) -> None:
+        """Add a breakpoint, replacing one at the same time."""
+        i = int(np.searchsorted(self.times, time))
+        if i < len(self.times) and self.times[i] == np.float32(time):
+            self.values[i] = value
+            return
+        self.times = np.insert(self.times, i, time)
+        self.values = np.insert(self.values, i, value)
+
+    def clear_range(self, start: float, end: float) -> None:
+        """Remove the breakpoints in ``[start, end]``."""
+        outside = (self.times < start) | (self.times > end)
+        self.times = self.times[outside]
+        self.values = self.values[outside]
+
+    def record(self, times: np.ndarray, values: np.ndarray, tolerance: float) -> None:
+        """Replace the span of a recorded move with its thinned breakpoints.
+
+        ``times`` must be increasing. Outside the span the lane keeps its
+        previous values: an anchor breakpoint is added just before and after
+        the move where they differ from the recorded ends.
+        """
+        times = np.asarray(times, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        if not len(times):
+            return
+        kept = douglas_peucker(times, values, tolerance)
+        new_times = [times[kept]]
+        new_values = [values[kept]]
+
+        # Rounded to the stored precision so re-recording a span replaces its anchors.
+        start, end = (float(np.float32(t)) for t in (times[0] - _ANCHOR_SEC, times[-1] + _ANCHOR_SEC))
+        before, after = self.evaluate(np.array([start, end]))
+        if abs(before - values[0]) > tolerance:
+            new_times.insert(0, [start])
+            new_values.insert(0, [before])
+        if abs(after - values[-1]) > tolerance:
+            new_times.append([end])
+            new_values.append([after])
+
+        self.clear_range(start, end)
+        merged_times = np.concatenate([self.times, *(np.asarray(t, dtype=np.float32) for t in new_times)])
+        merged_values = np.concatenate([self.values, *(np.asarray(v, dtype=np.float32) for v in new_values)])
+        order = np.argsort(merged_times, kind="stable")
+        self.times = merged_times[order]
+        self.values = merged_values[order]
+
+    def thin(self, tolerance: float) -> None:
+        kept = douglas_peucker(self.times.astype(np.float64), self.values.astype(np.float64), tolerance)
+        self.times = self.times[kept]
+        self.values = self.values[kept]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Breakpoints as base64 little-endian float32 ``(time, value)`` pairs."""
+        pairs = np.stack([self.times, self.values], axis=1).astype("<f4")
+        return {"default": self.default, "points": base64.b64encode(pairs.tobytes()).decode("ascii")}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AutomationLane":
+        pairs = np.frombuffer(base64.b64decode(data.get("points", "")), dtype="<f4").reshape(-1, 2)
+        return cls(data.get("default", 0.0), pairs[:, 0].astype(np.float32), pairs[:, 1].astype(np.float32))
+
+
+class TrackAutomation:
+    """The ``x``, ``y`` and ``gain_db`` lanes of one timeline track."""
+
+    def __init__(self, lanes: Optional[Dict[str, AutomationLane]] = None) -> None:
+        self.lanes = {name: AutomationLane(DEFAULTS[name]) for name in PARAMETERS}
+        for name, lane in (lanes or {}).items():
+            if name not in self.lanes:
+                raise ValueError(f"Unknown automation parameter '{name}', expected one of {list(PARAMETERS)}")
+            self.lanes[name] = lane
+
+    def __getitem__(self, name: str) -> AutomationLane:
+        return self.lanes[name]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(lane.nbytes for lane in self.lanes.values())
+
+    def evaluate(self, times: np.ndarray) -> Dict[str, np.ndarray]:
+        """Every parameter at ``times``, clamped to its range."""
+        return {
+            name: np.clip(lane.evaluate(times), *RANGES[name])
+            for name, lane in self.lanes.items()
+        }
+
+    def record(self, name: str, times: np.ndarray, values: np.ndarray) -> None:
+        """Record a move of one parameter, thinned with its tolerance."""
+        self.lanes[name].record(times, np.clip(values, *RANGES[name]), TOLERANCES[name])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: lane.to_dict() for name, lane in self.lanes.items() if len(lane)}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TrackAutomation":
+        return cls({name: AutomationLane.from_dict(lane) for name, lane in data.items()})
@@ -0,0 +1,220 @@
+"""
+MixPad blend law.
+
+Maps a normalized pad position to a gain per material. A blend layout
+places any number of materials on the pad (corners, a regular polygon, a
+grid or free points) and precomputes their gains over a quantized grid of
+pad positions, so a lookup interpolates one table cell whatever the
+number of materials.
+
+Layouts are configured with the ``FOOTSTEP_BLEND_LAYOUT`` environment
+variable, pointing to a JSON file such as ``assets/layouts/polygon.json``.
+"""
+
+import copy
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+CORNERS: List[Tuple[float, float, str]] = [
+    (0.0, 0.0, "floor"),
+    (1.0, 0.0, "dirt"),
+    (0.0, 1.0, "wood"),
+    (1.0, 1.0, "gravel"),
+]
+
+MIN_GAIN_DB = -40.0
+FALLOFF = 0.75
+
+LAWS = ("distance", "bilinear", "idw")
+LAYOUT_ENV = "FOOTSTEP_BLEND_LAYOUT"
+LAYOUTS_DIR = Path(__file__).parent.parent / "assets" / "layouts"
+
+# Table cells per pad side, matching the 0.01 pad position resolution.
+_RESOLUTION = 101
+
+
+def _distance_law(positions: np.ndarray, points: np.ndarray, falloff: float) -> np.ndarray:
+    dist = np.linalg.norm(positions[:, None, :] - points[None, :, :], axis=2)
+    return np.maximum(MIN_GAIN_DB, -20.0 * dist / falloff)
+
+
+def _bilinear_law(positions: np.ndarray, points: np.ndarray, spacing: Tuple[float, float]) -> np.ndarray:
+    delta = np.abs(positions[:, None, :] - points[None, :, :]) / np.array(spacing)
+    weights = np.prod(np.maximum(0.0, 1.0 - delta), axis=2)
+    return _weights_db(weights)
+
+
+def _idw_law(positions: np.ndarray, points: np.ndarray, power: float) -> np.ndarray:
+    dist = np.linalg.norm(positions[:, None, :] - points[None, :, :], axis=2)
+    with np.errstate(divide="ignore"):
+        inverse = dist ** -power
+    # A position on a point belongs to that point alone.
+    exact = np.isinf(inverse)
+    inverse = np.where(exact.any(axis=1, keepdims=True), exact.astype(float), inverse)
+    return _weights_db(inverse / inverse.sum(axis=1, keepdims=True))
+
+
+def _weights_db(weights: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore"):
+        return np.maximum(MIN_GAIN_DB, 20.0 * np.log10(weights))
+
+
+class BlendLayout:
+    """Materials placed on the pad, with their gains precomputed over the pad."""
+
+    def __init__(
+        self,
+        points: Sequence[Tuple[float, float, str]],
+        law: str = "distance",
+        falloff: float = FALLOFF,
+        power: float = 2.0,
+        spacing: Tuple[float, float] = (1.0, 1.0),
+        resolution: int = _RESOLUTION,
+    ) -> None:
+        if law not in LAWS:
+            raise ValueError(f"Unknown blend law '{law}', expected one of {list(LAWS)}")
+        if not points:
+            raise ValueError("A blend layout needs at least one material")
+        self.points = [(float(px), float(py), material) for px, py, material in points]
+        self.law = law
+        self.falloff = falloff
+        self.power = power
+        self.spacing = spacing
+        self.resolution = resolution
+        self._table = self._build_table()
+
+    @classmethod
+    def corners(cls, materials: Optional[Sequence[str]] = None) -> "BlendLayout":
+        """The four pad corners with the distance law (the original pad)."""
+        layout = cls(CORNERS)
+        return layout.with_materials(materials) if materials else layout
+
+    @classmethod
+    def polygon(cls, materials: Sequence[str], radius: float = 0.5) -> "BlendLayout":
+        """Materials on the vertices of a regular polygon centered on the pad."""
+        count = len(materials)
+        angles = -np.pi / 2 + 2 * np.pi * np.arange(count) / count
+        points = [
+            (0.5 + radius * np.cos(a), 0.5 + radius * np.sin(a), material)
+            for a, material in zip(angles, materials)
+        ]
+        side = 2 * radius * np.sin(np.pi / count) if count > 1 else 1.0
+        # Past a handful of materials the side gets short; keep the centre at
+        # -20 dB from every vertex, as the corners layout roughly is.
+        return cls(points, law="distance", falloff=max(FALLOFF * side, radius))
+
+    @classmethod
+    def grid(cls, materials: Sequence[str], columns: int) -> "BlendLayout":
+        """Materials on a row-major grid spanning the pad, blended bilinearly."""
+        rows = -(-len(materials) // columns)
+        sx = 1.0 / (columns - 1) if columns > 1 else 1.0
+        sy = 1.0 / (rows - 1) if rows > 1 else 1.0
+        points = [(i % columns * sx, i // columns * sy, material) for i, material in enumerate(materials)]
+        return cls(points, law="bilinear", spacing=(sx, sy))
+
+    @classmethod
+    def scattered(cls, points: Sequence[Tuple[float, float, str]], power: float = 2.0) -> "BlendLayout":
+        """Materials at free positions, blended by inverse-distance weighting."""
+        return cls(points, law="idw", power=power)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BlendLayout":
+        """Build a layout from its JSON description, raising ValueError when invalid."""
+        try:
+            kind = data.get("type", "corners")
+            if kind == "corners":
+                return cls.corners(data.get("materials"))
+            if kind == "polygon":
+                return cls.polygon(data["materials"], float(data.get("radius", 0.5)))
+            if kind == "grid":
+                return cls.grid(data["materials"], int(data["columns"]))
+            if kind == "points":
+                points = [(float(px), float(py), str(m)) for px, py, m in data["points"]]
+                return cls.scattered(points, float(data.get("power", 2.0)))
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid blend layout: {e}") from e
+        raise ValueError(f"Unknown blend layout type '{kind}'")
+
+    @property
+    def materials(self) -> List[str]:
+        return [material for _, _, material in self.points]
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def with_materials(self, materials: Sequence[str]) -> "BlendLayout":
+        """Return the layout with its materials replaced, in layout order; the table is shared."""
+        if len(materials) != len(self.points):
+            raise ValueError(f"Expected {len(self.points)} materials, got {len(materials)}")
+        layout = copy.copy(self)
+        layout.points = [(px, py, material) for (px, py, _), material in zip(self.points, materials)]
+        return layout
+
+    def _build_table(self) -> np.ndarray:
+        axis = np.linspace(0.0, 1.0, self.resolution)
+        gy, gx = np.meshgrid(axis, axis, indexing="ij")
+        positions = np.stack([gx.ravel(), gy.ravel()], axis=1)
+        points = np.array([(px, py) for px, py, _ in self.points])
+
+        if self.law == "distance":
+            table = _distance_law(positions, points, self.falloff)
+        elif self.law == "bilinear":
+            table = _bilinear_law(positions, points, self.spacing)
+        else:
+            table = _idw_law(positions, points, self.power)
+        return table.reshape(self.resolution, self.resolution, len(points)).astype(np.float32)
+
+    def gains_db(self, x: float, y: float) -> np.ndarray:
+        """Gain of every material at a pad position, interpolated from the table."""
+        last = self.resolution - 1
+        fx = min(max(x, 0.0), 1.0) * last
+        fy = min(max(y, 0.0), 1.0) * last
+        ix = min(int(fx), last - 1)
+        iy = min(int(fy), last - 1)
+        tx = fx - ix
+        ty = fy - iy
+        cell = self._table[iy:iy + 2, ix:ix + 2]
+        top = cell[0, 0] + (cell[0, 1] - cell[0, 0]) * tx
+        bottom = cell[1, 0] + (cell[1, 1] - cell[1, 0]) * tx
+        return top + (bottom - top) * ty
+
+    def gains(self, x: float, y: float) -> List[Tuple[str, float]]:
+        """Return ``(material, volume_db)`` for every material audible at a pad position.
+
+        The loudest material is always kept, so no position is silent.
+        """
+        gains = self.gains_db(x, y)
+        audible = gains > MIN_GAIN_DB
+        audible[gains.argmax()] = True
+        return [
+            (material, float(gain))
+            for (_, _, material), gain, keep in zip(self.points, gains.tolist(), audible.tolist())
+            if keep
+        ]
+
+
+def load_layout(path: Path) -> BlendLayout:
+    """Load a blend layout from a JSON file."""
+    return BlendLayout.from_dict(json.loads(Path(path).read_text()))
+
+
+_default_layout: Optional[BlendLayout] = None
+
+
+def default_layout() -> BlendLayout:
+    """The layout named by ``FOOTSTEP_BLEND_LAYOUT``, or the four corners."""
+    global _default_layout
+    if _default_layout is None:
+        path = os.environ.get(LAYOUT_ENV)
+        _default_layout = load_layout(Path(path)) if path else BlendLayout.corners()
+    return _default_layout
+
+
+def materials() -> List[str]:
+    """Materials reachable from the pad with the default layout."""
+    return default_layout().materials
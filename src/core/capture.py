@@ -0,0 +1,86 @@
+"""
+Live capture of MixPad performances.
+
+While the timeline plays, each pad press is stamped with its position on
+the timeline, read off the audio clock rather than the GUI event loop,
+and pushed into a preallocated ring. The editor drains the ring in
+batches and merges them into a track, so a burst of presses costs one
+array write each and never waits for the scene to redraw.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+
+PRESS_FIELDS = ("time", "x", "y")
+
+
+class PressBuffer:
+    """Preallocated ring of ``(time, x, y)`` presses.
+
+    One thread pushes and one drains. A full ring drops the press and
+    counts it in ``dropped``.
+    """
+
+    def __init__(self, capacity: int = 4096) -> None:
+        self.capacity = capacity
+        self.dropped = 0
+        self._data = np.zeros((capacity, len(PRESS_FIELDS)), dtype=np.float64)
+        self._write = 0
+        self._read = 0
+
+    def __len__(self) -> int:
+        return self._write - self._read
+
+    def push(self, time: float, x: float, y: float) -> bool:
+        if self._write - self._read >= self.capacity:
+            self.dropped += 1
+            return False
+        self._data[self._write % self.capacity] = (time, x, y)
+        # Publish the press only once its row is written.
+        self._write += 1
+        return True
+
+    def drain(self) -> np.ndarray:
+        """Pending presses in push order as a ``(count, 3)`` array."""
+        start, end = self._read, self._write
+        rows = self._data[np.arange(start, end) % self.capacity]
+        self._read = end
+        return rows
+
+
+class Transport:
+    """Timeline position of a playing render on the audio clock.
+
+    The render of the timeline from ``start_sec`` is scheduled to start at
+    the ``time.perf_counter()`` time ``start_at``. ``latency`` is the output
+    buffer duration: what is heard at a given time was mixed that much
+    earlier. A looping transport wraps back to ``start_sec`` at ``end_sec``.
+    """
+
+    def __init__(
+        self,
+        start_sec: float,
+        start_at: float,
+        latency: float = 0.0,
+        end_sec: Optional[float] = None,
+        loop: bool = False,
+    ) -> None:
+        if loop and end_sec is None:
+            raise ValueError("A looping transport needs an end")
+        self.start_sec = start_sec
+        self.start_at = start_at
+        self.latency = latency
+        self.end_sec = end_sec
+        self.loop = loop
+
+    def position(self, at: float) -> float:
+        """Timeline seconds heard at the ``time.perf_counter()`` time ``at``."""
+        elapsed = at - self.latency - self.start_at
+        if self.loop and elapsed > 0:
+            elapsed %= self.end_sec - self.start_sec
+        return self.start_sec + elapsed
+
+    def finished(self, at: float) -> bool:
+        return not self.loop and self.end_sec is not None and self.position(at) >= self.end_sec
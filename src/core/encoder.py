@@ -0,0 +1,113 @@
+"""
+Audio encoder.
+
+Encodes raw PCM buffers in-process: WAV with the standard library, OGG
+Vorbis and FLAC with libsndfile (``soundfile``), so exporting a clip does
+not start a process. Without ``soundfile``, OGG and FLAC fall back to
+pydub, which runs ffmpeg once per clip.
+
+:class:`Encoder` runs encodes on long-lived worker threads fed through a
+bounded queue; libsndfile releases the GIL while encoding.
+"""
+
+import io
+import os
+import threading
+import wave
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+from pydub import AudioSegment
+
+try:
+    import soundfile
+except ImportError:  # pragma: no cover - depends on the environment
+    soundfile = None
+
+
+FORMATS = ("wav", "ogg", "flac", "raw")
+
+_SOUNDFILE_FORMATS = {"ogg": ("OGG", "VORBIS"), "flac": ("FLAC", "PCM_16")}
+
+
+def has_native_codecs() -> bool:
+    """Whether OGG and FLAC are encoded in-process."""
+    return soundfile is not None
+
+
+def encode_pcm(samples: np.ndarray, sample_rate: int, format: str = "wav") -> bytes:
+    """Encode ``(frames, channels)`` int16 samples."""
+    if format not in FORMATS:
+        raise ValueError(f"Unsupported format '{format}', expected one of {list(FORMATS)}")
+    samples = np.ascontiguousarray(samples, dtype=np.int16)
+    channels = samples.shape[1]
+
+    if format == "raw":
+        return samples.tobytes()
+
+    stream = io.BytesIO()
+    if format == "wav":
+        with wave.open(stream, "wb") as f:
+            f.setnchannels(channels)
+            f.setsampwidth(2)
+            f.setframerate(sample_rate)
+            f.writeframes(samples.tobytes())
+    elif soundfile is not None:
+        container, subtype = _SOUNDFILE_FORMATS[format]
+        soundfile.write(stream, samples, sample_rate, format=container, subtype=subtype)
+    else:
+        segment = AudioSegment(data=samples.tobytes(), sample_width=2, frame_rate=sample_rate, channels=channels)
+        segment.export(stream, format=format)
+    return stream.getvalue()
+
+
+def encode_segment(segment: AudioSegment, format: str = "wav") -> bytes:
+    """Encode a pydub segment without going through ``AudioSegment.export``."""
+    segment = segment.set_sample_width(2)
+    samples = np.frombuffer(segment.raw_data, dtype=np.int16).reshape(-1, segment.channels)
+    return encode_pcm(samples, segment.frame_rate, format)
+
+
+class Encoder:
+    """Pool of long-lived encoder threads fed through a bounded queue.
+
+    ``submit`` blocks once ``max_pending`` buffers are waiting, so producers
+    cannot run ahead of encoding.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="encoder")
+        self._slots = threading.BoundedSemaphore(max_pending or self.workers * 4)
+
+    def submit(self, samples: np.ndarray, sample_rate: int, format: str = "wav") -> "Future[bytes]":
+        """Queue one PCM buffer for encoding."""
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(encode_pcm, samples, sample_rate, format)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def map(self, buffers: Iterable[np.ndarray], sample_rate: int, format: str = "wav") -> Iterator[bytes]:
+        """Encode buffers in parallel, yielding the results in input order."""
+        pending = []
+        for samples in buffers:
+            pending.append(self.submit(samples, sample_rate, format))
+            # Yield finished results while feeding so memory stays bounded.
+            while pending and pending[0].done():
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "Encoder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
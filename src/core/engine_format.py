@@ -0,0 +1,36 @@
+"""
+Engine audio format.
+
+Every asset is converted once, at load time, to the engine format, and the
+output device is opened with the same format, so nothing is resampled or
+remixed per trigger.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+import miniaudio
+
+
+@dataclass(frozen=True)
+class EngineFormat:
+    sample_rate: int = 44100
+    channels: int = 2
+
+
+DEFAULT_FORMAT = EngineFormat()
+
+
+def device_format(backends: Optional[List[miniaudio.Backend]] = None) -> EngineFormat:
+    """Native format of the first playback device, or the default when it reports none."""
+    try:
+        playbacks = miniaudio.Devices(backends=backends).get_playbacks()
+    except miniaudio.MiniaudioError:
+        return DEFAULT_FORMAT
+
+    for device in playbacks[:1]:
+        for fmt in device.get("formats", []):
+            sample_rate = fmt.get("samplerate") or DEFAULT_FORMAT.sample_rate
+            channels = min(fmt.get("channels") or DEFAULT_FORMAT.channels, DEFAULT_FORMAT.channels)
+            return EngineFormat(sample_rate, channels)
+    return DEFAULT_FORMAT
@@ -0,0 +1,100 @@
+"""
+Loop buffer.
+
+Renders a timeline region into a buffer that plays as a seamless loop:
+the tail of a step that runs past the end of the region wraps around
+onto its start, so the loop repeats without a gap or a cut-off step.
+
+Every step is rendered once and kept. When keys change, only the steps
+that were added, moved or re-automated are rendered, and only their
+slices of the buffer are updated, by subtracting the old step and adding
+the new one. Once the loop is rendered, playing it costs the device
+callback a slice copy per buffer.
+"""
+
+import random
+from typing import Any, Dict, Sequence, Tuple
+
+import numpy as np
+
+from src.core import memory
+from src.core.automation import TrackAutomation
+from src.core.render import Renderer
+from src.core.variation import SamplePicker
+from src.utils import tracing
+
+
+# A step is identified by its track, frame and rounded parameters; rounding
+# matches the automation tolerances so that re-evaluating unchanged keys does
+# not re-render them.
+_StepKey = Tuple[int, int, int, int, int]
+
+
+class LoopBuffer:
+    """The ``[start_sec, end_sec)`` region of a timeline as a loop."""
+
+    def __init__(self, renderer: Renderer, start_sec: float, end_sec: float) -> None:
+        fmt = renderer.bank.format
+        self.renderer = renderer
+        self.start_sec = start_sec
+        self.end_sec = end_sec
+        self.sample_rate = fmt.sample_rate
+        self.frames = max(1, int(round((end_sec - start_sec) * fmt.sample_rate)))
+        self.samples = np.zeros((self.frames, fmt.channels), dtype=np.float32)
+        self._steps: Dict[_StepKey, np.ndarray] = {}
+        memory.register("loop_buffer", self)
+
+    @property
+    def duration_sec(self) -> float:
+        return self.frames / self.sample_rate
+
+    def memory_usage(self) -> Dict[str, int]:
+        return {
+            "buffer": self.samples.nbytes,
+            "steps": sum(step.nbytes for step in self._steps.values()),
+        }
+
+    def update(self, tracks: Sequence[Dict[str, Any]]) -> int:
+        """Bring the buffer in line with ``tracks``; returns the number of steps added or removed."""
+        wanted = self._wanted(tracks)
+        removed = [key for key in self._steps if key not in wanted]
+        added = [key for key in wanted if key not in self._steps]
+
+        with tracing.span("loop.update", removed=len(removed), added=len(added)):
+            for key in removed:
+                self._accumulate(key[1], self._steps.pop(key), -1.0)
+            for key in added:
+                track_index, offset = key[0], key[1]
+                x, y, gain_db = wanted[key]
+                # Seeded by position so a key moved back renders the same step again.
+                rng = random.Random(f"{track_index}:{offset}")
+                step = self.renderer.render_samples(x, y, rng, picker=SamplePicker(self.renderer.variation.layers))
+                step *= np.float32(10.0 ** (gain_db / 20.0))
+                self._steps[key] = step
+                self._accumulate(offset, step, 1.0)
+        return len(removed) + len(added)
+
+    def _wanted(self, tracks: Sequence[Dict[str, Any]]) -> Dict[_StepKey, Tuple[float, float, float]]:
+        wanted = {}
+        for track_index, track in enumerate(tracks):
+            keys = np.asarray(track["keys"], dtype=np.float64)
+            keys = keys[(keys >= self.start_sec) & (keys < self.end_sec)]
+            params = (track.get("automation") or TrackAutomation()).evaluate(keys)
+            offsets = np.rint((keys - self.start_sec) * self.sample_rate).astype(np.int64) % self.frames
+            for offset, x, y, gain_db in zip(offsets.tolist(), params["x"], params["y"], params["gain_db"]):
+                key = (track_index, offset, int(round(x * 100)), int(round(y * 100)), int(round(gain_db * 2)))
+                wanted[key] = (float(x), float(y), float(gain_db))
+        return wanted
+
+    def _accumulate(self, offset: int, step: np.ndarray, sign: float) -> None:
+        """Add ``sign * step`` at ``offset``, wrapping around the end of the loop."""
+        position = offset
+        done = 0
+        while done < len(step):
+            count = min(self.frames - position, len(step) - done)
+            if sign > 0:
+                self.samples[position:position + count] += step[done:done + count]
+            else:
+                self.samples[position:position + count] -= step[done:done + count]
+            done += count
+            position = 0
@@ -0,0 +1,47 @@
+"""
+Memory accounting.
+
+Subsystems (sample bank, render caches, timeline scene...) register an
+object exposing ``memory_usage() -> Dict[str, int]`` and the report
+collects the bytes per component of every live subsystem.
+"""
+
+import weakref
+from typing import Any, Dict
+
+_subsystems: Dict[str, "weakref.ReferenceType[Any]"] = {}
+
+
+def register(subsystem: str, owner: Any) -> None:
+    """Track ``owner.memory_usage()`` under ``subsystem``; holds only a weak reference."""
+    _subsystems[subsystem] = weakref.ref(owner)
+
+
+def report() -> Dict[str, Dict[str, int]]:
+    """Bytes per component for every live subsystem."""
+    result = {}
+    for subsystem, ref in list(_subsystems.items()):
+        owner = ref()
+        if owner is None:
+            del _subsystems[subsystem]
+            continue
+        result[subsystem] = owner.memory_usage()
+    return result
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def format_report(data: Dict[str, Dict[str, int]]) -> str:
+    """Render a report as aligned text, one subsystem per block."""
+    lines = []
+    for subsystem, components in data.items():
+        lines.append(f"{subsystem}: {format_bytes(sum(components.values()))}")
+        for name, size in sorted(components.items(), key=lambda item: -item[1]):
+            lines.append(f"    {name:<24} {format_bytes(size):>10}")
+    return "\n".join(lines)
@@ -1,30 +1,96 @@
 import io
-from typing import List
+from typing import List, Optional, Tuple
+
+import numpy as np
 from pydub import AudioSegment
 
+from src.core.encoder import encode_pcm
+from src.utils import tracing
+
+
+_INT16_SCALE = 32768.0
+
+
+def to_float(samples: np.ndarray) -> np.ndarray:
+    """Convert int16 samples to float32 with a full scale of 1.0."""
+    if samples.dtype == np.int16:
+        return samples.astype(np.float32) / _INT16_SCALE
+    return np.asarray(samples, dtype=np.float32)
+
+
+def to_int16(samples: np.ndarray) -> np.ndarray:
+    """Convert full-scale float samples to int16, clipping like pydub's overlay."""
+    return np.clip(np.rint(samples * _INT16_SCALE), -32768, 32767).astype(np.int16)
+
 
 class Mixer:
-    def __init__(self):
-        self._segments: List[AudioSegment] = []
-    
+    """Sums voices in float32 and hands the result to pydub for encoding."""
+
+    def __init__(self, sample_rate: Optional[int] = None, channels: Optional[int] = None):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self._voices: List[Tuple[np.ndarray, float, int]] = []
+
     def add_segment(self, segment: AudioSegment, volume_db: float):
-        segment = segment + volume_db 
-        self._segments.append(segment)
-    
+        if self.sample_rate is not None and segment.frame_rate != self.sample_rate:
+            segment = segment.set_frame_rate(self.sample_rate)
+        if self.channels is not None and segment.channels != self.channels:
+            segment = segment.set_channels(self.channels)
+        # Gain is applied here, as pydub did, so a lone segment is encoded untouched.
+        segment = segment.set_sample_width(2) + volume_db
+        samples = np.frombuffer(segment.raw_data, dtype=np.int16).reshape(-1, segment.channels)
+        self.add_samples(samples, 0.0, sample_rate=segment.frame_rate)
+
+    def add_samples(self, samples: np.ndarray, volume_db: float, offset: int = 0, sample_rate: Optional[int] = None):
+        """Add a ``(frames, channels)`` voice starting ``offset`` frames into the mix."""
+        if self.sample_rate is None:
+            self.sample_rate = sample_rate
+        elif sample_rate is not None and sample_rate != self.sample_rate:
+            raise ValueError(f"Voice sample rate {sample_rate} does not match mixer rate {self.sample_rate}")
+        if self.channels is None:
+            self.channels = samples.shape[1]
+        elif samples.shape[1] != self.channels:
+            raise ValueError(f"Voice has {samples.shape[1]} channels, mixer has {self.channels}")
+        self._voices.append((samples, volume_db, offset))
+
+    def mix_samples(self) -> Optional[np.ndarray]:
+        """Sum every voice into a float32 ``(frames, channels)`` buffer."""
+        if len(self._voices) <= 0:
+            return None
+
+        frames = max(offset + len(samples) for samples, _, offset in self._voices)
+        result = np.zeros((frames, self.channels), dtype=np.float32)
+        with tracing.span("mixer.overlay", voices=len(self._voices)):
+            for samples, volume_db, offset in self._voices:
+                gain = np.float32(10.0 ** (volume_db / 20.0))
+                result[offset:offset + len(samples)] += to_float(samples) * gain
+        return result
+
+    def mix_int16(self) -> Optional[np.ndarray]:
+        """Mix every voice into int16; a single unscaled int16 voice is passed through."""
+        if len(self._voices) == 1:
+            samples, volume_db, offset = self._voices[0]
+            if samples.dtype == np.int16 and volume_db == 0.0 and offset == 0:
+                return samples
+        result = self.mix_samples()
+        return None if result is None else to_int16(result)
+
+    def mix(self) -> Optional[AudioSegment]:
+        """Mix every voice into a 16-bit segment."""
+        result = self.mix_int16()
+        if result is None:
+            return None
+        return AudioSegment(
+            data=result.tobytes(),
+            sample_width=2,
+            frame_rate=self.sample_rate,
+            channels=self.channels,
+        )
+
     def concat(self, format: str = "ogg") -> io.BytesIO:
-        if len(self._segments) <= 0:
+        result = self.mix_int16()
+        if result is None:
             return
-        
-        longest = None
-        for segment in self._segments:
-            if longest is None or segment.duration_seconds > longest.duration_seconds:
-                longest = segment
-        
-        result = longest
-        for segment in self._segments:
-            if segment != longest:
-                result = result.overlay(segment)
-        
-        stream: io.BytesIO = io.BytesIO()
-        result.export(stream, format=format)
-        return stream
\ No newline at end of file
+
+        with tracing.span("mixer.export", format=format):
+            return io.BytesIO(encode_pcm(result, self.sample_rate, format))
@@ -0,0 +1,175 @@
+"""
+Output device.
+
+One long-lived miniaudio playback device fed by a :class:`VoiceMixer`.
+Device settings (backend, device, buffer size, callback periods, sample
+format, thread priority) can be changed while the app runs: the device is
+reopened with the new settings and playing voices carry on.
+"""
+
+import atexit
+import threading
+import weakref
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, List, Optional
+
+import miniaudio
+import numpy as np
+
+from src.core.engine_format import DEFAULT_FORMAT, EngineFormat
+from src.core.voice_mixer import VoiceMixer, counters_dict, new_counters
+from src.utils import tracing
+
+
+SAMPLE_FORMATS = {
+    "int16": (miniaudio.SampleFormat.SIGNED16, np.int16),
+    "float32": (miniaudio.SampleFormat.FLOAT32, np.float32),
+}
+THREAD_PRIORITIES = ("idle", "lowest", "low", "normal", "high", "highest", "realtime")
+
+
+@dataclass(frozen=True)
+class DeviceSettings:
+    backend: Optional[str] = None
+    """miniaudio backend name (``"wasapi"``, ``"pulseaudio"``, ``"null"``...); default order when unset."""
+    device: Optional[str] = None
+    """Playback device name; the backend's default device when unset."""
+    buffersize_msec: int = 200
+    callback_periods: int = 0
+    """Periods the buffer is split into; 0 lets the backend decide."""
+    sample_format: str = "int16"
+    thread_priority: str = "highest"
+
+    def __post_init__(self) -> None:
+        if self.backend is not None and self.backend.upper() not in miniaudio.Backend.__members__:
+            raise ValueError(f"Unknown audio backend '{self.backend}'")
+        if self.sample_format not in SAMPLE_FORMATS:
+            raise ValueError(f"Unsupported sample format '{self.sample_format}', expected one of {list(SAMPLE_FORMATS)}")
+        if self.thread_priority not in THREAD_PRIORITIES:
+            raise ValueError(f"Unknown thread priority '{self.thread_priority}'")
+        if self.buffersize_msec <= 0 or self.callback_periods < 0:
+            raise ValueError("Buffer size must be positive and callback periods non-negative")
+
+    @property
+    def backends(self) -> Optional[List[miniaudio.Backend]]:
+        return [miniaudio.Backend[self.backend.upper()]] if self.backend else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DeviceSettings":
+        """Build settings from a dict, ignoring unknown keys; raises ValueError when invalid."""
+        names = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in names})
+
+
+# Devices still open at exit are closed before interpreter shutdown: closing one from
+# the garbage collector deadlocks against its callback thread.
+_open_devices: "weakref.WeakSet[OutputDevice]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_devices() -> None:
+    for device in list(_open_devices):
+        device.close()
+
+
+def playback_devices(backend: Optional[str] = None) -> List[str]:
+    """Names of the playback devices of a backend."""
+    try:
+        devices = miniaudio.Devices(backends=DeviceSettings(backend=backend).backends)
+        return [device["name"] for device in devices.get_playbacks()]
+    except miniaudio.MiniaudioError:
+        return []
+
+
+class OutputDevice:
+    """A playback device that stays open and mixes every voice."""
+
+    def __init__(
+        self,
+        format: EngineFormat = DEFAULT_FORMAT,
+        settings: Optional[DeviceSettings] = None,
+        counters: Optional[np.ndarray] = None,
+    ) -> None:
+        self.format = format
+        self.settings = settings or DeviceSettings()
+        self.mixer = VoiceMixer(format, SAMPLE_FORMATS[self.settings.sample_format][1], counters)
+        self._device: Optional[miniaudio.PlaybackDevice] = None
+        # Keeps the device ids referenced by the open device alive.
+        self._devices: Optional[miniaudio.Devices] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Open and start the device if it is not running."""
+        with self._lock:
+            if self._device is None:
+                self._open()
+
+    def configure(self, settings: DeviceSettings) -> None:
+        """Reopen the device with new settings; playing voices continue.
+
+        When the new settings cannot be opened, the device is reopened with
+        the previous ones and the error is raised.
+        """
+        with self._lock:
+            previous = self.settings
+            self._close()
+            self._use(settings)
+            try:
+                self._open()
+            except miniaudio.MiniaudioError:
+                self._close()
+                self._use(previous)
+                try:
+                    self._open()
+                except miniaudio.MiniaudioError as e:
+                    print(f"Could not reopen the audio device with the previous settings: {e}")
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    def stats(self) -> Dict[str, float]:
+        return counters_dict(self.mixer.counters)
+
+    def _use(self, settings: DeviceSettings) -> None:
+        self.settings = settings
+        self.mixer.dtype = SAMPLE_FORMATS[settings.sample_format][1]
+        self.mixer.counters[:] = new_counters()
+
+    def _open(self) -> None:
+        settings = self.settings
+        device_id = None
+        if settings.device:
+            self._devices = miniaudio.Devices(backends=settings.backends)
+            for info in self._devices.get_playbacks():
+                if info["name"] == settings.device:
+                    device_id = info["id"]
+                    break
+            else:
+                print(f"Audio device '{settings.device}' not found, using the default device")
+
+        with tracing.span("engine.device_open", **settings.to_dict()):
+            self._device = miniaudio.PlaybackDevice(
+                output_format=SAMPLE_FORMATS[settings.sample_format][0],
+                nchannels=self.format.channels,
+                sample_rate=self.format.sample_rate,
+                buffersize_msec=settings.buffersize_msec,
+                device_id=device_id,
+                callback_periods=settings.callback_periods,
+                backends=settings.backends,
+                thread_prio=miniaudio.ThreadPriority[settings.thread_priority.upper()],
+                app_name="Footstep Editor",
+            )
+            self._device.start(self.mixer.callback())
+        _open_devices.add(self)
+
+    def _close(self) -> None:
+        if self._device is not None:
+            self._device.close()
+            self._device = None
+        self._devices = None
+        _open_devices.discard(self)
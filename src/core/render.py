@@ -0,0 +1,241 @@
+"""
+Footstep renderer.
+
+Qt-free entry point for producing footstep variations from a sample bank:
+usable from the editor, scripts and asset pipeline workers alike.
+"""
+
+import io
+import random
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pydub import AudioSegment
+
+from src.core.automation import PARAMETERS, TrackAutomation
+from src.core.blend import BlendLayout, default_layout
+from src.core.encoder import Encoder, encode_segment
+from src.core.mixer import Mixer, to_float, to_int16
+from src.core.sample_bank import SampleBank
+from src.core.variation import SamplePicker, VariationSettings, default_resampler, pitch_ratio
+from src.utils import tracing
+
+
+MAX_GAIN_MATCH_DB = 12.0
+"""Largest loudness correction applied to a single voice."""
+_ALIGN_FADE_MS = 2.0
+
+
+def segment_to_array(segment: AudioSegment) -> np.ndarray:
+    """Return the samples of a segment as a ``(frames, channels)`` array."""
+    samples = np.array(segment.get_array_of_samples())
+    return samples.reshape(-1, segment.channels)
+
+
+def timeline_steps(
+    tracks: Sequence[Dict[str, Any]],
+    start_sec: float,
+    end_sec: Optional[float],
+    sample_rate: int,
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Frame offsets from ``start_sec`` and automated parameters of every key, track by track."""
+    frames = []
+    params: Dict[str, List[np.ndarray]] = {name: [] for name in PARAMETERS}
+    for track in tracks:
+        keys = np.sort(np.asarray(track["keys"], dtype=np.float64))
+        keys = keys[keys >= start_sec]
+        if end_sec is not None:
+            keys = keys[keys < end_sec]
+        automation = track.get("automation") or TrackAutomation()
+        with tracing.span("automation.evaluate", keys=len(keys)):
+            values = automation.evaluate(keys)
+        frames.append(np.rint((keys - start_sec) * sample_rate).astype(np.int64))
+        for name in PARAMETERS:
+            params[name].append(values[name])
+    if not frames:
+        return np.zeros(0, dtype=np.int64), {name: np.zeros(0) for name in PARAMETERS}
+    return np.concatenate(frames), {name: np.concatenate(arrays) for name, arrays in params.items()}
+
+
+class Renderer:
+    def __init__(
+        self,
+        bank: SampleBank,
+        seed: Optional[int] = None,
+        variation: Optional[VariationSettings] = None,
+        layout: Optional[BlendLayout] = None,
+        gain_match: bool = True,
+        align_onsets: bool = True,
+    ) -> None:
+        self.bank = bank
+        self.variation = variation or VariationSettings()
+        self.layout = layout or default_layout()
+        # Both use the bank's analysis index and do nothing without one.
+        self.gain_match = gain_match
+        self.align_onsets = align_onsets
+        self.resampler = default_resampler()
+        self._rng = random.Random(seed)
+        self._picker = SamplePicker(self.variation.layers)
+
+    def render(
+        self,
+        x: float,
+        y: float,
+        rng: Optional[random.Random] = None,
+        materials: Optional[Sequence[str]] = None,
+        picker: Optional[SamplePicker] = None,
+    ) -> AudioSegment:
+        """Render one footstep variation for a pad position.
+
+        ``materials`` optionally replaces the layout materials, in layout order.
+        ``picker`` carries the no-repeat history; the renderer's own is used by default.
+        """
+        samples = self.render_samples(x, y, rng, materials, picker)
+        fmt = self.bank.format
+        return AudioSegment(
+            data=to_int16(samples).tobytes(),
+            sample_width=2,
+            frame_rate=fmt.sample_rate,
+            channels=fmt.channels,
+        )
+
+    def render_samples(
+        self,
+        x: float,
+        y: float,
+        rng: Optional[random.Random] = None,
+        materials: Optional[Sequence[str]] = None,
+        picker: Optional[SamplePicker] = None,
+    ) -> np.ndarray:
+        """Like :meth:`render`, as ``(frames, channels)`` float32 samples; empty when nothing is audible."""
+        rng = rng or self._rng
+        picker = picker or self._picker
+        settings = self.variation
+        picker.history = settings.layers
+        layout = self.layout.with_materials(materials) if materials else self.layout
+        gains = layout.gains(x, y)
+        layer_db = -10.0 * np.log10(settings.layers)
+
+        with tracing.span("renderer.render", voices=len(gains) * settings.layers):
+            fmt = self.bank.format
+            mixer = Mixer(fmt.sample_rate, fmt.channels)
+            step_rate = 1.0 + rng.uniform(-settings.rate, settings.rate)
+            analysis = self.bank.analysis
+            voices: List[Tuple[np.ndarray, float, int, int]] = []
+            for material, volume_db in gains:
+                for _ in range(settings.layers):
+                    idx = picker.pick(material, self.bank.variations(material), rng, settings.no_repeat)
+                    with tracing.span("bank.lookup", material=material, idx=idx):
+                        samples = self.bank.samples(material, idx)
+
+                    ratio = step_rate * pitch_ratio(rng.uniform(-settings.pitch_semitones, settings.pitch_semitones))
+                    if ratio != 1.0:
+                        with tracing.span("variation.resample", ratio=round(ratio, 4)):
+                            samples = self.resampler.resample(to_float(samples), ratio)
+
+                    gain_db = volume_db + layer_db
+                    onset = 0
+                    entry = analysis.get(material, idx) if analysis is not None else None
+                    if entry is not None:
+                        if self.gain_match:
+                            correction = analysis.reference_lufs() - entry.lufs
+                            gain_db += float(np.clip(correction, -MAX_GAIN_MATCH_DB, MAX_GAIN_MATCH_DB))
+                        if self.align_onsets:
+                            onset = int(entry.onset_sec * fmt.sample_rate / ratio)
+
+                    jitter = int(rng.uniform(0.0, settings.jitter_ms) * fmt.sample_rate / 1000.0)
+                    voices.append((samples, gain_db, jitter, onset))
+
+            # Line every transient up with the earliest one by skipping the lead-in of later voices.
+            first_onset = min((onset for _, _, _, onset in voices), default=0)
+            fade = int(_ALIGN_FADE_MS * fmt.sample_rate / 1000.0)
+            for samples, gain_db, jitter, onset in voices:
+                skip = onset - first_onset
+                if skip > 0:
+                    # Copy: the fade must not touch bank (possibly memory-mapped) samples.
+                    samples = np.array(to_float(samples[skip:]), copy=samples.dtype != np.int16)
+                    ramp = min(fade, len(samples))
+                    samples[:ramp] *= np.linspace(0.0, 1.0, ramp, endpoint=False, dtype=np.float32)[:, None]
+                mixer.add_samples(samples, gain_db, jitter)
+            mix = mixer.mix_samples()
+            return mix if mix is not None else np.zeros((0, fmt.channels), dtype=np.float32)
+
+    def render_timeline(
+        self,
+        tracks: Sequence[Dict[str, Any]],
+        start_sec: float = 0.0,
+        end_sec: Optional[float] = None,
+        seed: Optional[int] = None,
+    ) -> Optional[np.ndarray]:
+        """Render the keys of timeline tracks between ``start_sec`` and ``end_sec``.
+
+        Each track is a dict with ``keys`` in seconds and an optional
+        ``automation`` (:class:`TrackAutomation`); the pad position and gain of
+        all keys of a track are evaluated at once. Returns ``(frames, channels)``
+        float32 samples starting at ``start_sec``, or None without keys.
+        """
+        rng, picker = self._sequence(seed)
+        with tracing.span("renderer.render_timeline", tracks=len(tracks)):
+            frames, params = timeline_steps(tracks, start_sec, end_sec, self.bank.format.sample_rate)
+            return self.render_steps(frames, params, rng, picker)
+
+    def render_steps(
+        self,
+        frames: np.ndarray,
+        params: Dict[str, np.ndarray],
+        rng: Optional[random.Random] = None,
+        picker: Optional[SamplePicker] = None,
+    ) -> Optional[np.ndarray]:
+        """Mix one step per entry of ``frames``, starting that many frames in.
+
+        ``params`` holds the ``x``, ``y`` and ``gain_db`` of every step, as
+        returned by :func:`timeline_steps`. Returns None without steps.
+        """
+        fmt = self.bank.format
+        mixer = Mixer(fmt.sample_rate, fmt.channels)
+        for offset, x, y, gain_db in zip(frames.tolist(), params["x"], params["y"], params["gain_db"]):
+            step = self.render_samples(float(x), float(y), rng, picker=picker)
+            mixer.add_samples(step, float(gain_db), offset)
+        return mixer.mix_samples()
+
+    def render_stream(self, x: float, y: float, format: str = "wav") -> io.BytesIO:
+        """Render one variation and encode it."""
+        segment = self.render(x, y)
+        with tracing.span("renderer.export", format=format):
+            return io.BytesIO(encode_segment(segment, format))
+
+    def render_variations(
+        self, x: float, y: float, count: int, seed: Optional[int] = None
+    ) -> List[np.ndarray]:
+        """Render ``count`` variations as ``(frames, channels)`` int16 arrays."""
+        rng, picker = self._sequence(seed)
+        return [segment_to_array(self.render(x, y, rng, picker=picker)) for _ in range(count)]
+
+    def render_to_files(
+        self,
+        x: float,
+        y: float,
+        count: int,
+        directory: Path,
+        format: str = "wav",
+        seed: Optional[int] = None,
+        prefix: str = "footstep",
+    ) -> List[Path]:
+        """Render ``count`` variations into ``directory``."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        rng, picker = self._sequence(seed)
+
+        paths = [directory / f"{prefix}-{i + 1:03d}.{format}" for i in range(count)]
+        buffers = (segment_to_array(self.render(x, y, rng, picker=picker)) for _ in paths)
+        with Encoder() as encoder:
+            for path, data in zip(paths, encoder.map(buffers, self.bank.format.sample_rate, format)):
+                path.write_bytes(data)
+        return paths
+
+    def _sequence(self, seed: Optional[int]) -> Tuple[random.Random, SamplePicker]:
+        """Random source and picker for a batch; seeded batches are reproducible."""
+        if seed is None:
+            return self._rng, self._picker
+        return random.Random(seed), SamplePicker(self.variation.layers)
@@ -0,0 +1,75 @@
+"""
+Shared-memory ring buffer.
+
+Single-producer, single-consumer ring of float32 frames in a
+``multiprocessing.shared_memory`` block, so audio crosses processes
+without being pickled. The read and write positions are monotonic frame
+counters in the block header; each side only ever writes its own counter.
+"""
+
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+
+_HEADER = 2  # int64 write and read positions
+_WRITE = 0
+_READ = 1
+
+
+class SharedRingBuffer:
+    def __init__(self, capacity: int, channels: int, name: Optional[str] = None) -> None:
+        """Create a ring of ``capacity`` frames, or attach to the one called ``name``."""
+        self.capacity = capacity
+        self.channels = channels
+        size = _HEADER * 8 + capacity * channels * 4
+        self._owner = name is None
+        self._shm = shared_memory.SharedMemory(name=name, create=self._owner, size=size)
+        self._positions = np.ndarray((_HEADER,), dtype=np.int64, buffer=self._shm.buf)
+        self._data = np.ndarray((capacity, channels), dtype=np.float32, buffer=self._shm.buf, offset=_HEADER * 8)
+        if self._owner:
+            self._positions[:] = 0
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def available(self) -> int:
+        """Frames written and not yet read."""
+        return int(self._positions[_WRITE] - self._positions[_READ])
+
+    def free(self) -> int:
+        return self.capacity - self.available()
+
+    def write(self, samples: np.ndarray) -> int:
+        """Write as many frames as fit; returns the number written."""
+        count = min(len(samples), self.free())
+        if count <= 0:
+            return 0
+        position = int(self._positions[_WRITE])
+        start = position % self.capacity
+        first = min(count, self.capacity - start)
+        self._data[start:start + first] = samples[:first]
+        self._data[:count - first] = samples[first:count]
+        self._positions[_WRITE] = position + count
+        return count
+
+    def read(self, frames: int) -> np.ndarray:
+        """Read up to ``frames`` frames into a new array."""
+        count = min(frames, self.available())
+        position = int(self._positions[_READ])
+        start = position % self.capacity
+        first = min(count, self.capacity - start)
+        out = np.empty((count, self.channels), dtype=np.float32)
+        out[:first] = self._data[start:start + first]
+        out[first:] = self._data[:count - first]
+        self._positions[_READ] = position + count
+        return out
+
+    def close(self) -> None:
+        # Views must go before the mapping can be closed.
+        del self._positions, self._data
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
@@ -0,0 +1,265 @@
+"""
+Footstep sample bank.
+
+Decodes the footstep assets once and keeps them in memory, keyed by
+material and variation index. Has no Qt dependency. Which files make up
+each material comes from an :class:`AssetIndex` of the library folders.
+
+A loaded bank can be saved as a pack (one ``.npy`` sample file plus a JSON
+index) and reopened memory-mapped, so several processes share the same
+pages instead of decoding the assets each.
+
+Every asset is converted to a single engine format (sample rate and
+channel count) when it is decoded.
+
+Samples are stored as int16 (compact) or float32 (``precision="float32"``,
+full scale 1.0). With a ``memory_budget`` the least recently used materials
+are evicted once the budget is exceeded and decoded again on next use.
+"""
+
+import json
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import miniaudio
+import numpy as np
+from pydub import AudioSegment
+
+from src.core.asset_index import AssetIndex
+from src.core.engine_format import DEFAULT_FORMAT, EngineFormat
+
+
+ASSETS_DIR = Path(__file__).parent.parent / "assets"
+FOOTSTEPS_DIR = ASSETS_DIR / "sfx" / "footsteps"
+
+_PACK_SAMPLES = "samples.npy"
+_PACK_INDEX = "index.json"
+_PACK_ANALYSIS = "analysis.json"
+
+PRECISIONS = {"int16": np.int16, "float32": np.float32}
+_INT16_SCALE = 32768.0
+
+
+def decode_file(file_path: Path, format: Optional[EngineFormat] = None) -> Tuple[np.ndarray, int]:
+    """Decode an audio file into ``(frames, channels)`` int16 samples.
+
+    The file is converted to ``format`` when given, otherwise kept in its native format.
+    """
+    if format is None:
+        info = miniaudio.get_file_info(str(file_path))
+        format = EngineFormat(info.sample_rate, info.nchannels)
+    decoded = miniaudio.decode_file(
+        str(file_path),
+        output_format=miniaudio.SampleFormat.SIGNED16,
+        nchannels=format.channels,
+        sample_rate=format.sample_rate,
+    )
+    samples = np.frombuffer(decoded.samples, dtype=np.int16).reshape(-1, decoded.nchannels)
+    return samples, decoded.sample_rate
+
+
+class SampleBank:
+    def __init__(
+        self,
+        root: Path = FOOTSTEPS_DIR,
+        precision: str = "int16",
+        memory_budget: Optional[int] = None,
+        format: EngineFormat = DEFAULT_FORMAT,
+        assets: Optional[AssetIndex] = None,
+    ) -> None:
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unsupported precision '{precision}', expected one of {list(PRECISIONS)}")
+        self.root = Path(root)
+        # Scanned on first use when not given; packs have none.
+        self._assets = assets
+        self._scan_assets = assets is None
+        self.format = format
+        self.precision = precision
+        self.memory_budget = memory_budget
+        self._samples: Dict[Tuple[str, int], np.ndarray] = {}
+        self._rates: Dict[Tuple[str, int], int] = {}
+        self._variations: Dict[str, int] = {}
+        self._resident: Set[str] = set()
+        self._last_used: Dict[str, int] = {}
+        self._clock = 0
+        self._mapped = False
+        self.evictions = 0
+        # AnalysisIndex attached by src.core.analysis.build_index.
+        self.analysis = None
+
+    @property
+    def materials(self) -> List[str]:
+        """Materials currently loaded."""
+        return list(self._variations)
+
+    @property
+    def assets(self) -> Optional[AssetIndex]:
+        """Index of the asset files, scanned from ``root`` on first use."""
+        if self._assets is None and self._scan_assets:
+            self._assets = AssetIndex([self.root])
+            self._assets.scan()
+        return self._assets
+
+    def available_materials(self) -> List[str]:
+        """Materials present on disk."""
+        return self.assets.materials()
+
+    def load(self, materials: Optional[Iterable[str]] = None) -> None:
+        """Decode every variation of the given materials (all by default)."""
+        if materials is None:
+            materials = self.available_materials()
+
+        for material in materials:
+            self._load_material(material)
+            self._touch(material)
+            self._enforce_budget(keep={material})
+
+    def reload(self, materials: Iterable[str]) -> None:
+        """Decode loaded materials again after their files changed on disk."""
+        for material in materials:
+            if material not in self._variations or self._mapped:
+                continue
+            resident = material in self._resident
+            for idx in range(1, self._variations[material] + 1):
+                self._samples.pop((material, idx), None)
+            self._resident.discard(material)
+            if not self.assets.variations(material):
+                del self._variations[material]
+            elif resident:
+                self._load_material(material)
+                self._enforce_budget(keep={material})
+
+    def _load_material(self, material: str) -> None:
+        dtype = PRECISIONS[self.precision]
+        entries = self.assets.variations(material)
+        for entry in entries:
+            samples, rate = decode_file(Path(entry.path), self.format)
+            if dtype is np.float32:
+                samples = samples.astype(np.float32) / _INT16_SCALE
+            self._samples[(material, entry.variation)] = samples
+            self._rates[(material, entry.variation)] = rate
+        self._variations[material] = len(entries)
+        self._resident.add(material)
+
+    def _touch(self, material: str) -> None:
+        self._clock += 1
+        self._last_used[material] = self._clock
+
+    def evict(self, material: str) -> None:
+        """Drop the samples of a material; they are decoded again on next use."""
+        if self._mapped or material not in self._resident:
+            return
+        for idx in range(1, self._variations[material] + 1):
+            self._samples.pop((material, idx), None)
+        self._resident.discard(material)
+        self.evictions += 1
+
+    def _enforce_budget(self, keep: Set[str]) -> None:
+        if self.memory_budget is None or self._mapped:
+            return
+        candidates = sorted(self._resident - keep, key=lambda m: self._last_used.get(m, 0))
+        while self.resident_bytes() > self.memory_budget and candidates:
+            self.evict(candidates.pop(0))
+
+    def resident_bytes(self) -> int:
+        """Bytes of sample data held in this process."""
+        if self._mapped:
+            return 0
+        return sum(samples.nbytes for samples in self._samples.values())
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Bytes of sample data per material (mapped packs are reported separately)."""
+        usage: Dict[str, int] = {}
+        for (material, _), samples in self._samples.items():
+            name = f"{material} (mapped)" if self._mapped else material
+            usage[name] = usage.get(name, 0) + samples.nbytes
+        return usage
+
+    def variations(self, material: str) -> int:
+        """Number of variations loaded for a material."""
+        return self._variations.get(material, 0)
+
+    def samples(self, material: str, idx: int) -> np.ndarray:
+        """Return the ``(frames, channels)`` samples of a variation (1-based index)."""
+        if material not in self._resident and material in self._variations:
+            self._load_material(material)
+            self._enforce_budget(keep={material})
+        self._touch(material)
+        return self._samples[(material, idx)]
+
+    def sample_rate(self, material: str, idx: int) -> int:
+        return self._rates[(material, idx)]
+
+    def segment(self, material: str, idx: int) -> AudioSegment:
+        """Return a variation as a pydub segment."""
+        samples = self.samples(material, idx)
+        if samples.dtype != np.int16:
+            samples = np.clip(samples * _INT16_SCALE, -32768, 32767).astype(np.int16)
+        return AudioSegment(
+            data=np.ascontiguousarray(samples).tobytes(),
+            sample_width=2,
+            frame_rate=self._rates[(material, idx)],
+            channels=samples.shape[1],
+        )
+
+    def save_pack(self, directory: Path) -> Path:
+        """Write the loaded samples as a pack that can be memory-mapped.
+
+        Samples are streamed into the pack one variation at a time; evicted
+        materials are decoded again on the way, within the memory budget.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        dtype = np.dtype(PRECISIONS[self.precision])
+        index: Dict[str, List[List[int]]] = {}
+        offset = 0
+        part = directory / (_PACK_SAMPLES + ".part")
+        with part.open("wb") as f:
+            for material, count in list(self._variations.items()):
+                entries = index.setdefault(material, [])
+                for idx in range(1, count + 1):
+                    samples = np.ascontiguousarray(self.samples(material, idx), dtype=dtype)
+                    entries.append([offset, len(samples), self._rates[(material, idx)]])
+                    f.write(samples.tobytes())
+                    offset += len(samples)
+
+        header = {
+            "descr": np.lib.format.dtype_to_descr(dtype),
+            "fortran_order": False,
+            "shape": (offset, self.format.channels),
+        }
+        with (directory / _PACK_SAMPLES).open("wb") as f, part.open("rb") as data:
+            np.lib.format.write_array_header_1_0(f, header)
+            shutil.copyfileobj(data, f)
+        part.unlink()
+
+        pack_format = {"sample_rate": self.format.sample_rate, "channels": self.format.channels}
+        (directory / _PACK_INDEX).write_text(json.dumps({"format": pack_format, "materials": index}))
+        if self.analysis is not None:
+            self.analysis.save(directory / _PACK_ANALYSIS)
+        return directory
+
+    @classmethod
+    def open_pack(cls, directory: Path, mmap: bool = True) -> "SampleBank":
+        """Open a pack written by :meth:`save_pack`, memory-mapped by default."""
+        directory = Path(directory)
+        data = np.load(directory / _PACK_SAMPLES, mmap_mode="r" if mmap else None)
+        index = json.loads((directory / _PACK_INDEX).read_text())
+
+        bank = cls(precision=np.dtype(data.dtype).name, format=EngineFormat(**index["format"]))
+        bank._mapped = mmap
+        bank._scan_assets = False
+        for material, entries in index["materials"].items():
+            for idx, (offset, frames, rate) in enumerate(entries, start=1):
+                bank._samples[(material, idx)] = data[offset:offset + frames]
+                bank._rates[(material, idx)] = rate
+            bank._variations[material] = len(entries)
+            bank._resident.add(material)
+
+        if (directory / _PACK_ANALYSIS).exists():
+            from src.core.analysis import AnalysisIndex
+
+            bank.analysis = AnalysisIndex.load(directory / _PACK_ANALYSIS)
+        return bank
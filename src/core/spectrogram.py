@@ -0,0 +1,127 @@
+"""
+Waveform and spectrogram tiles.
+
+A render is shown as a strip of tiles, each ``TILE_COLUMNS`` pixel columns
+wide: a min/max waveform on top of a short-time spectrum. Zoom levels are
+powers of two frames per column, so a tile covers the same frames
+whatever the widget size and can be cached per level. Every column of a
+tile is computed at once: its waveform with one reduction over a reshaped
+view of the samples and its spectrum with one FFT over a gathered block
+of windows. Tiles come out as palette indices; :data:`PALETTE` gives the
+colours.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+TILE_COLUMNS = 256
+WAVEFORM_ROWS = 96
+SPECTRUM_ROWS = 256
+FFT_SIZE = 2 * SPECTRUM_ROWS
+MIN_LEVEL = 2
+MAX_LEVEL = 16
+FLOOR_DB = -90.0
+
+SPECTRUM_COLORS = 240
+"""Palette entries 0..239 run from silence to full scale."""
+WAVEFORM_BACKGROUND = 254
+WAVEFORM_FOREGROUND = 255
+
+# Silence, mid level and full scale, matching the editor theme.
+_STOPS = np.array([[255, 255, 255], [139, 92, 246], [31, 41, 55]], dtype=np.float64)
+
+
+def _palette() -> np.ndarray:
+    palette = np.zeros((256, 3), dtype=np.uint8)
+    position = np.linspace(0.0, 2.0, SPECTRUM_COLORS)
+    for channel in range(3):
+        palette[:SPECTRUM_COLORS, channel] = np.interp(position, [0.0, 1.0, 2.0], _STOPS[:, channel])
+    palette[WAVEFORM_BACKGROUND] = (255, 255, 255)
+    palette[WAVEFORM_FOREGROUND] = (139, 92, 246)
+    return palette
+
+
+PALETTE = _palette()
+"""``(256, 3)`` RGB colours of the tile palette indices."""
+
+_WINDOW = np.hanning(FFT_SIZE).astype(np.float32)
+# Full-scale sine through the window reads 0 dB.
+_REFERENCE = float(_WINDOW.sum()) / 2.0
+
+
+def fit_level(frames: int, columns: int) -> int:
+    """Coarsest level at which ``frames`` fit in ``columns``, within the level range."""
+    per_column = max(1, -(-frames // max(1, columns)))
+    return int(np.clip(int(np.ceil(np.log2(per_column))), MIN_LEVEL, MAX_LEVEL))
+
+
+def tile_count(frames: int, level: int) -> int:
+    return max(1, -(-frames // (TILE_COLUMNS << level)))
+
+
+def tile_span(level: int, index: int) -> Tuple[int, int]:
+    """First and last-plus-one frame covered by a tile."""
+    width = TILE_COLUMNS << level
+    return index * width, (index + 1) * width
+
+
+def waveform_columns(samples: np.ndarray, level: int, index: int) -> np.ndarray:
+    """``(TILE_COLUMNS, 2)`` min and max of every column of a tile, over all channels."""
+    hop = 1 << level
+    start, end = tile_span(level, index)
+    block = samples[start:min(end, len(samples))]
+    result = np.zeros((TILE_COLUMNS, 2), dtype=np.float32)
+    full = len(block) // hop
+    if full:
+        columns = block[:full * hop].reshape(full, -1)
+        result[:full, 0] = columns.min(axis=1)
+        result[:full, 1] = columns.max(axis=1)
+    if full < TILE_COLUMNS and len(block) > full * hop:
+        rest = block[full * hop:]
+        result[full] = rest.min(), rest.max()
+    return result
+
+
+def spectrum_columns(samples: np.ndarray, level: int, index: int) -> np.ndarray:
+    """``(TILE_COLUMNS, SPECTRUM_ROWS)`` level in dB of the window centred on every column."""
+    if not len(samples):
+        return np.full((TILE_COLUMNS, SPECTRUM_ROWS), FLOOR_DB)
+    hop = 1 << level
+    start, _ = tile_span(level, index)
+    centers = start + np.arange(TILE_COLUMNS, dtype=np.int64) * hop + hop // 2
+    positions = centers[:, None] + np.arange(-FFT_SIZE // 2, FFT_SIZE // 2, dtype=np.int64)
+    inside = (positions >= 0) & (positions < len(samples))
+    frames = samples[np.clip(positions, 0, max(0, len(samples) - 1))]
+    if frames.ndim == 3:
+        frames = frames.mean(axis=2, dtype=np.float32)
+    frames = np.where(inside, frames, np.float32(0.0)) * _WINDOW
+    magnitude = np.abs(np.fft.rfft(frames, axis=1)[:, :SPECTRUM_ROWS])
+    return 20.0 * np.log10(magnitude / _REFERENCE + 1e-12)
+
+
+def render_tile(samples: np.ndarray, level: int, index: int) -> np.ndarray:
+    """Palette indices of a tile, ``(WAVEFORM_ROWS + SPECTRUM_ROWS, TILE_COLUMNS)`` uint8.
+
+    ``samples`` is ``(frames, channels)`` float32 at full scale 1.0. Low
+    frequencies are at the bottom of the spectrum.
+    """
+    samples = np.asarray(samples)
+    if samples.dtype == np.int16:
+        samples = samples.astype(np.float32) / 32768.0
+
+    peaks = np.clip(waveform_columns(samples, level, index), -1.0, 1.0)
+    # Row 0 is the top of the strip, full scale positive.
+    rows = (np.arange(WAVEFORM_ROWS, dtype=np.float32) + 0.5) / WAVEFORM_ROWS
+    levels = 1.0 - 2.0 * rows
+    half_row = 1.0 / WAVEFORM_ROWS
+    wave = (levels[:, None] >= peaks[None, :, 0] - half_row) & (levels[:, None] <= peaks[None, :, 1] + half_row)
+    start, _ = tile_span(level, index)
+    wave[:, max(0, -(-(len(samples) - start) >> level)):] = False
+    waveform = np.where(wave, WAVEFORM_FOREGROUND, WAVEFORM_BACKGROUND).astype(np.uint8)
+
+    db = spectrum_columns(samples, level, index)
+    scaled = (np.clip(db, FLOOR_DB, 0.0) - FLOOR_DB) * ((SPECTRUM_COLORS - 1) / -FLOOR_DB)
+    spectrum = scaled.astype(np.uint8).T[::-1]
+    return np.ascontiguousarray(np.vstack([waveform, spectrum]))
@@ -0,0 +1,172 @@
+"""
+Timeline export.
+
+Renders the keys of a long timeline into one audio file. The timeline is
+cut into fixed-length chunks, rendered on a process pool sharing a
+memory-mapped bank pack as in atlas export. A step is rendered with the
+chunk its key falls in; its tail runs on past the end of that chunk and is
+added onto the following ones as chunks are stitched, in order, into the
+file. Only the chunks in flight are held in memory.
+
+Every chunk has its own seeded random source and sample picker, so an
+export comes out the same whatever the number of workers.
+"""
+
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from src.core.atlas import WavWriter, ordered
+from src.core.blend import BlendLayout
+from src.core.encoder import FORMATS, encode_pcm
+from src.core.mixer import to_int16
+from src.core.render import Renderer, timeline_steps
+from src.core.sample_bank import SampleBank
+from src.core.variation import SamplePicker, VariationSettings
+from src.utils import tracing
+
+
+CHUNK_SEC = 10.0
+"""Length of the timeline slice rendered as one task."""
+
+# Below this many steps, spawning a pool costs more than it saves.
+_POOL_THRESHOLD = 256
+
+_renderer: Optional[Renderer] = None
+
+
+@dataclass
+class _Chunk:
+    seed: str
+    frames: np.ndarray
+    """Step offsets from the start of the chunk."""
+    params: Dict[str, np.ndarray]
+
+
+def _render(renderer: Renderer, chunk: _Chunk) -> Optional[np.ndarray]:
+    if not len(chunk.frames):
+        return None
+    rng = random.Random(chunk.seed)
+    return renderer.render_steps(chunk.frames, chunk.params, rng, SamplePicker(renderer.variation.layers))
+
+
+def _init_worker(
+    pack_dir: str,
+    layout: BlendLayout,
+    variation: VariationSettings,
+    gain_match: bool,
+    align_onsets: bool,
+) -> None:
+    global _renderer
+    _renderer = Renderer(
+        SampleBank.open_pack(Path(pack_dir)),
+        variation=variation,
+        layout=layout,
+        gain_match=gain_match,
+        align_onsets=align_onsets,
+    )
+
+
+def _render_chunk(chunk: _Chunk) -> Optional[np.ndarray]:
+    return _render(_renderer, chunk)
+
+
+def _stitch(writer: WavWriter, mixes: Iterable[Optional[np.ndarray]], count: int, chunk_frames: int) -> None:
+    """Write chunk mixes back to back, adding each one's overhang onto the next."""
+    carry = np.zeros((0, writer.channels), dtype=np.float32)
+    for index, mix in enumerate(mixes):
+        if mix is None:
+            mix = carry[:0]
+        last = index == count - 1
+        length = max(len(mix), len(carry), 0 if last else chunk_frames)
+        block = np.zeros((length, writer.channels), dtype=np.float32)
+        block[:len(carry)] += carry
+        block[:len(mix)] += mix
+        if last:
+            writer.write(to_int16(block))
+        else:
+            writer.write(to_int16(block[:chunk_frames]))
+            carry = block[chunk_frames:]
+
+
+def export_timeline(
+    renderer: Renderer,
+    tracks: Sequence[Dict[str, Any]],
+    path: Path,
+    start_sec: float = 0.0,
+    end_sec: Optional[float] = None,
+    format: str = "wav",
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+    chunk_sec: float = CHUNK_SEC,
+) -> int:
+    """Render the keys of ``tracks`` in ``[start_sec, end_sec)`` into ``path``.
+
+    The file starts at ``start_sec`` and runs until the tail of the last
+    step ends. Returns its length in frames; without keys nothing is
+    written and 0 is returned.
+    """
+    if format not in FORMATS or format == "raw":
+        raise ValueError(f"Unsupported export format '{format}'")
+
+    fmt = renderer.bank.format
+    frames, params = timeline_steps(tracks, start_sec, end_sec, fmt.sample_rate)
+    if not len(frames):
+        return 0
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+
+    chunk_frames = max(1, int(round(chunk_sec * fmt.sample_rate)))
+    order = np.argsort(frames, kind="stable")
+    frames = frames[order]
+    params = {name: values[order] for name, values in params.items()}
+    bounds = np.searchsorted(frames, np.arange(int(frames[-1]) // chunk_frames + 2) * chunk_frames)
+    chunks: List[_Chunk] = [
+        _Chunk(
+            f"{seed}:{index}",
+            frames[first:last] - index * chunk_frames,
+            {name: values[first:last] for name, values in params.items()},
+        )
+        for index, (first, last) in enumerate(zip(bounds[:-1], bounds[1:]))
+    ]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    wav_path = path if format == "wav" else path.with_suffix(".tmp.wav")
+    with tracing.span("timeline.export", steps=len(frames), chunks=len(chunks), workers=workers), \
+            wav_path.open("wb") as f:
+        writer = WavWriter(f, fmt.sample_rate, fmt.channels)
+        if workers > 1 and len(frames) >= _POOL_THRESHOLD:
+            pack_dir = tempfile.mkdtemp(prefix="footstep-export-")
+            try:
+                renderer.bank.save_pack(Path(pack_dir))
+                context = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(pack_dir, renderer.layout, renderer.variation, renderer.gain_match, renderer.align_onsets),
+                ) as pool:
+                    _stitch(writer, ordered(pool, _render_chunk, chunks, workers * 2), len(chunks), chunk_frames)
+            finally:
+                shutil.rmtree(pack_dir, ignore_errors=True)
+        else:
+            _stitch(writer, (_render(renderer, chunk) for chunk in chunks), len(chunks), chunk_frames)
+        writer.close()
+
+    if format != "wav":
+        with tracing.span("timeline.encode", format=format):
+            pcm = np.memmap(wav_path, dtype="<i2", mode="r", offset=writer.data_offset)
+            path.write_bytes(encode_pcm(pcm.reshape(-1, fmt.channels), fmt.sample_rate, format))
+            del pcm
+        wav_path.unlink()
+    return writer.frames
@@ -0,0 +1,133 @@
+"""
+Footstep variation.
+
+Per-voice pitch, per-step playback rate, timing jitter and no-repeat sample
+selection. Pitch and rate are applied by resampling with a precomputed
+polyphase windowed-sinc filter bank, evaluated in vectorized blocks.
+"""
+
+import random
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# Fraction of the Nyquist band kept by the resampling filters.
+_MAX_CUTOFF = 0.95
+
+
+@dataclass
+class VariationSettings:
+    pitch_semitones: float = 0.5
+    """Maximum random pitch offset of each voice, in semitones (±)."""
+    rate: float = 0.03
+    """Maximum random playback-rate change of a whole step, as a fraction (±)."""
+    jitter_ms: float = 3.0
+    """Maximum random start delay of each voice."""
+    layers: int = 1
+    """Voices rendered per material."""
+    no_repeat: bool = True
+    """Never pick a variation among the last ``layers`` picks of its material."""
+
+    @classmethod
+    def none(cls) -> "VariationSettings":
+        """Settings reproducing plain random picks without any processing."""
+        return cls(pitch_semitones=0.0, rate=0.0, jitter_ms=0.0, layers=1, no_repeat=False)
+
+
+class SamplePicker:
+    """Random variation picker that avoids repeating recent picks."""
+
+    def __init__(self, history: int = 1) -> None:
+        self.history = history
+        self._recent: Dict[str, Deque[int]] = {}
+
+    def pick(self, material: str, count: int, rng: random.Random, no_repeat: bool = True) -> int:
+        """Return a 1-based variation index of ``material``."""
+        recent = self._recent.get(material)
+        if recent is None or recent.maxlen != self.history:
+            recent = self._recent[material] = deque(recent or (), maxlen=self.history)
+
+        if no_repeat and recent and count > len(recent):
+            candidates = [idx for idx in range(1, count + 1) if idx not in recent]
+            idx = rng.choice(candidates)
+        else:
+            idx = rng.randint(1, count)
+        recent.append(idx)
+        return idx
+
+
+class PolyphaseResampler:
+    """Resampler using a bank of ``phases`` fractional-delay FIR filters of ``taps`` taps.
+
+    Banks are built once per anti-aliasing cutoff, quantized to ``cutoff_step``,
+    and reused for every voice.
+    """
+
+    def __init__(self, phases: int = 128, taps: int = 16, cutoff_step: float = 0.05, block: int = 4096) -> None:
+        self.phases = phases
+        self.taps = taps
+        self.cutoff_step = cutoff_step
+        self.block = block
+        self._banks: Dict[int, np.ndarray] = {}
+        self._offsets = np.arange(taps) - (taps // 2 - 1)
+
+    def bank(self, ratio: float) -> np.ndarray:
+        """Filter bank for a resampling ratio, shape ``(phases + 1, taps)``."""
+        cutoff = min(_MAX_CUTOFF, _MAX_CUTOFF / ratio)
+        key = max(1, int(cutoff / self.cutoff_step))
+        bank = self._banks.get(key)
+        if bank is None:
+            bank = self._banks[key] = self._design(key * self.cutoff_step)
+        return bank
+
+    def _design(self, cutoff: float) -> np.ndarray:
+        delays = np.arange(self.phases + 1) / self.phases
+        t = self._offsets[None, :] - delays[:, None]
+        window = np.kaiser(self.taps * 8 + 1, 8.0)
+        # Sample the Kaiser window at the tap positions over its [-taps/2, taps/2] support.
+        w = np.interp(t, np.linspace(-self.taps / 2, self.taps / 2, window.size), window, left=0.0, right=0.0)
+        h = cutoff * np.sinc(cutoff * t) * w
+        h /= h.sum(axis=1, keepdims=True)
+        return h.astype(np.float32)
+
+    def resample(self, samples: np.ndarray, ratio: float) -> np.ndarray:
+        """Play ``samples`` (frames, channels) ``ratio`` times faster; returns float32."""
+        samples = np.asarray(samples, dtype=np.float32)
+        if ratio == 1.0:
+            return samples
+
+        frames = len(samples)
+        out_frames = int((frames - 1) / ratio) + 1
+        bank = self.bank(ratio)
+        pad = self.taps
+        padded = np.pad(samples, ((pad, pad), (0, 0)))
+        # (frames, channels, taps) view: window i starts at padded[i].
+        windows = sliding_window_view(padded, self.taps, axis=0)
+        first_tap = pad + self._offsets[0]
+
+        out = np.empty((out_frames, samples.shape[1]), dtype=np.float32)
+        for start in range(0, out_frames, self.block):
+            positions = np.arange(start, min(start + self.block, out_frames)) * ratio
+            base = np.floor(positions)
+            phase = np.rint((positions - base) * self.phases).astype(np.intp)
+            taps = windows[base.astype(np.intp) + first_tap]
+            out[start:start + len(positions)] = np.matmul(taps, bank[phase][:, :, None])[..., 0]
+        return out
+
+
+def pitch_ratio(semitones: float) -> float:
+    return float(2.0 ** (semitones / 12.0))
+
+
+_default_resampler: Optional[PolyphaseResampler] = None
+
+
+def default_resampler() -> PolyphaseResampler:
+    global _default_resampler
+    if _default_resampler is None:
+        _default_resampler = PolyphaseResampler()
+    return _default_resampler
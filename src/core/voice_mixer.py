@@ -0,0 +1,230 @@
+"""
+Voice mixer.
+
+Sums the playing voices into output buffers from inside the miniaudio
+device callback. Output counters (callbacks, callback time, underruns,
+headroom) are kept in a small float64 array so that it can live in shared
+memory and be read by another process.
+
+An underrun is counted when the device has played everything delivered so
+far before asking for more, that is when the wall time since the first
+callback exceeds the duration of the delivered frames.
+
+The same bookkeeping is the audio clock: frame ``n`` is due at
+``clock_origin + n / rate`` in ``time.perf_counter()`` time, which lets
+voices start on an exact frame given a wall-clock time.
+"""
+
+import time
+from collections import deque
+from typing import Deque, Dict, Generator, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.engine_format import DEFAULT_FORMAT, EngineFormat
+from src.core.mixer import to_int16
+from src.utils.events import Event
+
+
+COUNTERS = (
+    "callbacks",
+    "frames",
+    "underruns",
+    "voices",
+    "callback_ms_last",
+    "callback_ms_max",
+    "headroom_ms_min",
+    "clock_origin",
+)
+_INDEX = {name: i for i, name in enumerate(COUNTERS)}
+
+SILENCE = 1e-4
+"""Level under which a frame counts as silent when timing the first audible frame."""
+
+
+def new_counters() -> np.ndarray:
+    counters = np.zeros(len(COUNTERS), dtype=np.float64)
+    counters[_INDEX["headroom_ms_min"]] = np.inf
+    return counters
+
+
+def counters_dict(counters: np.ndarray) -> Dict[str, float]:
+    return {name: float(counters[i]) for i, name in enumerate(COUNTERS)}
+
+
+class _Voice:
+    __slots__ = ("samples", "position", "triggered_at", "start_at", "audible")
+
+    def __init__(self, samples: np.ndarray, triggered_at: Optional[float], start_at: Optional[float]) -> None:
+        self.samples = samples
+        self.position = 0
+        self.triggered_at = triggered_at
+        self.start_at = start_at
+        self.audible = False
+
+
+class VoiceMixer:
+    """Mixes float32 voices into device buffers.
+
+    ``add``, ``set_loop`` and ``stop`` may be called from any thread. They
+    are handed to the callback in order through one deque, so a stop drops
+    only what was queued before it. ``audible`` is
+    emitted from the callback with ``(latency, triggered_at)`` for the first
+    non-silent frame of each triggered voice, ``idle`` when the last voice
+    ends.
+    """
+
+    def __init__(
+        self,
+        format: EngineFormat = DEFAULT_FORMAT,
+        dtype: type = np.int16,
+        counters: Optional[np.ndarray] = None,
+    ) -> None:
+        self.format = format
+        self.dtype = dtype
+        self.counters = counters if counters is not None else new_counters()
+        self.audible = Event()
+        self.idle = Event()
+        # ("voice" | "loop" | "stop", voice) commands; append and popleft are atomic.
+        self._commands: Deque[Tuple[str, Optional[_Voice]]] = deque()
+        self._voices: List[_Voice] = []
+        # One loop plays at a time; replacements are picked up by the next callback.
+        self._loop: Optional[_Voice] = None
+
+    def add(
+        self, samples: np.ndarray, triggered_at: Optional[float] = None, start_at: Optional[float] = None
+    ) -> None:
+        """Queue a ``(frames, channels)`` float32 voice.
+
+        The voice starts on the next callback, or on the frame due at the
+        ``time.perf_counter()`` time ``start_at``. A voice scheduled in the past
+        skips what it should already have played so it stays on the clock.
+        """
+        self._commands.append(("voice", _Voice(samples, triggered_at, start_at)))
+
+    def set_loop(self, samples: Optional[np.ndarray], start_at: Optional[float] = None) -> None:
+        """Play ``samples`` over and over, or stop the loop with None.
+
+        Replacing a playing loop keeps its position, so an edited loop carries
+        on where it was. The array is read in place on every pass: changes
+        to it are heard on the next pass.
+        """
+        self._commands.append(("loop", _Voice(samples, None, start_at) if samples is not None else None))
+
+    def stop(self) -> None:
+        """Drop every playing voice and the loop, and whatever was queued before this call."""
+        self._commands.append(("stop", None))
+
+    @property
+    def active(self) -> int:
+        return len(self._voices) + len(self._commands) + (self._loop is not None)
+
+    def callback(self) -> Generator[np.ndarray, int, None]:
+        """Started generator to pass to ``PlaybackDevice.start``."""
+        generator = self._generate()
+        next(generator)
+        return generator
+
+    def _generate(self) -> Generator[np.ndarray, int, None]:
+        counters = self.counters
+        rate = self.format.sample_rate
+        started: Optional[float] = None
+        delivered = 0
+        frames = yield np.zeros((0, self.format.channels), dtype=self.dtype)
+        while True:
+            now = time.perf_counter()
+            if started is None:
+                started = now
+            elif now - started > delivered / rate:
+                counters[_INDEX["underruns"]] += 1
+                # Restart the clock so one starvation is counted once.
+                started = now - delivered / rate
+            counters[_INDEX["clock_origin"]] = started
+
+            out = self._mix(frames, now, delivered, started)
+            delivered += frames
+
+            elapsed_ms = (time.perf_counter() - now) * 1000.0
+            counters[_INDEX["callbacks"]] += 1
+            counters[_INDEX["frames"]] += frames
+            counters[_INDEX["voices"]] = len(self._voices)
+            counters[_INDEX["callback_ms_last"]] = elapsed_ms
+            counters[_INDEX["callback_ms_max"]] = max(counters[_INDEX["callback_ms_max"]], elapsed_ms)
+            headroom_ms = frames * 1000.0 / rate - elapsed_ms
+            counters[_INDEX["headroom_ms_min"]] = min(counters[_INDEX["headroom_ms_min"]], headroom_ms)
+
+            frames = yield out
+
+    def _mix(self, frames: int, now: float, block_start: int, origin: float) -> np.ndarray:
+        stopped = False
+        while self._commands:
+            command, voice = self._commands.popleft()
+            if command == "voice":
+                self._voices.append(voice)
+            elif command == "loop":
+                if voice is not None and self._loop is not None and self._loop.start_at is None:
+                    voice.start_at = None
+                    voice.position = self._loop.position % len(voice.samples)
+                self._loop = voice
+            else:
+                stopped = stopped or bool(self._voices) or self._loop is not None
+                self._voices.clear()
+                self._loop = None
+        if stopped and not self._voices and self._loop is None:
+            self.idle.emit()
+
+        out = np.zeros((frames, self.format.channels), dtype=np.float32)
+        if self._loop is not None:
+            self._mix_loop(out, block_start, origin)
+        if not self._voices:
+            return out if self.dtype is np.float32 else to_int16(out)
+
+        rate = self.format.sample_rate
+        finished = []
+        for voice in self._voices:
+            offset = 0
+            if voice.start_at is not None:
+                offset = int(round((voice.start_at - origin) * rate)) - block_start
+                if offset >= frames:
+                    continue
+                voice.start_at = None
+                if offset < 0:
+                    voice.position = min(-offset, len(voice.samples))
+                    offset = 0
+            chunk = voice.samples[voice.position:voice.position + frames - offset]
+            out[offset:offset + len(chunk)] += chunk
+            voice.position += len(chunk)
+            if voice.triggered_at is not None and not voice.audible:
+                loud = np.flatnonzero(np.abs(chunk).max(axis=1) > SILENCE)
+                if loud.size:
+                    voice.audible = True
+                    latency = now + (offset + loud[0]) / rate - voice.triggered_at
+                    self.audible.emit(float(latency), voice.triggered_at)
+            if voice.position >= len(voice.samples):
+                finished.append(voice)
+
+        for voice in finished:
+            self._voices.remove(voice)
+        if finished and not self._voices and not self._commands and self._loop is None:
+            self.idle.emit()
+        return out if self.dtype is np.float32 else to_int16(out)
+
+    def _mix_loop(self, out: np.ndarray, block_start: int, origin: float) -> None:
+        loop = self._loop
+        frames = len(out)
+        length = len(loop.samples)
+        written = 0
+        if loop.start_at is not None:
+            offset = int(round((loop.start_at - origin) * self.format.sample_rate)) - block_start
+            if offset >= frames:
+                return
+            loop.start_at = None
+            if offset < 0:
+                loop.position = -offset % length
+            else:
+                written = offset
+        while written < frames:
+            chunk = loop.samples[loop.position:loop.position + frames - written]
+            out[written:written + len(chunk)] += chunk
+            written += len(chunk)
+            loop.position = (loop.position + len(chunk)) % length
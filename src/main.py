@@ -1,11 +1,23 @@
 import logging
+import os
 import sys
 from pathlib import Path
 
 import sass
 from PySide6.QtWidgets import QApplication
 
+from src.core import memory
+from src.core.analysis import build_index
+from src.core.asset_index import library_roots, open_library
 from src.core.audio_engine import AudioEngine
+from src.core.audio_process import PROCESS_ENV, AudioProcessEngine
+from src.core.blend import default_layout
+from src.core.engine_format import device_format
+from src.core.render import Renderer
+from src.core.sample_bank import FOOTSTEPS_DIR, SampleBank
+from src.ui.asset_watcher import AssetWatcher
+from src.ui.dialogs.audio_settings import load_device_settings
+from src.utils.cache import cache_dir
 
 
 _THEME_DIR = Path(__file__).parent / "ui" / "themes"
@@ -17,7 +29,34 @@ class FSEAPP(QApplication):
     def __init__(self):
         super().__init__(sys.argv)
         self.setup_style_sheet()
-        self.audio_engine: AudioEngine = AudioEngine()
+        engine_format = device_format()
+        device_settings = load_device_settings()
+        if os.environ.get(PROCESS_ENV):
+            self.audio_engine = AudioProcessEngine(format=engine_format, settings=device_settings)
+        else:
+            self.audio_engine = AudioEngine(format=engine_format, settings=device_settings)
+        self.aboutToQuit.connect(self.audio_engine.close)
+        budget_mb = os.environ.get("FOOTSTEP_MEMORY_BUDGET_MB")
+        self.assets = open_library(library_roots(FOOTSTEPS_DIR), cache_dir() / "assets.json")
+        self.sample_bank: SampleBank = SampleBank(
+            precision=os.environ.get("FOOTSTEP_SAMPLE_PRECISION", "int16"),
+            memory_budget=int(float(budget_mb) * 1024 * 1024) if budget_mb else None,
+            format=engine_format,
+            assets=self.assets,
+        )
+        memory.register("sample_bank", self.sample_bank)
+        self.blend_layout = default_layout()
+        self.sample_bank.load(self.blend_layout.materials)
+        build_index(self.sample_bank, cache_dir() / "analysis.json")
+        self.renderer: Renderer = Renderer(self.sample_bank, layout=self.blend_layout)
+        self.asset_watcher = AssetWatcher(self.assets, self)
+        self.asset_watcher.assets_changed.connect(self._on_assets_changed)
+
+    def _on_assets_changed(self, materials):
+        self.assets.save(cache_dir() / "assets.json")
+        self.sample_bank.reload(materials)
+        build_index(self.sample_bank, cache_dir() / "analysis.json")
+        log.info("Asset library changed: %s", ", ".join(materials))
 
     def setup_style_sheet(self):
         scss_path = _THEME_DIR / "main.scss"
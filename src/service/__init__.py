@@ -0,0 +1 @@
+"""Headless footstep render service."""
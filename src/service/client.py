@@ -0,0 +1,89 @@
+"""
+Render service client.
+
+Minimal client for the local render service, over TCP or a Unix socket.
+"""
+
+import http.client
+import json
+import socket
+import struct
+from typing import Any, Dict, Iterator, List, Optional
+
+
+_FRAME_HEADER = struct.Struct(">I")
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: Optional[float] = None) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+
+class RenderClient:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        unix_socket: Optional[str] = None,
+        timeout: Optional[float] = 30.0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self.timeout = timeout
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self.unix_socket:
+            return _UnixHTTPConnection(self.unix_socket, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def render(
+        self,
+        x: float,
+        y: float,
+        count: int = 1,
+        seed: Optional[int] = None,
+        format: str = "wav",
+        materials: Optional[List[str]] = None,
+    ) -> Iterator[bytes]:
+        """Request variations and yield each encoded variation as it arrives."""
+        body = {"x": x, "y": y, "count": count, "seed": seed, "format": format}
+        if materials is not None:
+            body["materials"] = materials
+
+        conn = self._connect()
+        try:
+            conn.request("POST", "/render", json.dumps(body), {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            if response.status != 200:
+                error = json.loads(response.read() or b"{}").get("error", response.reason)
+                raise ValueError(f"Render request failed ({response.status}): {error}")
+
+            while True:
+                header = response.read(_FRAME_HEADER.size)
+                if not header:
+                    break
+                if len(header) < _FRAME_HEADER.size:
+                    raise ConnectionError("Truncated render stream")
+                (length,) = _FRAME_HEADER.unpack(header)
+                payload = response.read(length)
+                if len(payload) < length:
+                    raise ConnectionError("Truncated render stream")
+                yield payload
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the service statistics."""
+        conn = self._connect()
+        try:
+            conn.request("GET", "/stats")
+            return json.loads(conn.getresponse().read())
+        finally:
+            conn.close()
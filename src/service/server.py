@@ -0,0 +1,351 @@
+"""
+Local render service.
+
+Accepts render requests over HTTP (TCP or a Unix socket), slices and batches
+them onto a pool of worker processes sharing a memory-mapped sample bank,
+and streams the encoded variations back in order as they complete.
+
+Protocol:
+    POST /render   JSON body ``{"x", "y", "count", "seed", "format", "materials"}``.
+                   The response is a chunked stream of frames, each a 4-byte
+                   big-endian length followed by one encoded variation.
+    GET  /stats    Queue depth, throughput and latency percentiles as JSON.
+    GET  /health   ``{"status": "ok"}``.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import random
+import shutil
+import socketserver
+import struct
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core.analysis import build_index
+from src.core.asset_index import library_roots, open_library
+from src.core.blend import default_layout
+from src.core.sample_bank import FOOTSTEPS_DIR, SampleBank
+from src.service.worker import RenderRequest, RenderSlice, init_worker, render_batch
+from src.utils.cache import cache_dir
+
+
+log = logging.getLogger(__name__)
+
+_FRAME_HEADER = struct.Struct(">I")
+
+
+class LatencyStats:
+    """Rolling window of request latencies."""
+
+    def __init__(self, window: int = 1024) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.completed = 0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self.completed += 1
+
+    def percentiles(self, points: Sequence[float] = (50, 95, 99)) -> Dict[str, float]:
+        """Latency percentiles in milliseconds over the window."""
+        with self._lock:
+            samples = np.array(self._samples)
+        if samples.size == 0:
+            return {f"p{p:g}": 0.0 for p in points}
+        values = np.percentile(samples * 1000.0, points)
+        return {f"p{p:g}": round(float(v), 3) for p, v in zip(points, values)}
+
+
+class _PendingRequest:
+    def __init__(self, request: RenderRequest, num_slices: int) -> None:
+        self.request = request
+        self.num_slices = num_slices
+        self.results: "queue.Queue[Tuple[int, Any]]" = queue.Queue()
+        self.submitted = time.perf_counter()
+
+
+class RenderService:
+    """Dispatches render requests to a pool of worker processes.
+
+    Requests are split into slices of at most ``chunk_size`` variations so that
+    large requests stream back progressively, and up to ``batch_size`` queued
+    slices are sent to a worker in one task to amortize IPC for small requests.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        batch_size: int = 8,
+        chunk_size: int = 4,
+        bank: Optional[SampleBank] = None,
+    ) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+
+        self._bank = bank
+        self._pack_dir: Optional[str] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._queue: "queue.Queue[Optional[Tuple[_PendingRequest, int, RenderSlice]]]" = queue.Queue()
+        self._slots = threading.Semaphore(self.workers * 2)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._seed_rng = random.Random()
+        self.latency = LatencyStats()
+
+    @property
+    def materials(self) -> List[str]:
+        return self._bank.materials if self._bank else []
+
+    def start(self) -> None:
+        """Load and pack the sample bank, then start the workers."""
+        if self._bank is None:
+            self._bank = SampleBank(assets=open_library(library_roots(FOOTSTEPS_DIR), cache_dir() / "assets.json"))
+            self._bank.load()
+        if self._bank.analysis is None:
+            build_index(self._bank, cache_dir() / "analysis.json")
+
+        self._pack_dir = tempfile.mkdtemp(prefix="footstep-bank-")
+        self._bank.save_pack(Path(self._pack_dir))
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(self._pack_dir,),
+        )
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self._dispatcher.start()
+
+    def close(self) -> None:
+        """Stop dispatching, shut the workers down and remove the bank pack."""
+        self._queue.put(None)
+        if self._dispatcher:
+            self._dispatcher.join()
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        if self._pack_dir:
+            shutil.rmtree(self._pack_dir, ignore_errors=True)
+
+    def validate(self, request: RenderRequest) -> None:
+        """Raise ValueError when the request names materials the bank does not have."""
+        if request.materials is None:
+            return
+        count = len(default_layout())
+        if not isinstance(request.materials, list) or len(request.materials) != count:
+            raise ValueError(f"materials must be a list of {count} names")
+        unknown = [m for m in request.materials if m not in self.materials]
+        if unknown:
+            raise ValueError(f"Unknown materials: {', '.join(map(str, unknown))}")
+
+    def submit(self, request: RenderRequest) -> Iterator[bytes]:
+        """Queue a request and return an iterator over its encoded variations, in order."""
+        self.validate(request)
+        if request.seed is None:
+            request.seed = self._seed_rng.getrandbits(32)
+
+        starts = range(0, request.count, self.chunk_size)
+        pending = _PendingRequest(request, len(starts))
+        for index, start in enumerate(starts):
+            count = min(self.chunk_size, request.count - start)
+            self._queue.put((pending, index, RenderSlice(request, start, count)))
+
+        return self._collect(pending)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = self._in_flight
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize(),
+            "in_flight": in_flight,
+            "completed": self.latency.completed,
+            "latency_ms": self.latency.percentiles(),
+        }
+
+    def _collect(self, pending: _PendingRequest) -> Iterator[bytes]:
+        next_index = 0
+        ready: Dict[int, List[bytes]] = {}
+        while next_index < pending.num_slices:
+            index, payloads = pending.results.get()
+            if isinstance(payloads, BaseException):
+                raise payloads
+            ready[index] = payloads
+            while next_index in ready:
+                yield from ready.pop(next_index)
+                next_index += 1
+        self.latency.record(time.perf_counter() - pending.submitted)
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            self._slots.acquire()
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+
+            with self._lock:
+                self._in_flight += len(batch)
+            try:
+                future = self._executor.submit(render_batch, [s for _, _, s in batch])
+            except Exception as e:
+                self._deliver(batch, error=e)
+                continue
+            future.add_done_callback(lambda f, b=batch: self._deliver(b, future=f))
+
+    def _deliver(
+        self,
+        batch: List[Tuple[_PendingRequest, int, RenderSlice]],
+        future: Optional[Future] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        self._slots.release()
+        with self._lock:
+            self._in_flight -= len(batch)
+
+        if future is not None:
+            try:
+                results = future.result()
+            except BaseException as e:
+                error = e
+        if error is not None:
+            log.error(f"Render batch failed: {error}")
+            results = [error] * len(batch)
+
+        for (pending, index, _), payloads in zip(batch, results):
+            pending.results.put((index, payloads))
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_ServiceMixin"
+
+    def do_GET(self) -> None:
+        if self.path == "/stats":
+            self._send_json(200, self.server.service.stats())
+        elif self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self) -> None:
+        if self.path != "/render":
+            self._send_json(404, {"error": "Not found"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = RenderRequest.from_json(json.loads(self.rfile.read(length) or b"{}"))
+            payloads = self.server.service.submit(request)
+        except (ValueError, json.JSONDecodeError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("X-Footstep-Format", request.format)
+        self.send_header("X-Footstep-Seed", str(request.seed))
+        self.end_headers()
+
+        try:
+            for payload in payloads:
+                self._write_chunk(_FRAME_HEADER.pack(len(payload)) + payload)
+        except Exception as e:
+            log.error(f"Render request failed: {e}")
+            self.close_connection = True
+            return
+        self._write_chunk(b"")
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        log.debug(format % args)
+
+
+class _ServiceMixin:
+    service: RenderService
+    daemon_threads = True
+
+
+class _TCPServer(_ServiceMixin, ThreadingHTTPServer):
+    pass
+
+
+class _UnixServer(_ServiceMixin, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    pass
+
+
+def create_server(
+    service: RenderService,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    unix_socket: Optional[str] = None,
+) -> socketserver.BaseServer:
+    """Bind the HTTP front-end of a started service."""
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        server = _UnixServer(unix_socket, _RequestHandler)
+    else:
+        server = _TCPServer((host, port), _RequestHandler)
+    server.service = service
+    return server
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    unix_socket: Optional[str] = None,
+    workers: Optional[int] = None,
+    batch_size: int = 8,
+    chunk_size: int = 4,
+) -> None:
+    """Run the render service until interrupted."""
+    service = RenderService(workers=workers, batch_size=batch_size, chunk_size=chunk_size)
+    service.start()
+    server = create_server(service, host, port, unix_socket)
+    log.info(f"Render service listening on {unix_socket or f'{host}:{port}'} with {service.workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if unix_socket and os.path.exists(unix_socket):
+            os.unlink(unix_socket)
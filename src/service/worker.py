@@ -0,0 +1,88 @@
+"""
+Render worker.
+
+Runs inside the service's worker processes. Each process opens the sample
+bank pack memory-mapped once, then renders batches of request slices.
+"""
+
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.core.encoder import FORMATS, encode_segment
+from src.core.render import Renderer
+from src.core.sample_bank import SampleBank
+from src.core.variation import SamplePicker
+
+
+MAX_COUNT = 1024
+
+_renderer: Optional[Renderer] = None
+
+
+@dataclass
+class RenderRequest:
+    x: float
+    y: float
+    count: int = 1
+    seed: Optional[int] = None
+    format: str = "wav"
+    materials: Optional[List[str]] = None
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "RenderRequest":
+        """Build a request from a decoded JSON body, raising ValueError when invalid."""
+        try:
+            request = cls(
+                x=float(data["x"]),
+                y=float(data["y"]),
+                count=int(data.get("count", 1)),
+                seed=None if data.get("seed") is None else int(data["seed"]),
+                format=str(data.get("format", "wav")),
+                materials=data.get("materials"),
+            )
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid render request: {e}") from e
+
+        if not (0.0 <= request.x <= 1.0 and 0.0 <= request.y <= 1.0):
+            raise ValueError("Blend position must be within [0, 1]")
+        if not 1 <= request.count <= MAX_COUNT:
+            raise ValueError(f"count must be between 1 and {MAX_COUNT}")
+        if request.format not in FORMATS:
+            raise ValueError(f"Unsupported format '{request.format}'")
+        return request
+
+
+@dataclass
+class RenderSlice:
+    """A contiguous range of variations of one request."""
+
+    request: RenderRequest
+    start: int
+    count: int
+
+
+def variation_seed(seed: int, index: int) -> str:
+    """Seed of one variation, independent of how the request was sliced."""
+    return f"{seed}:{index}"
+
+
+def init_worker(pack_dir: str) -> None:
+    global _renderer
+    _renderer = Renderer(SampleBank.open_pack(Path(pack_dir)))
+
+
+def render_batch(slices: List[RenderSlice]) -> List[List[bytes]]:
+    """Render every slice of a batch, returning the encoded variations per slice."""
+    results = []
+    for render_slice in slices:
+        request = render_slice.request
+        payloads = []
+        for i in range(render_slice.start, render_slice.start + render_slice.count):
+            rng = random.Random(variation_seed(request.seed, i))
+            # A fresh picker per variation keeps seeded results independent of slicing.
+            segment = _renderer.render(request.x, request.y, rng, request.materials, SamplePicker())
+            payloads.append(encode_segment(segment, request.format))
+        results.append(payloads)
+    return results
@@ -0,0 +1,55 @@
+"""
+Asset Watcher.
+
+Watches the library folders of an asset index while the editor runs.
+Folder changes are collected for a moment, so copying in a batch of files
+costs one rescan, and only the changed folders are rescanned.
+"""
+
+import os
+from pathlib import Path
+from typing import Iterable, Set
+
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer, Signal
+
+from src.core.asset_index import AssetIndex
+
+
+class AssetWatcher(QObject):
+    assets_changed = Signal(list)
+    """Materials whose files were added, removed or changed."""
+
+    def __init__(self, index: AssetIndex, parent=None, delay_ms: int = 300):
+        super().__init__(parent)
+        self.index = index
+        self._pending: Set[str] = set()
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self._refresh)
+        self._watch(index.roots)
+
+    def _watch(self, roots: Iterable[Path]) -> None:
+        """Watch ``roots`` and every folder below them."""
+        directories = []
+        for root in roots:
+            for dirpath, _, _ in os.walk(root):
+                directories.append(dirpath)
+        new = set(directories) - set(self._watcher.directories())
+        if new:
+            self._watcher.addPaths(sorted(new))
+
+    def _on_directory_changed(self, path: str) -> None:
+        self._pending.add(path)
+        self._timer.start()
+
+    def _refresh(self) -> None:
+        # A removed folder is also reported by its parent, which rescans it.
+        directories = [Path(path) for path in self._pending if os.path.isdir(path)]
+        self._pending.clear()
+        changed = self.index.refresh(directories)
+        self._watch(directories)
+        if changed:
+            self.assets_changed.emit(sorted(changed))
@@ -0,0 +1,149 @@
+"""
+Audio Settings Dialog.
+
+Edits the output device settings and applies them to the running engine.
+"""
+
+from typing import Optional
+
+import miniaudio
+from PySide6.QtCore import QSettings, QTimer
+from PySide6.QtWidgets import (
+    QComboBox, QDialog, QDialogButtonBox, QFormLayout, QLabel, QMessageBox, QSpinBox, QWidget,
+)
+
+from src.core.output_device import SAMPLE_FORMATS, THREAD_PRIORITIES, DeviceSettings, playback_devices
+
+
+_SETTINGS_GROUP = "audio_device"
+_DEFAULT_ITEM = "Default"
+
+
+def load_device_settings() -> DeviceSettings:
+    """Device settings saved by the dialog, or the defaults."""
+    store = QSettings("footstep-editor", "footstep-editor")
+    store.beginGroup(_SETTINGS_GROUP)
+    data = {key: store.value(key) for key in store.childKeys()}
+    store.endGroup()
+    for key in ("buffersize_msec", "callback_periods"):
+        if key in data:
+            data[key] = int(data[key])
+    try:
+        return DeviceSettings.from_dict({k: v for k, v in data.items() if v not in ("", None)})
+    except (ValueError, TypeError):
+        return DeviceSettings()
+
+
+def save_device_settings(settings: DeviceSettings) -> None:
+    store = QSettings("footstep-editor", "footstep-editor")
+    store.beginGroup(_SETTINGS_GROUP)
+    store.remove("")
+    for key, value in settings.to_dict().items():
+        if value is not None:
+            store.setValue(key, value)
+    store.endGroup()
+
+
+class AudioSettingsDialog(QDialog):
+    def __init__(self, engine, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.setWindowTitle("Audio Settings")
+        self.engine = engine
+        settings = engine.settings
+
+        form = QFormLayout(self)
+
+        self.backend_combo = QComboBox()
+        self.backend_combo.addItem(_DEFAULT_ITEM)
+        self.backend_combo.addItems([name.lower() for name in miniaudio.Backend.__members__])
+        if settings.backend:
+            self.backend_combo.setCurrentText(settings.backend.lower())
+        self.backend_combo.currentTextChanged.connect(self._refresh_devices)
+        form.addRow("Backend", self.backend_combo)
+
+        self.device_combo = QComboBox()
+        form.addRow("Device", self.device_combo)
+        self._refresh_devices()
+        if settings.device:
+            self.device_combo.setCurrentText(settings.device)
+
+        self.buffer_spin = QSpinBox()
+        self.buffer_spin.setRange(1, 1000)
+        self.buffer_spin.setSuffix(" ms")
+        self.buffer_spin.setValue(settings.buffersize_msec)
+        form.addRow("Buffer size", self.buffer_spin)
+
+        self.periods_spin = QSpinBox()
+        self.periods_spin.setRange(0, 16)
+        self.periods_spin.setSpecialValueText("Auto")
+        self.periods_spin.setValue(settings.callback_periods)
+        form.addRow("Callback periods", self.periods_spin)
+
+        self.format_combo = QComboBox()
+        self.format_combo.addItems(list(SAMPLE_FORMATS))
+        self.format_combo.setCurrentText(settings.sample_format)
+        form.addRow("Sample format", self.format_combo)
+
+        self.priority_combo = QComboBox()
+        self.priority_combo.addItems(list(THREAD_PRIORITIES))
+        self.priority_combo.setCurrentText(settings.thread_priority)
+        form.addRow("Thread priority", self.priority_combo)
+
+        self.stats_label = QLabel()
+        self.stats_label.setStyleSheet("font-family: monospace;")
+        form.addRow("Output", self.stats_label)
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._refresh_stats)
+        self._timer.start(500)
+        self._refresh_stats()
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok
+            | QDialogButtonBox.StandardButton.Apply
+            | QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(self._on_ok)
+        buttons.rejected.connect(self.reject)
+        buttons.button(QDialogButtonBox.StandardButton.Apply).clicked.connect(self._apply)
+        form.addRow(buttons)
+
+    def settings(self) -> DeviceSettings:
+        backend = self.backend_combo.currentText()
+        device = self.device_combo.currentText()
+        return DeviceSettings(
+            backend=None if backend == _DEFAULT_ITEM else backend,
+            device=None if device == _DEFAULT_ITEM else device,
+            buffersize_msec=self.buffer_spin.value(),
+            callback_periods=self.periods_spin.value(),
+            sample_format=self.format_combo.currentText(),
+            thread_priority=self.priority_combo.currentText(),
+        )
+
+    def _refresh_devices(self):
+        backend = self.backend_combo.currentText()
+        self.device_combo.clear()
+        self.device_combo.addItem(_DEFAULT_ITEM)
+        self.device_combo.addItems(playback_devices(None if backend == _DEFAULT_ITEM else backend))
+
+    def _refresh_stats(self):
+        stats = self.engine.stats()
+        headroom = f"{stats['headroom_ms_min']:.1f} ms" if stats["callbacks"] else "-"
+        self.stats_label.setText(
+            f"underruns {int(stats['underruns'])}\n"
+            f"callback {stats['callback_ms_last']:.2f} ms (max {stats['callback_ms_max']:.2f} ms)\n"
+            f"headroom {headroom}"
+        )
+
+    def _apply(self) -> bool:
+        settings = self.settings()
+        try:
+            self.engine.configure(settings)
+        except miniaudio.MiniaudioError as e:
+            QMessageBox.warning(self, "Audio Settings", f"Could not open the device: {e}")
+            return False
+        save_device_settings(settings)
+        return True
+
+    def _on_ok(self):
+        if self._apply():
+            self.accept()
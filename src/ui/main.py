@@ -4,14 +4,29 @@ Main Window Form.
 This is the main container that assembles the standard widgets.
 """
 
-from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QSplitter
-from PySide6.QtCore import Qt
+import time
+from pathlib import Path
+
+from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QSplitter, QMessageBox, QApplication, QFileDialog
+from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QAction
 
+from src.core import memory
+from src.core.capture import PressBuffer, Transport
+from src.core.loop import LoopBuffer
+from src.core.timeline_export import export_timeline
+from src.ui.dialogs.audio_settings import AudioSettingsDialog
 from src.ui.widgets.view_panel import ViewPanel
 from src.ui.widgets.properties_panel import PropertiesPanel
 from src.ui.widgets.timeline_panel import TimelinePanel
 
+
+# Margin between queuing the timeline render and its first frame, so it starts on its frame.
+_TRANSPORT_LEAD_SEC = 0.05
+_PLAYHEAD_INTERVAL_MS = 30
+_RECORD_MERGE_INTERVAL_MS = 100
+
+
 class FSEditor(QMainWindow):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -19,6 +34,17 @@ class FSEditor(QMainWindow):
         self.setWindowTitle("Footstep Editor")
         self.resize(1450, 820)
         
+        self.transport = None
+        self.recording = False
+        self.loop_buffer = None
+        self.presses = PressBuffer()
+        self._playhead_timer = QTimer(self)
+        self._playhead_timer.setInterval(_PLAYHEAD_INTERVAL_MS)
+        self._playhead_timer.timeout.connect(self._update_transport)
+        self._record_timer = QTimer(self)
+        self._record_timer.setInterval(_RECORD_MERGE_INTERVAL_MS)
+        self._record_timer.timeout.connect(self._merge_presses)
+        
         self._init_ui()
         self._create_menubar()
         
@@ -43,6 +69,11 @@ class FSEditor(QMainWindow):
         save_action.setShortcut("Ctrl+S")
         file_menu.addAction(save_action)
         
+        export_action = QAction("&Export Timeline...", self)
+        export_action.setShortcut("Ctrl+E")
+        export_action.triggered.connect(self._export_timeline)
+        file_menu.addAction(export_action)
+        
         file_menu.addSeparator()
         
         exit_action = QAction("E&xit", self)
@@ -60,9 +91,164 @@ class FSEditor(QMainWindow):
         redo_action.setShortcut("Ctrl+Y")
         edit_menu.addAction(redo_action)
         
+        edit_menu.addSeparator()
+        
+        audio_action = QAction("&Audio Settings...", self)
+        audio_action.triggered.connect(self._show_audio_settings)
+        edit_menu.addAction(audio_action)
+        
         help_menu = menubar.addMenu("&Help")
+        
+        memory_action = QAction("&Memory Usage", self)
+        memory_action.triggered.connect(self._show_memory_report)
+        help_menu.addAction(memory_action)
+        
         help_menu.addAction("About")
 
+    def _render_timeline(self):
+        """Render the timeline tracks between the file start and end handles."""
+        timeline = self.timeline_panel.timeline
+        renderer = QApplication.instance().renderer
+        samples = renderer.render_timeline(timeline.tracks, timeline.file_start_sec, timeline.file_duration_sec)
+        return samples, renderer.bank.format.sample_rate
+
+    def _play_timeline(self):
+        """Play the timeline and start the transport that follows it on the audio clock."""
+        if self.timeline_panel.btn_loop.isChecked():
+            self._play_loop()
+            return
+        triggered_at = time.perf_counter()
+        timeline = self.timeline_panel.timeline
+        engine = QApplication.instance().audio_engine
+        samples, sample_rate = self._render_timeline()
+        self.view_panel.show_samples(samples, sample_rate, timeline.file_start_sec)
+        
+        start_at = time.perf_counter() + _TRANSPORT_LEAD_SEC
+        latency = engine.settings.buffersize_msec / 1000.0
+        self.transport = Transport(timeline.file_start_sec, start_at, latency, timeline.file_duration_sec)
+        if samples is not None:
+            engine.play_samples(samples, triggered_at=triggered_at, start_at=start_at)
+        self._playhead_timer.start()
+
+    def _play_loop(self):
+        """Loop the region between the handles from a pre-rendered buffer."""
+        timeline = self.timeline_panel.timeline
+        engine = QApplication.instance().audio_engine
+        start, end = timeline.file_start_sec, timeline.file_duration_sec
+        # The buffer survives stop and play; only edits since the last pass are rendered.
+        if self.loop_buffer is None or (self.loop_buffer.start_sec, self.loop_buffer.end_sec) != (start, end):
+            self.loop_buffer = LoopBuffer(QApplication.instance().renderer, start, end)
+        self.loop_buffer.update(timeline.tracks)
+        self.view_panel.show_samples(self.loop_buffer.samples, self.loop_buffer.sample_rate, start)
+        
+        start_at = time.perf_counter() + _TRANSPORT_LEAD_SEC
+        latency = engine.settings.buffersize_msec / 1000.0
+        self.transport = Transport(start, start_at, latency, start + self.loop_buffer.duration_sec, loop=True)
+        engine.loop(self.loop_buffer.samples, start_at=start_at)
+        self._playhead_timer.start()
+
+    def _restart_playback(self):
+        """Restart a running playback, for instance after switching loop mode."""
+        if self.transport is None:
+            return
+        QApplication.instance().audio_engine.stop()
+        self._merge_presses()
+        self._play_timeline()
+
+    def _on_keys_changed(self):
+        """Re-render the edited steps of a playing loop."""
+        if self.transport is None or not self.transport.loop or self.loop_buffer is None:
+            return
+        if self.loop_buffer.update(self.timeline_panel.timeline.tracks):
+            # Same buffer, same position: an in-process engine already hears the edit,
+            # an out-of-process one needs the new copy.
+            QApplication.instance().audio_engine.loop(self.loop_buffer.samples)
+            self.view_panel.show_samples(self.loop_buffer.samples, self.loop_buffer.sample_rate, self.loop_buffer.start_sec)
+
+    def _stop_timeline(self):
+        QApplication.instance().audio_engine.stop()
+        self._playhead_timer.stop()
+        self._merge_presses()
+        self.transport = None
+        self.timeline_panel.set_playing(False)
+        self.timeline_panel.btn_record.setChecked(False)
+
+    def _update_transport(self):
+        """Follow the transport with the playhead and stop at the end handle."""
+        if self.transport is None:
+            return
+        now = time.perf_counter()
+        if self.transport.finished(now):
+            self._stop_timeline()
+            return
+        timeline = self.timeline_panel.timeline
+        timeline.playhead_sec = max(self.transport.start_sec, self.transport.position(now))
+        timeline.update_playhead()
+        timeline.playhead_changed.emit(timeline.playhead_sec)
+
+    def _set_recording(self, recording: bool):
+        """Record MixPad presses into the timeline; starts playback when stopped."""
+        self.recording = recording
+        timeline = self.timeline_panel.timeline
+        if recording:
+            timeline.begin_take()
+            self._record_timer.start()
+            if self.transport is None:
+                self.timeline_panel.btn_play.click()
+        else:
+            self._record_timer.stop()
+            self._merge_presses()
+            timeline.end_take()
+
+    def _on_pad_pressed_at(self, x: float, y: float, at: float):
+        if self.recording and self.transport is not None:
+            if not self.presses.push(self.transport.position(at), x, y):
+                print("Record buffer full, press dropped")
+
+    def _merge_presses(self):
+        """Merge the presses captured since the last batch into the record track."""
+        presses = self.presses.drain()
+        if not len(presses):
+            return
+        timeline = self.timeline_panel.timeline
+        inside = (presses[:, 0] >= timeline.file_start_sec) & (presses[:, 0] < timeline.file_duration_sec)
+        timeline.record_presses(presses[inside])
+
+    def _export_timeline(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Timeline", "timeline.wav", "Audio (*.wav *.ogg *.flac)"
+        )
+        if not path:
+            return
+        timeline = self.timeline_panel.timeline
+        path = Path(path)
+        format = path.suffix.lstrip(".").lower() or "wav"
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            frames = export_timeline(
+                QApplication.instance().renderer,
+                timeline.tracks,
+                path,
+                timeline.file_start_sec,
+                timeline.file_duration_sec,
+                format,
+            )
+        except (ValueError, OSError, RuntimeError) as e:
+            QMessageBox.warning(self, "Export Timeline", f"Could not export the timeline: {e}")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        if not frames:
+            QMessageBox.information(self, "Export Timeline", "The timeline has no keys to export.")
+
+    def _show_audio_settings(self):
+        """Edit the output device settings of the running engine."""
+        AudioSettingsDialog(QApplication.instance().audio_engine, self).exec()
+
+    def _show_memory_report(self):
+        """Show the memory used by each subsystem."""
+        QMessageBox.information(self, "Memory Usage", memory.format_report(memory.report()))
+
     def _init_ui(self):
         """Initialize the layout and widgets."""
         
@@ -84,6 +270,14 @@ class FSEditor(QMainWindow):
         self.top_splitter.setSizes([400, 600])
         
         self.timeline_panel = TimelinePanel()
+        self.timeline_panel.play_clicked.connect(self._play_timeline)
+        self.timeline_panel.pause_clicked.connect(self._stop_timeline)
+        self.timeline_panel.record_toggled.connect(self._set_recording)
+        self.timeline_panel.loop_toggled.connect(self._restart_playback)
+        self.timeline_panel.timeline.keys_changed.connect(self._on_keys_changed)
+        self.timeline_panel.timeline.region_changed.connect(self._restart_playback)
+        self.properties_panel.mix_pad.pressed_at.connect(self._on_pad_pressed_at)
+        self.properties_panel.step_rendered.connect(self.view_panel.show_samples)
         
         self.main_splitter.addWidget(self.top_splitter)
         self.main_splitter.addWidget(self.timeline_panel)
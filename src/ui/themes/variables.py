@@ -34,6 +34,7 @@ class ThemeVariables:
     PLAYHEAD_COLOR = QColor(COLOR_PLAYHEAD)
     HANDLE_COLOR = QColor(COLOR_HANDLE)
     OVERLAY_COLOR = QColor(200, 200, 200, 60)
+    AUTOMATION_COLOR = QColor(139, 92, 246, 160)
     
     LEFT_MARGIN = 100
     RIGHT_MARGIN = 30
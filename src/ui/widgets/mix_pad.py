@@ -1,10 +1,43 @@
+import math
+import time
+
 from PySide6.QtWidgets import QFrame, QSizePolicy, QLabel
 from PySide6.QtCore import Qt, QEvent, QPointF, Signal, QRectF
-from PySide6.QtGui import QMouseEvent, QPainter, QColor, QPen, QBrush, QRegion
+from PySide6.QtGui import QMouseEvent, QPainter, QColor, QPen, QBrush, QRegion, QPixmap
+
+from src.core.blend import BlendLayout
+
+
+_LINE_COLOR = QColor("#d9c7f7")
+_HANDLE_RADIUS = 6
+
+
+class _EventClock:
+    """Maps Qt input event timestamps (milliseconds, platform epoch) to ``time.perf_counter()``.
+
+    The smallest observed gap between an event's timestamp and its delivery
+    is taken as the clock offset, so a press handled late by a busy event
+    loop still gets the time it happened.
+    """
+
+    def __init__(self):
+        self._offset = None
+
+    def to_perf(self, timestamp_ms: int, received_at: float) -> float:
+        if not timestamp_ms:
+            return received_at
+        offset = received_at - timestamp_ms / 1000.0
+        if self._offset is None or offset < self._offset or offset - self._offset > 1.0:
+            # A jump of more than a second means the platform clock was reset.
+            self._offset = offset
+        return timestamp_ms / 1000.0 + self._offset
+
 
 class MixPad(QFrame):
     handle_moved = Signal(float, float)
     pressed = Signal(float, float)
+    # Pad position and time.perf_counter() time of the press.
+    pressed_at = Signal(float, float, float)
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -13,6 +46,11 @@ class MixPad(QFrame):
         self.handle_position = QPointF(0.5, 0.5)
         self.is_hovering = False
         self.is_pressing = False
+        self.blend_layout = BlendLayout.corners()
+        self._event_clock = _EventClock()
+        # Static layer, rebuilt on resize, layout, theme or pixel density change.
+        self._background = None
+        self._background_key = None
         
         self.setObjectName("MixPad")
         
@@ -22,8 +60,14 @@ class MixPad(QFrame):
         self.setMouseTracking(True)
         
 
+    def set_layout(self, layout: BlendLayout):
+        self.blend_layout = layout
+        self._background = None
+        self.update()
+
     def resizeEvent(self, event):
         super().resizeEvent(event)
+        self._background = None
         rect = self._get_square_rect().toRect()
         self.setMask(QRegion(rect))
 
@@ -40,8 +84,10 @@ class MixPad(QFrame):
         super().mouseMoveEvent(event)
 
     def mousePressEvent(self, event: QMouseEvent):       
+        at = self._event_clock.to_perf(event.timestamp(), time.perf_counter())
         self.is_pressing = True
         self._update_position(event.position())
+        self.pressed_at.emit(self.handle_position.x(), self.handle_position.y(), at)
         self.pressed.emit(self.handle_position.x(), self.handle_position.y())
         super().mousePressEvent(event)
     
@@ -64,9 +110,55 @@ class MixPad(QFrame):
         x = max(0.0, min(1.0, x))
         y = max(0.0, min(1.0, y))
         
+        # Only the old and new crosshair and handle are repainted.
+        dirty = self._dynamic_region(self.handle_position)
         self.handle_position = QPointF(x, y)
         self.handle_moved.emit(x, y)
-        self.update()
+        self.update(dirty + self._dynamic_region(self.handle_position))
+
+    def changeEvent(self, event: QEvent):
+        if event.type() in (QEvent.Type.StyleChange, QEvent.Type.PaletteChange):
+            self._background = None
+            self.update()
+        super().changeEvent(event)
+
+    def _static_layer(self) -> QPixmap:
+        """The layout arcs and labels, rendered once per size, layout and pixel density."""
+        side = self._get_square_rect().width()
+        dpr = self.devicePixelRatioF()
+        background = self._background
+        if background is None or self._background_key != (side, dpr):
+            background = QPixmap(math.ceil(side * dpr), math.ceil(side * dpr))
+            background.setDevicePixelRatio(dpr)
+            background.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(background)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            layout = self.blend_layout
+            painter.setPen(QPen(_LINE_COLOR, 1))
+            for px, py, material in layout.points:
+                center = QPointF(px * side, py * side)
+                if layout.law == "distance":
+                    arc_size = side * layout.falloff
+                    painter.drawEllipse(center, arc_size, arc_size)
+                else:
+                    painter.drawEllipse(center, 3, 3)
+                if len(layout) > 4:
+                    painter.drawText(center + QPointF(5, -5), material)
+            painter.end()
+            self._background = background
+            self._background_key = (side, dpr)
+        return background
+
+    def _dynamic_region(self, position: QPointF) -> QRegion:
+        """Widget area covered by the crosshair and handle at a pad position."""
+        rect = self._get_square_rect()
+        cx = rect.x() + position.x() * rect.width()
+        cy = rect.y() + position.y() * rect.height()
+        margin = _HANDLE_RADIUS + 2
+        region = QRegion(QRectF(cx - 2, rect.y(), 4, rect.height()).toAlignedRect())
+        region += QRegion(QRectF(rect.x(), cy - 2, rect.width(), 4).toAlignedRect())
+        region += QRegion(QRectF(cx - margin, cy - margin, 2 * margin, 2 * margin).toAlignedRect())
+        return region
 
     def paintEvent(self, event):
         painter = QPainter(self)
@@ -75,21 +167,13 @@ class MixPad(QFrame):
         rect = self._get_square_rect()
         side = rect.width()
         
+        painter.drawPixmap(rect.topLeft(), self._static_layer())
         painter.translate(rect.topLeft())
 
-        arc_size = side * 0.75
-        
-        painter.setPen(QPen(QColor("#d9c7f7"), 1))
-        
-        painter.drawEllipse(QPointF(0, 0), arc_size, arc_size)
-        painter.drawEllipse(QPointF(side, 0), arc_size, arc_size)
-        painter.drawEllipse(QPointF(0, side), arc_size, arc_size)
-        painter.drawEllipse(QPointF(side, side), arc_size, arc_size)
-
         cx = self.handle_position.x() * side
         cy = self.handle_position.y() * side
         
-        painter.setPen(QPen(QColor("#d9c7f7"), 1, Qt.PenStyle.DashLine))
+        painter.setPen(QPen(_LINE_COLOR, 1, Qt.PenStyle.DashLine))
         
         painter.drawLine(cx, 0, cx, side)
         painter.drawLine(0, cy, side, cy)
@@ -98,4 +182,4 @@ class MixPad(QFrame):
         painter.setBrush(QBrush(QColor("#8b5cf6")))
         if self.is_pressing:
             painter.setBrush(QBrush(QColor("#7c3aed")))
-        painter.drawEllipse(QPointF(cx, cy), 6, 6)
+        painter.drawEllipse(QPointF(cx, cy), _HANDLE_RADIUS, _HANDLE_RADIUS)
@@ -4,22 +4,21 @@ Properties Panel Widget.
 This widget represents the properties area.
 """
 
-import numpy as np
-from pathlib import Path
-from random import randint
+import os
+import time
 
 from PySide6.QtWidgets import QFrame, QHBoxLayout, QApplication
-from PySide6.QtCore import Qt
-from pydub import AudioSegment
+from PySide6.QtCore import Qt, Signal
 
 from src.ui.widgets.mix_pad import MixPad
-from src.core.mixer import Mixer
-
-
-_ASSETS_DIR = Path(__file__).parent.parent.parent / "assets"
+from src.ui.widgets.trace_overlay import TraceOverlay
+from src.utils import tracing
 
 
 class PropertiesPanel(QFrame):
+    # Samples and sample rate of the step played for a pad press.
+    step_rendered = Signal(object, int)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setObjectName("PropertiesPanel")
@@ -30,44 +29,27 @@ class PropertiesPanel(QFrame):
         self.mix_pad = MixPad(self)
         self.mix_pad.handle_moved.connect(self._on_mix_pad_moved)
         self.mix_pad.pressed.connect(self._on_mix_pad_pressed)
+        self.mix_pad.set_layout(QApplication.instance().blend_layout)
 
         center_layout.addWidget(self.mix_pad, 1)
         center_layout.addStretch()
 
-        self._segments = {}
-        self._preload_segments()
-
-    def _preload_segments(self):
-        for material in ["floor", "dirt", "wood", "gravel"]:
-            for idx in range(1, 22):
-                file_path = _ASSETS_DIR / "sfx" / "footsteps" / material / f"Steps_{material}-{idx:03d}.ogg"
-                self._segments[file_path] = AudioSegment.from_file(file_path)
+        self.trace_overlay = None
+        if os.environ.get(tracing.OVERLAY_ENV):
+            engine = QApplication.instance().audio_engine
+            self.trace_overlay = TraceOverlay(self, stats=getattr(engine, "stats", None))
+            self.trace_overlay.move(8, 8)
+            self.trace_overlay.raise_()
 
     def _on_mix_pad_moved(self, x: float, y: float):
         pass
 
     def _on_mix_pad_pressed(self, x: float, y: float):
+        triggered_at = time.perf_counter()
         app = QApplication.instance()
-        mixer = Mixer()
-
-        corners = [
-            (0.0, 0.0, "floor"),
-            (1.0, 0.0, "dirt"),
-            (0.0, 1.0, "wood"),
-            (1.0, 1.0, "gravel"),
-        ]
-
-        for corner in corners:
-            cx, cy, material = corner
-            idx = randint(1, 21)
-            p1 = np.array([cx, cy])
-            p2 = np.array([round(x, 2), round(y, 2)])
-            dist = np.sqrt(np.sum((p1 - p2) ** 2))
-            volume_db = max(-40.0, -20.0 * dist / 0.75)
-            file_path = _ASSETS_DIR / "sfx" / "footsteps" / material / f"Steps_{material}-{idx:03d}.ogg"
-            segment = self._segments[file_path]
-            mixer.add_segment(segment, volume_db)
-
-        stream = mixer.concat(format="wav")
-        app.audio_engine.play(stream.getvalue())
+        with tracing.span("mixpad.press", x=round(x, 2), y=round(y, 2)):
+            samples = app.renderer.render_samples(x, y)
+            sample_rate = app.renderer.bank.format.sample_rate
+            app.audio_engine.play_samples(samples, triggered_at=triggered_at)
+        self.step_rendered.emit(samples, sample_rate)
         print(f"MixPad handle pressed: x={x:.2f}, y={y:.2f}")
@@ -2,20 +2,34 @@
 Timeline Panel - Simple and functional timeline with keys.
 """
 
-from typing import Optional, List, Tuple, Dict, Any, Union
+import math
+from typing import Optional, List, Tuple, Dict, Any
 
-from PySide6.QtWidgets import QFrame, QVBoxLayout, QHBoxLayout, QGraphicsView, QGraphicsScene, QGraphicsItem, QPushButton, QWidget, QLabel, QGraphicsLineItem, QGraphicsPathItem, QGraphicsTextItem, QGraphicsRectItem, QApplication, QSlider
+import numpy as np
+
+from PySide6.QtWidgets import QFrame, QVBoxLayout, QHBoxLayout, QGraphicsView, QGraphicsScene, QPushButton, QWidget, QLabel, QGraphicsPathItem, QGraphicsTextItem, QGraphicsRectItem, QApplication, QSlider
 from PySide6.QtCore import Qt, QRectF, QPointF, Signal, QEvent, QPoint
-from PySide6.QtGui import QPainter, QColor, QPen, QBrush, QFont, QPolygonF, QPainterPath, QIcon, QResizeEvent, QMouseEvent, QWheelEvent, QKeyEvent
+from PySide6.QtGui import QPainter, QColor, QPen, QBrush, QFont, QPolygonF, QPainterPath, QPixmap, QIcon, QResizeEvent, QMouseEvent, QWheelEvent, QKeyEvent
+
+from src.core import memory
+from src.core.automation import RANGES, TrackAutomation
+from src.utils import tracing
 
 from ..themes.variables import ThemeVariables
 
 
+# Rough per-object costs used for memory accounting; Qt does not expose item sizes.
+_SCENE_ITEM_BYTES = 256
+_KEY_BYTES = 32
+
+
 class TimelinePanel(QFrame):
     """Container for timeline with playback controls."""
     play_clicked = Signal()
     pause_clicked = Signal()
     stop_clicked = Signal()
+    record_toggled = Signal(bool)
+    loop_toggled = Signal(bool)
     zoom_changed = Signal(float)
     
     def __init__(self, parent: Optional[QWidget] = None) -> None:
@@ -36,6 +50,12 @@ class TimelinePanel(QFrame):
         self.timeline.playhead_changed.connect(self._update_time_display)
         self.zoom_changed.connect(self.timeline.set_zoom)
         self.btn_restart.clicked.connect(self._on_restart)
+        self.btn_record.toggled.connect(self.record_toggled)
+        self.btn_loop.toggled.connect(self.loop_toggled)
+    
+    def set_playing(self, playing: bool) -> None:
+        """Reflect the transport state on the play button without emitting."""
+        self.btn_play.setChecked(playing)
     
     def _update_time_display(self, time_sec: float) -> None:
         """Update time display label."""
@@ -127,6 +147,8 @@ class TimelineView(QGraphicsView):
     """Simple timeline view with keys."""
     
     playhead_changed = Signal(float)
+    keys_changed = Signal()
+    region_changed = Signal(float, float)
     
     def __init__(self, parent: Optional[QWidget] = None) -> None:
         super().__init__(parent)
@@ -164,43 +186,54 @@ class TimelineView(QGraphicsView):
         self.last_pan_pos: Optional[QPoint] = None
         
         # Items
-        self.playhead_line: Optional[QGraphicsLineItem] = None
-        self.playhead_handle: Optional[QGraphicsPathItem] = None
-        self.playhead_time_text: Optional[QGraphicsTextItem] = None
-        self.start_handle: Optional[QGraphicsRectItem] = None
-        self.start_line: Optional[QGraphicsLineItem] = None
-        self.start_overlay: Optional[QGraphicsRectItem] = None
-        self.duration_handle: Optional[QGraphicsRectItem] = None
-        self.duration_line: Optional[QGraphicsLineItem] = None
-        self.duration_overlay: Optional[QGraphicsRectItem] = None
         self.track_headers: List[Tuple[QGraphicsRectItem, QGraphicsTextItem]] = []
         self.ruler_safe_margin: Optional[QGraphicsRectItem] = None
+        self.automation_items: List[List[QGraphicsPathItem]] = []
+        
+        # Static layers painted from pixmaps: track lanes below the items, the
+        # out-of-region overlays above them. The playhead and region handles
+        # are painted over the overlays on every frame.
+        self._lanes_layer: Optional[QPixmap] = None
+        self._region_layer: Optional[QPixmap] = None
+        self._layer_key: Optional[Tuple[float, float, float]] = None
+        self._playhead_x: Optional[float] = None
+        
+        # Track that live record mode writes into, and the presses of the current take.
+        self.record_track: int = 0
+        self._take: List[np.ndarray] = []
         
         self.tracks: List[Dict[str, Any]] = [
-            {"keys": [2.5, 5.0, 8.3, 12.0]},
-            {"keys": [1.0, 3.5, 6.8, 10.2]},
+            {"keys": [2.5, 5.0, 8.3, 12.0], "automation": TrackAutomation()},
+            {"keys": [1.0, 3.5, 6.8, 10.2], "automation": TrackAutomation()},
         ]
         
         self.horizontalScrollBar().valueChanged.connect(self.update_headers_position)
         
+        memory.register("timeline_scene", self)
+        
         self.build_timeline()
     
+    def memory_usage(self) -> Dict[str, int]:
+        """Approximate bytes held by the scene items, track keys and automation."""
+        keys = sum(len(track["keys"]) for track in self.tracks)
+        return {
+            "scene_items": len(self.scene.items()) * _SCENE_ITEM_BYTES,
+            "track_keys": keys * _KEY_BYTES,
+            "track_automation": sum(track["automation"].nbytes for track in self.tracks if "automation" in track),
+        }
+    
     def build_timeline(self) -> None:
         """Build complete timeline."""
+        with tracing.span("timeline.build", tracks=len(self.tracks), px_per_sec=self.px_per_sec):
+            self._build_timeline()
+
+    def _build_timeline(self) -> None:
         self.setUpdatesEnabled(False)
         
         self.scene.clear()
         
-        self.playhead_line = None
-        self.playhead_handle = None
-        self.playhead_time_text = None
-        self.start_handle = None
-        self.start_line = None
-        self.start_overlay = None
-        self.duration_handle = None
-        self.duration_line = None
-        self.duration_overlay = None
         self.ruler_safe_margin = None
+        self.automation_items = []
         
         scene_width = self.size().width()
         
@@ -210,14 +243,15 @@ class TimelineView(QGraphicsView):
         self.scene.setSceneRect(0, 0, self.LEFT_MARGIN + scene_width + self.RIGHT_MARGIN, total_height)
         
         y = self.RULER_HEIGHT
-        for track in self.tracks:
-            self.draw_track(track, y, scene_width)
-            y += self.TRACK_HEIGHT + self.TRACK_GAP
-        
-        self.draw_ruler(scene_width)
+        with tracing.span("timeline.draw_tracks"):
+            for track in self.tracks:
+                self.draw_track(track, y, scene_width)
+                y += self.TRACK_HEIGHT + self.TRACK_GAP
         
-        self.draw_duration_handle(total_height)
+        with tracing.span("timeline.draw_ruler"):
+            self.draw_ruler(scene_width)
         
+        self.invalidate_layers()
         self.update_playhead()
         
         self.update_headers_position()
@@ -306,19 +340,85 @@ class TimelineView(QGraphicsView):
     
     def draw_track(self, track: Dict[str, Any], y: float, width: float) -> None:
         """Draw a track with keys."""
-        x_start = 0
-        
-        lane = self.scene.addLine(
-            x_start, y+self.TRACK_HEIGHT/2, self.sceneRect().width(), y+self.TRACK_HEIGHT/2,
-            QPen(ThemeVariables.LINE_COLOR, 1)
-        )
-        lane.setZValue(-10)
+        self.automation_items.append(self.draw_automation_lanes(track, y, width))
         
         for key_time in track["keys"]:
             key_x = key_time * self.px_per_sec
             if key_x >= 0 and key_x <= width:
                 self.draw_key(key_time, y + self.TRACK_HEIGHT / 2)
     
+    def draw_automation_lanes(self, track: Dict[str, Any], y: float, width: float) -> List[QGraphicsPathItem]:
+        """Draw the non-empty automation lanes of a track."""
+        automation = track.get("automation")
+        if automation is None:
+            return []
+        return [
+            self.draw_automation(lane, RANGES[name], y, width)
+            for name, lane in automation.lanes.items()
+            if len(lane)
+        ]
+    
+    def draw_automation(self, lane: Any, value_range: Tuple[float, float], y: float, width: float) -> QGraphicsPathItem:
+        """Draw an automation lane as a polyline across the track, held before and after its breakpoints."""
+        low, high = value_range
+        x_start = self.LEFT_MARGIN
+        x_end = x_start + width
+        
+        def point(time_sec: float, value: float) -> QPointF:
+            level = (value - low) / (high - low)
+            return QPointF(x_start + time_sec * self.px_per_sec, y + self.TRACK_HEIGHT * (1.0 - level))
+        
+        path = QPainterPath(QPointF(x_start, point(0.0, float(lane.values[0])).y()))
+        for time_sec, value in zip(lane.times.tolist(), lane.values.tolist()):
+            path.lineTo(point(time_sec, value))
+        path.lineTo(QPointF(x_end, path.currentPosition().y()))
+        
+        item = self.scene.addPath(path, QPen(ThemeVariables.AUTOMATION_COLOR, 1))
+        item.setZValue(5)
+        return item
+    
+    def begin_take(self) -> None:
+        """Start recording presses into ``record_track``."""
+        self._take = []
+    
+    def end_take(self) -> None:
+        """Stop recording; the next take starts from an empty press list."""
+        self._take = []
+    
+    def record_presses(self, presses: np.ndarray) -> None:
+        """Merge a batch of captured ``(time, x, y)`` presses into ``record_track``.
+        
+        Keys of the batch are merged into the track and the track's x/y
+        automation re-records the whole take so far. Only the new keys and the
+        track's automation lanes are redrawn; the rest of the scene is left
+        alone.
+        """
+        if not len(presses):
+            return
+        self._take.append(presses)
+        take = np.concatenate(self._take)
+        take = take[np.argsort(take[:, 0], kind="stable")]
+        track_index = self.record_track
+        track = self.tracks[track_index]
+        track["keys"] = np.union1d(track["keys"], presses[:, 0]).tolist()
+        automation = track.setdefault("automation", TrackAutomation())
+        automation.record("x", take[:, 0], take[:, 1])
+        automation.record("y", take[:, 0], take[:, 2])
+        
+        with tracing.span("timeline.record_presses", presses=len(presses)):
+            y = self.RULER_HEIGHT + track_index * (self.TRACK_HEIGHT + self.TRACK_GAP)
+            width = self.size().width()
+            for key_time in presses[:, 0].tolist():
+                if 0 <= key_time * self.px_per_sec <= width:
+                    self.draw_key(key_time, y + self.TRACK_HEIGHT / 2)
+            
+            if track_index < len(self.automation_items):
+                for item in self.automation_items[track_index]:
+                    self.scene.removeItem(item)
+                self.automation_items[track_index] = self.draw_automation_lanes(track, y, width)
+        
+        self.keys_changed.emit()
+    
     def draw_key(self, time_sec: float, y: float) -> None:
         """Draw a key (diamond) at time position."""
         x = self.LEFT_MARGIN + time_sec * self.px_per_sec
@@ -338,77 +438,65 @@ class TimelineView(QGraphicsView):
         )
         key_item.setZValue(10)
     
-    def draw_duration_handle(self, total_height: float) -> None:
-        """Draw start and duration handles to define file bounds."""
-        x_start = self.LEFT_MARGIN + self.file_start_sec * self.px_per_sec
-        x_end = self.LEFT_MARGIN + self.file_duration_sec * self.px_per_sec
-        
-        scene_rect = self.scene.sceneRect()
-        overlay_width_end = scene_rect.width() - x_end
-        overlay_width_start = x_start
-        overlays = [
-            (0, 0, overlay_width_start),
-            (x_end, 0, overlay_width_end)
-        ]
-        
-        for x, y, w in overlays:
-            if w <= 0:
-                continue
-            overlay = self.scene.addRect(
-                x, y, w, total_height,
-                QPen(Qt.PenStyle.NoPen),
-                QBrush(ThemeVariables.OVERLAY_COLOR)
-            )
-            overlay.setZValue(100)
-        
-        
-        line_color = ThemeVariables.TEXT_MUTED
-        lines = [x_start, x_end]
-        
-        for line_x in lines:
-            line = self.scene.addLine(
-                line_x, 0, line_x, total_height,
-                QPen(line_color, 1, Qt.PenStyle.DashLine)
-             )
-            line.setZValue(90)
-        
-        # Create start handle
-        self.start_handle = self.scene.addRect(
-            x_start - self.HANDLE_WIDTH/2, 0, self.HANDLE_WIDTH, self.RULER_HEIGHT,
-            QPen(self.HANDLE_COLOR, 1),
-            QBrush(self.HANDLE_COLOR)
-        )
-        self.start_handle.setZValue(105)
-        self.start_handle.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable, False)
-        self.start_handle.setCursor(Qt.CursorShape.SizeHorCursor)
-        
-        # Create duration handle
-        self.duration_handle = self.scene.addRect(
-            x_end - self.HANDLE_WIDTH/2, 0, self.HANDLE_WIDTH, self.RULER_HEIGHT,
-            QPen(self.HANDLE_COLOR, 1),
-            QBrush(self.HANDLE_COLOR)
+    def invalidate_layers(self) -> None:
+        """Drop the cached static layers; they are rendered again on the next paint."""
+        self._lanes_layer = None
+        self._region_layer = None
+        self.scene.update()
+    
+    def _layer(self, paint: Any) -> QPixmap:
+        """Render a static layer the size of the scene at the screen's pixel density."""
+        rect = self.scene.sceneRect()
+        dpr = self.devicePixelRatioF()
+        pixmap = QPixmap(math.ceil(rect.width() * dpr), math.ceil(rect.height() * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        paint(painter, rect)
+        painter.end()
+        return pixmap
+    
+    def _blit(self, painter: QPainter, layer: QPixmap, rect: QRectF) -> None:
+        """Copy the part of a layer under ``rect``."""
+        dpr = layer.devicePixelRatio()
+        source = QRectF(rect.x() * dpr, rect.y() * dpr, rect.width() * dpr, rect.height() * dpr)
+        painter.drawPixmap(rect, layer, source)
+    
+    def _paint_lanes(self, painter: QPainter, rect: QRectF) -> None:
+        painter.setPen(QPen(ThemeVariables.LINE_COLOR, 1))
+        y = self.RULER_HEIGHT + self.TRACK_HEIGHT / 2
+        for _ in self.tracks:
+            painter.drawLine(QPointF(0, y), QPointF(rect.width(), y))
+            y += self.TRACK_HEIGHT + self.TRACK_GAP
+    
+    def _region_x(self) -> Tuple[float, float]:
+        return (
+            self.LEFT_MARGIN + self.file_start_sec * self.px_per_sec,
+            self.LEFT_MARGIN + self.file_duration_sec * self.px_per_sec,
         )
-        self.duration_handle.setZValue(105)
-        self.duration_handle.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable, False)
-        self.duration_handle.setCursor(Qt.CursorShape.SizeHorCursor)
     
-    def update_playhead(self) -> None:
-        """Update playhead position."""
-        if self.playhead_line:
-            self.scene.removeItem(self.playhead_line)
-        if self.playhead_handle:
-            self.scene.removeItem(self.playhead_handle)
-        if self.playhead_time_text:
-            self.scene.removeItem(self.playhead_time_text)
-        
-        x = self.LEFT_MARGIN + self.playhead_sec * self.px_per_sec
+    def _paint_region(self, painter: QPainter, rect: QRectF) -> None:
+        """Shade the scene outside the file bounds and mark the bounds."""
+        x_start, x_end = self._region_x()
+        height = rect.height()
+        for x, w in ((0.0, x_start), (x_end, rect.width() - x_end)):
+            if w > 0:
+                painter.fillRect(QRectF(x, 0, w, height), ThemeVariables.OVERLAY_COLOR)
+        painter.setPen(QPen(ThemeVariables.TEXT_MUTED, 1, Qt.PenStyle.DashLine))
+        for x in (x_start, x_end):
+            painter.drawLine(QPointF(x, 0), QPointF(x, height))
+    
+    def _paint_handles(self, painter: QPainter) -> None:
+        painter.setPen(QPen(self.HANDLE_COLOR, 1))
+        painter.setBrush(QBrush(self.HANDLE_COLOR))
+        for x in self._region_x():
+            painter.drawRect(QRectF(x - self.HANDLE_WIDTH / 2, 0, self.HANDLE_WIDTH, self.RULER_HEIGHT))
+    
+    def _paint_playhead(self, painter: QPainter, x: float) -> None:
         line_height = self.scene.sceneRect().height()
-        
-        self.playhead_line = self.scene.addLine(
-            x, 0, x, line_height,
-            QPen(ThemeVariables.PLAYHEAD_COLOR, ThemeVariables.PLAYHEAD_LINE_WIDTH)
-        )
-        self.playhead_line.setZValue(140)
+        painter.setPen(QPen(ThemeVariables.PLAYHEAD_COLOR, ThemeVariables.PLAYHEAD_LINE_WIDTH))
+        painter.drawLine(QPointF(x, 0), QPointF(x, line_height))
         
         head_path = QPainterPath()
         rect_radius = ThemeVariables.PLAYHEAD_RADIUS
@@ -427,13 +515,50 @@ class TimelineView(QGraphicsView):
             QPointF(x - triangle_width / 2, rect_y + rect_height),
             QPointF(x + triangle_width / 2, rect_y + rect_height),
         ]))
-        
-        self.playhead_handle = self.scene.addPath(
-            head_path,
-            QPen(Qt.PenStyle.NoPen),
-            QBrush(ThemeVariables.PLAYHEAD_COLOR)
-        )
-        self.playhead_handle.setZValue(150)
+        painter.setPen(QPen(Qt.PenStyle.NoPen))
+        painter.setBrush(QBrush(ThemeVariables.PLAYHEAD_COLOR))
+        painter.drawPath(head_path)
+    
+    def _strip(self, x: float, half_width: float) -> QRectF:
+        """Full-height scene strip around ``x``."""
+        return QRectF(x - half_width - 2, 0, 2 * half_width + 4, self.scene.sceneRect().height())
+    
+    def _check_layers(self) -> None:
+        key = (self.scene.sceneRect().width(), self.scene.sceneRect().height(), self.devicePixelRatioF())
+        if key != self._layer_key:
+            self._lanes_layer = None
+            self._region_layer = None
+            self._layer_key = key
+    
+    def drawBackground(self, painter: QPainter, rect: QRectF) -> None:
+        super().drawBackground(painter, rect)
+        self._check_layers()
+        if self._lanes_layer is None:
+            self._lanes_layer = self._layer(self._paint_lanes)
+        self._blit(painter, self._lanes_layer, rect)
+    
+    def drawForeground(self, painter: QPainter, rect: QRectF) -> None:
+        super().drawForeground(painter, rect)
+        self._check_layers()
+        if self._region_layer is None:
+            self._region_layer = self._layer(self._paint_region)
+        self._blit(painter, self._region_layer, rect)
+        self._paint_handles(painter)
+        if self._playhead_x is not None:
+            self._paint_playhead(painter, self._playhead_x)
+    
+    def changeEvent(self, event: QEvent) -> None:
+        if event.type() in (QEvent.Type.StyleChange, QEvent.Type.PaletteChange):
+            self.invalidate_layers()
+        super().changeEvent(event)
+    
+    def update_playhead(self) -> None:
+        """Move the playhead, repainting only the strips it leaves and enters."""
+        half_width = self.RULER_HEIGHT * ThemeVariables.PLAYHEAD_WIDTH_RATIO / 2 + 2
+        if self._playhead_x is not None:
+            self.scene.update(self._strip(self._playhead_x, half_width))
+        self._playhead_x = self.LEFT_MARGIN + self.playhead_sec * self.px_per_sec
+        self.scene.update(self._strip(self._playhead_x, half_width))
     
     def resizeEvent(self, event: QResizeEvent) -> None:
         """Handle view resize."""
@@ -453,18 +578,19 @@ class TimelineView(QGraphicsView):
             if scene_pos.y() >= self.RULER_HEIGHT:
                 return
             
-            if self.playhead_handle and self._is_near_handle(scene_pos, self.playhead_handle):
+            start_x, end_x = self._region_x()
+            if self._playhead_x is not None and self._is_near_handle(scene_pos, self._playhead_x):
                 self.dragging_playhead = True
                 self.set_playhead_from_x(scene_pos.x(), event.modifiers())
                 event.accept()
                 return
             
-            if self.start_handle and self._is_near_handle(scene_pos, self.start_handle):
+            if self._is_near_handle(scene_pos, start_x):
                 self.dragging_start_handle = True
                 event.accept()
                 return
             
-            if self.duration_handle and self._is_near_handle(scene_pos, self.duration_handle):
+            if self._is_near_handle(scene_pos, end_x):
                 self.dragging_duration_handle = True
                 event.accept()
                 return
@@ -474,11 +600,8 @@ class TimelineView(QGraphicsView):
         
         super().mousePressEvent(event)
     
-    def _is_near_handle(self, scene_pos: QPointF, handle: Union[QGraphicsPathItem, QGraphicsRectItem]) -> bool:
-        """Check if mouse position is near a handle."""
-        handle_rect = handle.boundingRect()
-        handle_pos = handle.pos()
-        handle_x = handle_rect.x() + handle_pos.x() + handle_rect.width() / 2
+    def _is_near_handle(self, scene_pos: QPointF, handle_x: float) -> bool:
+        """Check if mouse position is near the handle at ``handle_x``."""
         return abs(scene_pos.x() - handle_x) < self.HANDLE_GRAB_MARGIN
     
     def mouseMoveEvent(self, event: QMouseEvent) -> None:
@@ -504,6 +627,12 @@ class TimelineView(QGraphicsView):
             self.set_playhead_from_x(scene_pos.x(), event.modifiers())
         elif self.space_pressed:
             self.setCursor(Qt.CursorShape.OpenHandCursor)
+        elif not event.buttons():
+            scene_pos = self.mapToScene(event.position().toPoint())
+            over_handle = scene_pos.y() <= self.RULER_HEIGHT and any(
+                self._is_near_handle(scene_pos, x) for x in self._region_x()
+            )
+            self.setCursor(Qt.CursorShape.SizeHorCursor if over_handle else Qt.CursorShape.ArrowCursor)
         
         super().mouseMoveEvent(event)
     
@@ -518,6 +647,8 @@ class TimelineView(QGraphicsView):
                 self.setCursor(Qt.CursorShape.ArrowCursor)
             event.accept()
         elif event.button() == Qt.MouseButton.LeftButton:
+            if self.dragging_start_handle or self.dragging_duration_handle:
+                self.region_changed.emit(self.file_start_sec, self.file_duration_sec)
             self.dragging_playhead = False
             self.dragging_start_handle = False
             self.dragging_duration_handle = False
@@ -575,12 +706,18 @@ class TimelineView(QGraphicsView):
         new_value = (scene_pos.x() - self.LEFT_MARGIN) / self.px_per_sec
         new_value = self._snap(new_value, event.modifiers())
         
+        old_x = self._region_x()[0 if is_start else 1]
         if is_start:
             self.file_start_sec = max(0.0, min(new_value, self.file_duration_sec - 0.1))
         else:
             self.file_duration_sec = max(self.file_start_sec + 0.1, new_value)
+        new_x = self._region_x()[0 if is_start else 1]
         
-        self.build_timeline()
+        # Only the overlay between the old and new bound changes.
+        self._region_layer = None
+        left, right = min(old_x, new_x), max(old_x, new_x)
+        pad = self.HANDLE_WIDTH + 2
+        self.scene.update(QRectF(left - pad, 0, right - left + 2 * pad, self.scene.sceneRect().height()))
         event.accept()
     
     def _snap(self, value: float, modifiers: Qt.KeyboardModifier = Qt.KeyboardModifier.NoModifier, threshold: float = 0.1) -> float:
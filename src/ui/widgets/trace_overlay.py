@@ -0,0 +1,53 @@
+"""
+Trace Overlay Widget.
+
+Small floating label showing the last click-to-sound latencies and, when
+the audio engine reports them, its output counters.
+"""
+
+from typing import Callable, Dict, Optional
+
+from PySide6.QtWidgets import QLabel
+from PySide6.QtCore import QTimer
+
+from src.utils import tracing
+
+
+class TraceOverlay(QLabel):
+    def __init__(
+        self,
+        parent=None,
+        count: int = 8,
+        interval_ms: int = 250,
+        stats: Optional[Callable[[], Dict[str, float]]] = None,
+    ):
+        super().__init__(parent)
+        self.setObjectName("TraceOverlay")
+        self.setStyleSheet(
+            "background-color: rgba(31, 41, 55, 200); color: #ffffff;"
+            "font-family: monospace; font-size: 11px; padding: 6px; border-radius: 4px;"
+        )
+        self._count = count
+        self._stats = stats
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start(interval_ms)
+        self.refresh()
+
+    def refresh(self):
+        values = tracing.click_to_sound.values()[-self._count:]
+        lines = ["click → sound"]
+        if values:
+            lines += [f"{v * 1000:7.1f} ms" for v in reversed(values)]
+            lines.append(f"max {max(values) * 1000:5.1f} ms")
+        else:
+            lines.append("   no data")
+        if self._stats is not None:
+            stats = self._stats()
+            lines.append(f"underruns {int(stats['underruns']):5d}")
+            lines.append(f"callback {stats['callback_ms_max']:5.1f} ms")
+            if stats["callbacks"]:
+                lines.append(f"headroom {stats['headroom_ms_min']:5.1f} ms")
+        self.setText("\n".join(lines))
+        self.adjustSize()
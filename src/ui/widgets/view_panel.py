@@ -1,20 +1,208 @@
 """
 View Panel Widget.
 
-This widget represents the main view or editor area.
+Inspector for the last render: a waveform over a spectrogram, drawn from
+tiles computed on a worker thread and cached per zoom level. Scroll the
+wheel to zoom around the cursor and drag to pan; only tiles that come
+into view and are not cached yet are computed, and the GUI thread only
+ever blits finished tiles.
 """
 
-from PySide6.QtWidgets import QFrame, QVBoxLayout, QLabel
-from PySide6.QtCore import Qt
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from PySide6.QtWidgets import QFrame, QLabel, QVBoxLayout, QWidget
+from PySide6.QtCore import Qt, QRect, Signal
+from PySide6.QtGui import QImage, QPainter, QMouseEvent, QWheelEvent, QResizeEvent, qRgb
+
+from src.core import memory, spectrogram
+from src.utils import tracing
+
+from ..themes.variables import ThemeVariables
+
+
+# Tiles are RGB32, TILE_COLUMNS x (WAVEFORM_ROWS + SPECTRUM_ROWS) pixels (~360 KB each).
+_TILE_BUDGET = 64 * 1024 * 1024
+
+_TileKey = Tuple[int, int]
+
+
+class SpectrogramView(QWidget):
+    # Time at the left edge in seconds and the zoom in milliseconds per pixel.
+    view_changed = Signal(float, float)
+    # Emitted from the worker thread; delivered on the GUI thread.
+    _tile_ready = Signal(object, object, object)
+
+    def __init__(self, parent: Optional[QWidget] = None, budget: int = _TILE_BUDGET) -> None:
+        super().__init__(parent)
+        self.samples: Optional[np.ndarray] = None
+        self.sample_rate = 48000
+        self.start_sec = 0.0
+        self.level = spectrogram.MAX_LEVEL
+        # Left edge of the view, in pixel columns at the current level.
+        self.offset = 0
+        self.budget = budget
+        self._generation = 0
+        self._tiles: "OrderedDict[_TileKey, QImage]" = OrderedDict()
+        self._pending: Dict[_TileKey, Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="view-tiles")
+        self._color_table = [qRgb(*color) for color in spectrogram.PALETTE.tolist()]
+        self._drag: Optional[Tuple[int, int]] = None
+        self._tile_ready.connect(self._on_tile_ready)
+        self.setMinimumHeight(120)
+        memory.register("view_tiles", self)
+
+    def memory_usage(self) -> Dict[str, int]:
+        return {"tiles": sum(image.sizeInBytes() for image in self._tiles.values())}
+
+    def set_samples(self, samples: Optional[np.ndarray], sample_rate: int, start_sec: float = 0.0) -> None:
+        """Show ``(frames, channels)`` samples, zoomed to fit; drops every cached tile."""
+        self._generation += 1
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        self._tiles.clear()
+        self.samples = samples if samples is not None and len(samples) else None
+        self.sample_rate = sample_rate
+        self.start_sec = start_sec
+        if self.samples is not None:
+            self.level = spectrogram.fit_level(len(self.samples), max(1, self.width()))
+        self._set_offset(0)
+        self.update()
+
+    def _columns(self) -> int:
+        return -(-len(self.samples) >> self.level) if self.samples is not None else 0
+
+    def _visible(self) -> range:
+        if self.samples is None:
+            return range(0)
+        count = spectrogram.tile_count(len(self.samples), self.level)
+        first = self.offset // spectrogram.TILE_COLUMNS
+        last = (self.offset + max(1, self.width()) - 1) // spectrogram.TILE_COLUMNS
+        return range(first, min(last, count - 1) + 1)
+
+    def _tile_rect(self, index: int) -> QRect:
+        x = index * spectrogram.TILE_COLUMNS - self.offset
+        return QRect(x, 0, spectrogram.TILE_COLUMNS, self.height())
+
+    def _schedule(self) -> None:
+        """Queue the visible tiles that are missing and cancel the ones scrolled away."""
+        visible = {(self.level, index) for index in self._visible()}
+        for key in [key for key in self._pending if key not in visible]:
+            if self._pending[key].cancel():
+                del self._pending[key]
+        for key in sorted(visible):
+            if key not in self._tiles and key not in self._pending:
+                self._pending[key] = self._executor.submit(
+                    self._compute, self._generation, key, self.samples
+                )
+
+    def _compute(self, generation: int, key: _TileKey, samples: np.ndarray) -> None:
+        level, index = key
+        with tracing.span("view.tile", level=level, index=index):
+            pixels = spectrogram.render_tile(samples, level, index)
+            height, width = pixels.shape
+            image = QImage(pixels.data, width, height, width, QImage.Format.Format_Indexed8)
+            image.setColorTable(self._color_table)
+            # Converted here so the GUI thread blits without conversion; owns its pixels.
+            image = image.convertToFormat(QImage.Format.Format_RGB32)
+        try:
+            self._tile_ready.emit(generation, key, image)
+        except RuntimeError:
+            # The view was deleted while the tile was computed.
+            pass
+
+    def _on_tile_ready(self, generation: int, key: _TileKey, image: QImage) -> None:
+        if generation != self._generation:
+            return
+        self._pending.pop(key, None)
+        self._tiles[key] = image
+        # Every tile has the same size.
+        while len(self._tiles) > 1 and len(self._tiles) * image.sizeInBytes() > self.budget:
+            self._tiles.popitem(last=False)
+        if key[0] == self.level:
+            self.update(self._tile_rect(key[1]))
+
+    def paintEvent(self, event) -> None:
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), ThemeVariables.SURFACE_COLOR)
+        if self.samples is None:
+            painter.setPen(ThemeVariables.TEXT_MUTED)
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "Play the timeline or press the pad to inspect a render")
+            return
+
+        for index in self._visible():
+            target = self._tile_rect(index)
+            if not target.intersects(event.rect()):
+                continue
+            image = self._tiles.get((self.level, index))
+            if image is not None:
+                self._tiles.move_to_end((self.level, index))
+                painter.drawImage(target, image)
+
+    def resizeEvent(self, event: QResizeEvent) -> None:
+        super().resizeEvent(event)
+        self._schedule()
+
+    def wheelEvent(self, event: QWheelEvent) -> None:
+        if self.samples is None:
+            return
+        step = -1 if event.angleDelta().y() > 0 else 1
+        level = int(np.clip(self.level + step, spectrogram.MIN_LEVEL, spectrogram.MAX_LEVEL))
+        if level == self.level:
+            return
+        # Keep the frame under the cursor in place.
+        x = int(event.position().x())
+        frame = (self.offset + x) << self.level
+        self.level = level
+        self._set_offset((frame >> level) - x)
+        self.update()
+
+    def mousePressEvent(self, event: QMouseEvent) -> None:
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._drag = (int(event.position().x()), self.offset)
+
+    def mouseMoveEvent(self, event: QMouseEvent) -> None:
+        if self._drag is None:
+            return
+        start_x, start_offset = self._drag
+        previous = self.offset
+        self._set_offset(start_offset - (int(event.position().x()) - start_x))
+        # Shift what is already drawn; only the uncovered strip is repainted.
+        self.scroll(previous - self.offset, 0)
+
+    def mouseReleaseEvent(self, event: QMouseEvent) -> None:
+        self._drag = None
+
+    def _set_offset(self, offset: int) -> None:
+        self.offset = int(np.clip(offset, 0, max(0, self._columns() - self.width())))
+        self._schedule()
+        self.view_changed.emit(
+            self.start_sec + (self.offset << self.level) / self.sample_rate,
+            (1 << self.level) / self.sample_rate * 1000.0,
+        )
+
 
 class ViewPanel(QFrame):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setObjectName("ViewPanel")
-        
+
         layout = QVBoxLayout(self)
-        
-        label = QLabel("View")
-        label.setStyleSheet("font-size: 18px; font-weight: bold; color: #1a1a1a;")
-        label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(label)
+
+        self.status = QLabel()
+        self.status.setStyleSheet(f"color: {ThemeVariables.COLOR_TEXT_MUTED};")
+        layout.addWidget(self.status)
+
+        self.inspector = SpectrogramView(self)
+        self.inspector.view_changed.connect(self._on_view_changed)
+        layout.addWidget(self.inspector, 1)
+
+    def show_samples(self, samples: Optional[np.ndarray], sample_rate: int, start_sec: float = 0.0) -> None:
+        self.inspector.set_samples(samples, sample_rate, start_sec)
+
+    def _on_view_changed(self, seconds: float, ms_per_px: float) -> None:
+        self.status.setText(f"{seconds:.2f} s    {ms_per_px:.2f} ms/px")
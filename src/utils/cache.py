@@ -0,0 +1,26 @@
+"""
+On-disk cache location.
+
+Defaults to the platform cache directory and can be overridden with the
+``FOOTSTEP_CACHE_DIR`` environment variable.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+CACHE_ENV = "FOOTSTEP_CACHE_DIR"
+
+
+def cache_dir() -> Path:
+    """Return the cache directory, creating it if needed."""
+    if os.environ.get(CACHE_ENV):
+        path = Path(os.environ[CACHE_ENV])
+    elif sys.platform == "win32":
+        path = Path(os.environ.get("LOCALAPPDATA", Path.home())) / "footstep-editor" / "cache"
+    elif sys.platform == "darwin":
+        path = Path.home() / "Library" / "Caches" / "footstep-editor"
+    else:
+        path = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "footstep-editor"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -0,0 +1,33 @@
+"""
+Lightweight callback events.
+
+Qt-free stand-in for ``Signal`` so that core objects can notify listeners
+without depending on PySide6.
+"""
+
+import threading
+from typing import Any, Callable, List
+
+
+class Event:
+    def __init__(self) -> None:
+        self._callbacks: List[Callable[..., Any]] = []
+        self._lock = threading.Lock()
+
+    def connect(self, callback: Callable[..., Any]) -> None:
+        """Register a callback invoked on every emit."""
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def disconnect(self, callback: Callable[..., Any]) -> None:
+        """Remove a previously connected callback."""
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def emit(self, *args: Any) -> None:
+        """Call every connected callback with the given arguments."""
+        with self._lock:
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            callback(*args)
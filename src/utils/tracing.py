@@ -0,0 +1,140 @@
+"""
+Hot-path tracing.
+
+Spans are recorded only when tracing is enabled, either with the
+``FOOTSTEP_TRACE=<path.json>`` environment variable or by calling
+:func:`enable`. The trace is written in Chrome trace-event format at exit
+(open it in ``chrome://tracing`` or Perfetto). When disabled, :func:`span`
+returns a shared no-op context manager.
+
+Click-to-sound latencies are always kept in a small rolling log so the
+editor can display them (see ``FOOTSTEP_TRACE_OVERLAY``).
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+
+TRACE_ENV = "FOOTSTEP_TRACE"
+OVERLAY_ENV = "FOOTSTEP_TRACE_OVERLAY"
+
+_enabled = False
+_path: Optional[Path] = None
+_exit_hook = False
+_events: List[Dict[str, Any]] = []
+_origin = time.perf_counter()
+_pid = os.getpid()
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name: str, args: Dict[str, Any]) -> None:
+        self.name = name
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        complete(self.name, self.start, time.perf_counter(), **self.args)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable(path: Optional[Path] = None) -> None:
+    """Start recording spans; they are written to ``path`` at exit if given."""
+    global _enabled, _path, _exit_hook
+    _enabled = True
+    _path = Path(path) if path else None
+    if _path and not _exit_hook:
+        atexit.register(_write_at_exit)
+        _exit_hook = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def span(name: str, **args: Any):
+    """Context manager timing a block as a trace event."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def complete(name: str, start: float, end: float, **args: Any) -> None:
+    """Record a span from two ``time.perf_counter()`` timestamps."""
+    if not _enabled:
+        return
+    _events.append({
+        "name": name,
+        "ph": "X",
+        "ts": (start - _origin) * 1e6,
+        "dur": (end - start) * 1e6,
+        "pid": _pid,
+        "tid": threading.get_ident(),
+        "args": args,
+    })
+
+
+def events() -> List[Dict[str, Any]]:
+    return list(_events)
+
+
+def write(path: Optional[Path] = None) -> Optional[Path]:
+    """Write the recorded events as Chrome trace JSON."""
+    path = Path(path) if path else _path
+    if path is None:
+        return None
+    path.write_text(json.dumps({"traceEvents": events(), "displayTimeUnit": "ms"}))
+    return path
+
+
+class LatencyLog:
+    """Rolling log of the last click-to-sound latencies."""
+
+    def __init__(self, size: int = 20) -> None:
+        self._values: Deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        self._values.append(seconds)
+
+    def values(self) -> List[float]:
+        return list(self._values)
+
+
+click_to_sound = LatencyLog()
+
+
+def _write_at_exit() -> None:
+    if _events:
+        write()
+
+
+if os.environ.get(TRACE_ENV):
+    enable(Path(os.environ[TRACE_ENV]))
@@ -0,0 +1,10 @@
+"""
+Performance benchmarks.
+
+Run with ``python -m tests.benchmarks``. Results are compared against the
+JSON baseline next to this file and any case slower than the tolerance
+allows fails the run. Use ``--update`` to record a new baseline.
+
+``python -m tests.benchmarks.latency`` reports trigger-to-output latency
+percentiles on miniaudio's null backend.
+"""
@@ -0,0 +1,66 @@
+"""Run the benchmark suite: ``python -m tests.benchmarks [--update]``."""
+
+import argparse
+import platform
+import sys
+from pathlib import Path
+
+from tests.benchmarks import cases  # noqa: F401  (registers the benchmark groups)
+from tests.benchmarks.harness import Result, Skip, compare, groups, load_baseline, measure, save_baseline
+
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update", action="store_true", help="Record the results as the new baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="Allowed slowdown of the median before a case counts as regressed (0.5 = 50%%)",
+    )
+    parser.add_argument("-k", "--filter", default="", help="Only run cases whose name contains this")
+    args = parser.parse_args()
+
+    results = []
+    for group in groups():
+        try:
+            for case in group():
+                if args.filter not in case.name:
+                    continue
+                result = measure(case)
+                results.append(result)
+                print(f"{result.name:<45} median {result.median * 1000:9.3f} ms   min {result.min * 1000:9.3f} ms")
+        except Skip as e:
+            results.append(Result(group.__name__, 0.0, 0.0, 0, skipped=str(e)))
+            print(f"{group.__name__:<45} skipped: {e}")
+
+    if args.update:
+        metadata = {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system()}
+        save_baseline(args.baseline, results, metadata)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    comparisons = compare(results, baseline, args.tolerance)
+    regressions = [c for c in comparisons if c.regressed]
+
+    print()
+    for c in comparisons:
+        if c.baseline is None:
+            print(f"{c.name:<45} new (no baseline)")
+        elif c.ratio is not None:
+            flag = "REGRESSED" if c.regressed else "ok"
+            print(f"{c.name:<45} {c.ratio:6.2f}x baseline   {flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed beyond {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
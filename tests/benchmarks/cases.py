@@ -0,0 +1,216 @@
+"""Benchmark cases for the editor hot paths."""
+
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+from pydub.utils import which
+
+from src.core import spectrogram
+from src.core.asset_index import AssetIndex
+from src.core.automation import TrackAutomation
+from src.core.blend import BlendLayout, materials
+from src.core.encoder import encode_pcm, has_native_codecs
+from src.core.loop import LoopBuffer
+from src.core.mixer import Mixer
+from src.core.render import Renderer, segment_to_array
+from src.core.sample_bank import FOOTSTEPS_DIR, SampleBank, decode_file
+from src.core.timeline_export import export_timeline
+from src.core.variation import PolyphaseResampler, VariationSettings
+from src.core.voice_mixer import VoiceMixer
+from tests.benchmarks.harness import Case, Skip, benchmark
+
+
+VOICE_COUNTS = (1, 4, 16, 32)
+ZOOM_LEVELS = (1.0, 15.0, 90.0, 150.0)
+KEY_COUNTS = (10, 100, 1000)
+TIMELINE_TRACKS = 8
+
+_bank = None
+
+
+def _sample_bank() -> SampleBank:
+    global _bank
+    if _bank is None:
+        _bank = SampleBank()
+        _bank.load()
+    return _bank
+
+
+def _mixed_segment(voices: int):
+    bank = _sample_bank()
+    names = bank.materials
+    mixer = Mixer()
+    for i in range(voices):
+        material = names[i % len(names)]
+        idx = 1 + i % bank.variations(material)
+        mixer.add_segment(bank.segment(material, idx), -6.0)
+    return mixer
+
+
+@benchmark
+def asset_loading() -> Iterator[Case]:
+    assets = _sample_bank().assets
+    path = assets.path("floor", 1)
+    yield Case("asset_decode", lambda: decode_file(path), rounds=50)
+    yield Case("asset_index_scan[cold]", lambda: AssetIndex([FOOTSTEPS_DIR]).scan(), rounds=5)
+    yield Case("asset_index_scan[unchanged]", assets.scan, rounds=20)
+    yield Case("sample_bank_load[pad]", lambda: SampleBank(assets=assets).load(materials()), rounds=5)
+    yield Case("sample_bank_load[all]", lambda: SampleBank(assets=assets).load(), rounds=5)
+
+
+@benchmark
+def blend() -> Iterator[Case]:
+    for count in (4, 16):
+        names = [f"material{i}" for i in range(count)]
+        layout = BlendLayout.polygon(names)
+        yield Case(f"blend_gains[materials={count}]", lambda l=layout: l.gains(0.37, 0.61), rounds=1000)
+
+
+@benchmark
+def automation() -> Iterator[Case]:
+    times = np.linspace(0.0, 600.0, 60_000)
+    values = 0.5 + 0.4 * np.sin(times / 7.0)
+    yield Case("automation_record[points=60000]", lambda: TrackAutomation().record("x", times, values), rounds=10)
+
+    recorded = TrackAutomation()
+    recorded.record("x", times, values)
+    for keys in KEY_COUNTS:
+        at = np.linspace(0.0, 600.0, keys)
+        yield Case(f"automation_evaluate[keys={keys}]", lambda at=at: recorded.evaluate(at), rounds=1000)
+
+
+@benchmark
+def mixing() -> Iterator[Case]:
+    for voices in VOICE_COUNTS:
+        mixer = _mixed_segment(voices)
+        yield Case(f"mixer_concat[voices={voices}]", lambda m=mixer: m.concat(format="wav"))
+
+
+@benchmark
+def variation() -> Iterator[Case]:
+    samples = _sample_bank().samples("dirt", 1)
+    resampler = PolyphaseResampler()
+    yield Case("resample[pitch=+1st]", lambda: resampler.resample(samples, 2 ** (1 / 12)))
+
+    for layers in (1, 8):
+        renderer = Renderer(_sample_bank(), seed=0, variation=VariationSettings(layers=layers))
+        voices = layers * len(materials())
+        yield Case(f"variation_render[voices={voices}]", lambda r=renderer: r.render(0.5, 0.5))
+
+
+@benchmark
+def loop() -> Iterator[Case]:
+    renderer = Renderer(_sample_bank(), seed=0)
+    tracks = [{"keys": np.arange(0.0, 2.0, 0.25).tolist()} for _ in range(2)]
+
+    def full():
+        LoopBuffer(renderer, 0.0, 2.0).update(tracks)
+
+    yield Case("loop_render[keys=16]", full, rounds=10)
+
+    buffer = LoopBuffer(renderer, 0.0, 2.0)
+    buffer.update(tracks)
+    edits = iter(range(1_000_000))
+
+    def edit():
+        tracks[0]["keys"][3] = 0.75 + (next(edits) % 50) * 0.001
+        buffer.update(tracks)
+
+    yield Case("loop_update[edit=1]", edit, rounds=20)
+
+    mixer = VoiceMixer(dtype=np.float32)
+    mixer.set_loop(buffer.samples)
+    callback = mixer.callback()
+    yield Case("loop_callback[frames=512]", lambda: callback.send(512), rounds=1000)
+
+
+@benchmark
+def export() -> Iterator[Case]:
+    samples = segment_to_array(_mixed_segment(4).mix())
+    yield Case("export[wav]", lambda: encode_pcm(samples, 44100, "wav"))
+    if has_native_codecs() or which("ffmpeg"):
+        yield Case("export[ogg]", lambda: encode_pcm(samples, 44100, "ogg"), rounds=10)
+        yield Case("export[flac]", lambda: encode_pcm(samples, 44100, "flac"), rounds=10)
+
+    renderer = Renderer(_sample_bank(), seed=0)
+    tracks = [{"keys": np.arange(0.0, 4.0, 0.5).tolist()} for _ in range(TIMELINE_TRACKS)]
+    path = Path(tempfile.gettempdir()) / "footstep-bench-timeline.wav"
+    yield Case(
+        "timeline_export[keys=64]",
+        lambda: export_timeline(renderer, tracks, path, seed=0, workers=1, chunk_sec=1.0),
+        rounds=5,
+    )
+
+
+@benchmark
+def inspector() -> Iterator[Case]:
+    samples = np.tile(segment_to_array(_mixed_segment(4).mix()).astype(np.float32) / 32768.0, (600, 1))
+    for level in (spectrogram.MIN_LEVEL, 8, spectrogram.MAX_LEVEL):
+        yield Case(f"view_tile[level={level}]", lambda level=level: spectrogram.render_tile(samples, level, 0), rounds=20)
+
+
+@benchmark
+def timeline() -> Iterator[Case]:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+
+    from src.ui.widgets.timeline_panel import TimelineView
+
+    app = QApplication.instance() or QApplication([])
+    view = TimelineView()
+    view.resize(1600, 400)
+
+    for keys in KEY_COUNTS:
+        times = np.linspace(0.0, view.file_duration_sec, keys).tolist()
+        for zoom in ZOOM_LEVELS:
+
+            def setup(zoom=zoom, times=times):
+                view.px_per_sec = zoom
+                view.tracks = [{"keys": list(times)} for _ in range(TIMELINE_TRACKS)]
+
+            yield Case(f"timeline_build[zoom={zoom:g},keys={keys}]", view.build_timeline, setup, rounds=10)
+
+    width = view.size().width()
+    for zoom in ZOOM_LEVELS:
+
+        def setup(zoom=zoom):
+            view.px_per_sec = zoom
+            view.scene.clear()
+
+        yield Case(f"timeline_draw_ruler[zoom={zoom:g}]", lambda: view.draw_ruler(width), setup)
+
+    app.processEvents()
+
+
+@benchmark
+def playback() -> Iterator[Case]:
+    import miniaudio
+
+    from src.core.audio_engine import AudioEngine
+
+    try:
+        with miniaudio.PlaybackDevice(backends=[miniaudio.Backend.NULL]):
+            pass
+    except miniaudio.MiniaudioError as e:
+        raise Skip(f"miniaudio null backend unavailable: {e}")
+
+    engine = AudioEngine(backends=[miniaudio.Backend.NULL])
+    stream = _mixed_segment(4).concat(format="wav").getvalue()
+    stopped = threading.Event()
+    stopped.set()
+    engine.playback_stopped.connect(stopped.set)
+
+    def wait_idle():
+        stopped.wait(5.0)
+        stopped.clear()
+
+    def play_to_end():
+        engine.play(stream)
+        stopped.wait(5.0)
+
+    yield Case("engine_play[call]", lambda: engine.play(stream), setup=wait_idle, rounds=10)
+    yield Case("engine_play[to_end]", play_to_end, setup=wait_idle, rounds=10)
@@ -0,0 +1,101 @@
+"""Benchmark registry, timing and baseline comparison."""
+
+import json
+import statistics
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+@dataclass
+class Case:
+    name: str
+    func: Callable[[], Any]
+    setup: Optional[Callable[[], Any]] = None
+    rounds: int = 20
+    warmup: int = 2
+
+
+@dataclass
+class Result:
+    name: str
+    median: float
+    min: float
+    rounds: int
+    skipped: Optional[str] = None
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"median": self.median, "min": self.min, "rounds": self.rounds}
+
+
+@dataclass
+class Comparison:
+    name: str
+    current: float
+    baseline: Optional[float]
+    ratio: Optional[float] = None
+    regressed: bool = False
+
+
+class Skip(Exception):
+    """Raised by a benchmark group when it cannot run in this environment."""
+
+
+_GROUPS: List[Callable[[], Iterator[Case]]] = []
+
+
+def benchmark(group: Callable[[], Iterator[Case]]) -> Callable[[], Iterator[Case]]:
+    """Register a generator of benchmark cases."""
+    _GROUPS.append(group)
+    return group
+
+
+def groups() -> List[Callable[[], Iterator[Case]]]:
+    return list(_GROUPS)
+
+
+def measure(case: Case) -> Result:
+    """Time ``case.func`` over several rounds, running ``case.setup`` untimed before each."""
+    timings = []
+    for i in range(case.warmup + case.rounds):
+        if case.setup:
+            case.setup()
+        start = time.perf_counter()
+        case.func()
+        elapsed = time.perf_counter() - start
+        if i >= case.warmup:
+            timings.append(elapsed)
+    return Result(case.name, statistics.median(timings), min(timings), case.rounds)
+
+
+def load_baseline(path: Path) -> Dict[str, Dict[str, Any]]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text()).get("results", {})
+
+
+def save_baseline(path: Path, results: List[Result], metadata: Dict[str, Any]) -> None:
+    data = {
+        "metadata": metadata,
+        "results": {r.name: r.to_json() for r in results if not r.skipped},
+    }
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+
+
+def compare(
+    results: List[Result], baseline: Dict[str, Dict[str, Any]], tolerance: float
+) -> List[Comparison]:
+    """Compare medians; a case regresses when slower than ``baseline * (1 + tolerance)``."""
+    comparisons = []
+    for result in results:
+        if result.skipped:
+            continue
+        reference = baseline.get(result.name)
+        if reference is None:
+            comparisons.append(Comparison(result.name, result.median, None))
+            continue
+        ratio = result.median / reference["median"] if reference["median"] > 0 else None
+        regressed = ratio is not None and ratio > 1.0 + tolerance
+        comparisons.append(Comparison(result.name, result.median, reference["median"], ratio, regressed))
+    return comparisons
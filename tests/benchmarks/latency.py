@@ -0,0 +1,134 @@
+"""
+Trigger-to-output latency harness.
+
+Sends synthetic MixPad presses through ``PropertiesPanel`` (or straight to
+the renderer and ``AudioEngine`` with ``--target engine``) with the output
+device on miniaudio's null backend, so it runs on machines without a sound
+card. Latency runs from the press to the first non-silent frame handed to
+the device callback, and is reported as p50/p95/p99 per buffer size and
+voice count::
+
+    python -m tests.benchmarks.latency [--buffers 10 50 200] [--voices 4 16] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import miniaudio
+import numpy as np
+
+from src.core.audio_engine import AudioEngine
+from src.core.blend import default_layout
+from src.core.output_device import DeviceSettings
+from src.core.render import Renderer
+from src.core.sample_bank import SampleBank
+from src.core.variation import VariationSettings
+
+
+BUFFER_SIZES = (10, 25, 50, 100, 200)
+VOICE_COUNTS = (4, 16, 32)
+PERCENTILES = (50, 95, 99)
+_TIMEOUT_SEC = 2.0
+
+
+def _press_target(target: str, renderer: Renderer, engine: AudioEngine) -> Callable[[float, float], None]:
+    """Return a function performing one press at a pad position."""
+    if target == "engine":
+
+        def press(x: float, y: float) -> None:
+            triggered_at = time.perf_counter()
+            engine.play(renderer.render_stream(x, y, format="wav").getvalue(), triggered_at=triggered_at)
+
+        return press
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+
+    from src.ui.widgets.properties_panel import PropertiesPanel
+
+    app = QApplication.instance() or QApplication([])
+    app.renderer = renderer
+    app.audio_engine = engine
+    app.blend_layout = renderer.layout
+    panel = PropertiesPanel()
+
+    def press(x: float, y: float) -> None:
+        panel.mix_pad.pressed.emit(x, y)
+
+    return press
+
+
+def measure(
+    bank: SampleBank, buffer_msec: int, voices: int, presses: int, target: str, seed: int = 0
+) -> List[float]:
+    """Latencies in seconds of ``presses`` synthetic presses."""
+    layout = default_layout()
+    layers = max(1, voices // len(layout))
+    renderer = Renderer(bank, seed=seed, variation=VariationSettings(layers=layers), layout=layout)
+    settings = DeviceSettings(backend="null", buffersize_msec=buffer_msec)
+    engine = AudioEngine(format=bank.format, settings=settings)
+
+    latencies: List[float] = []
+    heard = threading.Event()
+
+    def on_audible(latency: float) -> None:
+        latencies.append(latency)
+        heard.set()
+
+    engine.audible.connect(on_audible)
+    press = _press_target(target, renderer, engine)
+    rng = random.Random(seed)
+    for _ in range(presses):
+        heard.clear()
+        press(rng.random(), rng.random())
+        heard.wait(_TIMEOUT_SEC)
+    engine.close()
+    return latencies
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks.latency")
+    parser.add_argument("--buffers", type=int, nargs="+", default=BUFFER_SIZES, help="Device buffer sizes (ms)")
+    parser.add_argument("--voices", type=int, nargs="+", default=VOICE_COUNTS)
+    parser.add_argument("--presses", type=int, default=30)
+    parser.add_argument("--target", choices=("panel", "engine"), default="panel")
+    parser.add_argument("--json", type=Path, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    try:
+        with miniaudio.PlaybackDevice(backends=[miniaudio.Backend.NULL]):
+            pass
+    except miniaudio.MiniaudioError as e:
+        print(f"miniaudio null backend unavailable: {e}")
+        return 1
+
+    bank = SampleBank()
+    bank.load(default_layout().materials)
+
+    results: Dict[str, Dict[str, float]] = {}
+    header = "  ".join(f"p{p:<6}" for p in PERCENTILES)
+    print(f"{'case':<28} {header}  lost")
+    for buffer_msec in args.buffers:
+        for voices in args.voices:
+            latencies = measure(bank, buffer_msec, voices, args.presses, args.target)
+            name = f"buffer={buffer_msec}ms,voices={voices}"
+            row = {f"p{p}": float(np.percentile(latencies, p)) * 1000 for p in PERCENTILES} if latencies else {}
+            row["lost"] = args.presses - len(latencies)
+            results[name] = row
+            cells = "  ".join(f"{row.get(f'p{p}', float('nan')):6.1f}ms" for p in PERCENTILES)
+            print(f"{name:<28} {cells}  {row['lost']}")
+
+    if args.json:
+        args.json.write_text(json.dumps({"target": args.target, "presses": args.presses, "results": results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
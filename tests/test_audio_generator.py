@@ -1 +1,373 @@
 """Audio generator tests."""
+
+import io
+import json
+import random
+import shutil
+import wave
+from pathlib import Path
+
+import miniaudio
+import numpy as np
+import pytest
+import soundfile
+
+from src.core import spectrogram
+from src.core.analysis import AnalysisIndex, AssetAnalysis, analyze_batch, build_index
+from src.core.asset_index import open_library
+from src.core.automation import TOLERANCES, TrackAutomation
+from src.core.atlas import export_atlas, layout_items
+from src.core.blend import BlendLayout, materials
+from src.core.capture import PressBuffer
+from src.core.encoder import Encoder
+from src.core.loop import LoopBuffer
+from src.core.output_device import DeviceSettings, OutputDevice
+from src.core.render import Renderer
+from src.core.ring_buffer import SharedRingBuffer
+from src.core.sample_bank import FOOTSTEPS_DIR, SampleBank
+from src.core.timeline_export import export_timeline
+from src.core.variation import PolyphaseResampler, SamplePicker, pitch_ratio
+from src.core.voice_mixer import VoiceMixer, counters_dict
+
+
+def _renderer(seed=None):
+    bank = SampleBank()
+    bank.load(materials())
+    return Renderer(bank, seed=seed)
+
+
+def test_corner_gains_are_loudest_at_their_corner():
+    gains = dict(BlendLayout.corners().gains(0.0, 0.0))
+    assert gains["floor"] == 0.0
+    assert gains["gravel"] < gains["dirt"] < 0.0
+
+
+def test_blend_layouts_reach_every_material():
+    names = ["floor", "tiles", "wood", "carpet", "dirt", "gravel", "snow", "water"]
+    grid = BlendLayout.grid(names, columns=4)
+    assert grid.gains(1.0, 1.0) == [("water", 0.0)]
+    assert dict(grid.gains(0.5, 0.0)).keys() == {"tiles", "wood"}
+
+    polygon = BlendLayout.polygon(names)
+    for px, py, material in polygon.points:
+        gains = dict(polygon.gains(px, py))
+        assert max(gains, key=gains.get) == material
+
+    scattered = BlendLayout.scattered([(0.2, 0.2, "snow"), (0.8, 0.5, "carpet")])
+    assert dict(scattered.gains(0.2, 0.2)) == {"snow": 0.0}
+
+
+def test_sixteen_material_polygon_is_audible_everywhere():
+    bank = SampleBank()
+    bank.load()
+    names = [bank.materials[i % len(bank.materials)] for i in range(16)]
+    layout = BlendLayout.polygon(names)
+    for x in np.linspace(0.0, 1.0, 21):
+        for y in np.linspace(0.0, 1.0, 21):
+            assert layout.gains(x, y)
+
+    samples = Renderer(bank, seed=0, layout=layout).render_samples(0.5, 0.5)
+    assert len(samples) and np.abs(samples).max() > 0.0
+
+
+def test_render_variations_is_reproducible_with_seed():
+    renderer = _renderer()
+    first = renderer.render_variations(0.3, 0.6, 4, seed=7)
+    second = renderer.render_variations(0.3, 0.6, 4, seed=7)
+    assert len(first) == 4
+    for a, b in zip(first, second):
+        assert a.shape[1] == 2
+        assert np.array_equal(a, b)
+
+
+def test_sample_bank_evicts_least_recently_used_material():
+    bank = SampleBank(precision="float32")
+    bank.load(["floor"])
+    budget = bank.resident_bytes() + 1
+    bank = SampleBank(precision="float32", memory_budget=budget)
+    bank.load(["floor", "dirt"])
+    assert set(bank.memory_usage()) == {"dirt"}
+    assert bank.segment("floor", 1).frame_rate > 0
+    assert "floor" in bank.memory_usage()
+
+
+def test_asset_index_rescans_only_changed_files(tmp_path, monkeypatch):
+    library = tmp_path / "library"
+    (library / "oak").mkdir(parents=True)
+    for idx in (2, 10):
+        shutil.copy(FOOTSTEPS_DIR / "wood" / f"Steps_wood-{idx:03d}.ogg", library / "oak" / f"oak {idx}.ogg")
+    shutil.copy(FOOTSTEPS_DIR / "snow" / "Steps_snow-001.ogg", library / "Steps_ice-1.ogg")
+
+    index = open_library([library], tmp_path / "assets.json")
+    assert index.materials() == ["ice", "oak"]
+    assert [Path(e.path).name for e in index.variations("oak")] == ["oak 2.ogg", "oak 10.ogg"]
+    entry = index.get("oak", 1)
+    assert entry.sample_rate > 0 and entry.channels > 0 and entry.duration_sec > 0
+
+    probed = []
+    monkeypatch.setattr("src.core.asset_index.content_hash", lambda path: probed.append(path.name) or "new")
+    index = open_library([library], tmp_path / "assets.json")
+    assert probed == [] and index.get("oak", 1).content_hash == entry.content_hash
+
+    shutil.copy(FOOTSTEPS_DIR / "wood" / "Steps_wood-001.ogg", library / "oak" / "oak 1.ogg")
+    assert index.refresh([library / "oak"]) == {"oak"}
+    assert probed == ["oak 1.ogg"]
+    assert [e.variation for e in index.variations("oak")] == [1, 2, 3]
+
+    bank = SampleBank(assets=index)
+    bank.load(["oak"])
+    assert bank.variations("oak") == 3
+    (library / "oak" / "oak 10.ogg").unlink()
+    bank.reload(index.refresh([library / "oak"]))
+    assert bank.variations("oak") == 2
+
+
+def test_sample_picker_never_repeats_last_pick():
+    picker = SamplePicker()
+    rng = random.Random(3)
+    picks = [picker.pick("floor", 3, rng) for _ in range(200)]
+    assert all(a != b for a, b in zip(picks, picks[1:]))
+
+
+def test_resampler_shifts_pitch():
+    rate = 44100
+    tone = np.sin(2 * np.pi * 440 * np.arange(rate // 2) / rate).astype(np.float32)[:, None]
+    shifted = PolyphaseResampler().resample(tone, pitch_ratio(12))[:, 0]
+    spectrum = np.abs(np.fft.rfft(shifted * np.hanning(len(shifted))))
+    assert abs(np.argmax(spectrum) * rate / len(shifted) - 880) < 5
+
+
+def test_analysis_measures_loudness_and_onset():
+    rate = 48000
+    t = np.arange(rate) / rate
+    tone = np.sin(2 * np.pi * 997 * t).astype(np.float32)
+    tone[:rate // 10] = 0.0
+    (entry,) = analyze_batch([np.stack([tone, tone], axis=1)], rate)
+    assert abs(entry.peak_db) < 0.1
+    assert abs(entry.lufs - (-0.5)) < 0.3
+    assert abs(entry.onset_sec - 0.1) < 0.002
+
+
+def test_gain_match_reference_ignores_cached_assets_not_in_the_bank(tmp_path):
+    bank = SampleBank()
+    bank.load(["floor"])
+    reference = build_index(bank).reference_lufs()
+
+    cache = tmp_path / "analysis.json"
+    AnalysisIndex({"gone/1": AssetAnalysis(0.0, 30.0, 0.0, 0.0), "gone/2": AssetAnalysis(0.0, 30.0, 0.0, 0.0)}).save(cache)
+    index = build_index(bank, cache)
+    assert index.reference_lufs() == reference
+    assert index.get("gone", 1) is None
+    assert AnalysisIndex.load(cache).get("gone", 1) is not None
+
+
+def test_atlas_export_aligns_variations(tmp_path, monkeypatch):
+    renderer = _renderer()
+    items = layout_items(renderer.layout, seeds=2)
+    entries = export_atlas(renderer, items, tmp_path / "atlas.wav", align=512)
+    index = json.loads((tmp_path / "atlas.json").read_text())
+
+    assert [e["name"] for e in index["entries"]] == [item.name for item in items]
+    assert all(e.offset % 512 == 0 for e in entries)
+    assert all(a.offset + a.frames <= b.offset for a, b in zip(entries, entries[1:]))
+    with wave.open(str(tmp_path / "atlas.wav")) as f:
+        assert f.getnframes() == entries[-1].offset + entries[-1].frames
+
+    # Pool workers render with the caller's gain matching and onset settings.
+    monkeypatch.setattr("src.core.atlas._POOL_THRESHOLD", 0)
+    build_index(renderer.bank)
+    renderer.gain_match = False
+    items = layout_items(renderer.layout, seeds=10)
+    export_atlas(renderer, items, tmp_path / "serial.wav", workers=1)
+    export_atlas(renderer, items, tmp_path / "pooled.wav", workers=2)
+    assert (tmp_path / "serial.wav").read_bytes() == (tmp_path / "pooled.wav").read_bytes()
+
+    # A bank that evicted materials under its budget is packed for the pool all the same.
+    budgeted = SampleBank(memory_budget=1)
+    budgeted.load(materials())
+    assert budgeted.evictions
+    export_atlas(Renderer(budgeted), items, tmp_path / "budgeted_serial.wav", workers=1)
+    export_atlas(Renderer(budgeted), items, tmp_path / "budgeted_pooled.wav", workers=2)
+    assert (tmp_path / "budgeted_serial.wav").read_bytes() == (tmp_path / "budgeted_pooled.wav").read_bytes()
+
+
+def test_encoder_round_trips_pcm_in_order():
+    rng = np.random.default_rng(0)
+    buffers = [rng.integers(-3000, 3000, size=(500 + i, 2), dtype=np.int16) for i in range(8)]
+    with Encoder(workers=3) as encoder:
+        encoded = list(encoder.map(buffers, 44100, "flac"))
+    for samples, data in zip(buffers, encoded):
+        decoded, rate = soundfile.read(io.BytesIO(data), dtype="int16")
+        assert rate == 44100
+        assert np.array_equal(decoded, samples)
+
+
+def test_shared_ring_buffer_wraps_around():
+    ring = SharedRingBuffer(8, 2)
+    reader = SharedRingBuffer(8, 2, name=ring.name)
+    try:
+        data = np.arange(24, dtype=np.float32).reshape(12, 2)
+        assert ring.write(data[:6]) == 6
+        assert np.array_equal(reader.read(4), data[:4])
+        assert ring.write(data[6:]) == 6
+        assert ring.free() == 0
+        assert np.array_equal(reader.read(16), data[4:])
+    finally:
+        reader.close()
+        ring.close()
+
+
+def test_output_device_keeps_previous_settings_when_reconfigure_fails(monkeypatch):
+    opened = []
+
+    def playback_device(**kwargs):
+        if kwargs["buffersize_msec"] == 13:
+            raise miniaudio.MiniaudioError("cannot open")
+        opened.append(kwargs["buffersize_msec"])
+        return real_device(**kwargs)
+
+    real_device = miniaudio.PlaybackDevice
+    monkeypatch.setattr(miniaudio, "PlaybackDevice", playback_device)
+    device = OutputDevice(settings=DeviceSettings(backend="null", buffersize_msec=50))
+    try:
+        device.start()
+        with pytest.raises(miniaudio.MiniaudioError):
+            device.configure(DeviceSettings(backend="null", buffersize_msec=13))
+        assert device.settings.buffersize_msec == 50
+        assert opened == [50, 50]
+        device.configure(DeviceSettings(backend="null", buffersize_msec=80))
+        assert opened[-1] == 80
+    finally:
+        device.close()
+
+
+def test_automation_thins_recorded_moves_and_evaluates_keys():
+    times = np.linspace(0.0, 10.0, 2001)
+    x = np.clip(times / 4.0 - 0.75, 0.0, 1.0) + 0.002 * np.sin(times * 40.0)
+    automation = TrackAutomation()
+    automation.record("x", times, x)
+    assert len(automation["x"]) < 50
+
+    restored = TrackAutomation.from_dict(json.loads(json.dumps(automation.to_dict())))
+    keys = np.linspace(0.0, 10.0, 97)
+    params = restored.evaluate(keys)
+    assert np.max(np.abs(params["x"] - np.interp(keys, times, x))) <= TOLERANCES["x"] + 1e-6
+    assert np.all(params["y"] == 0.5) and np.all(params["gain_db"] == 0.0)
+
+    renderer = _renderer(seed=3)
+    silent = TrackAutomation()
+    silent["gain_db"].set_point(0.0, -40.0)
+    loud = renderer.render_timeline([{"keys": [0.5, 1.5]}], 0.0, 2.0, seed=1)
+    quiet = renderer.render_timeline([{"keys": [0.5, 1.5], "automation": silent}], 0.0, 2.0, seed=1)
+    rate = renderer.bank.format.sample_rate
+    assert not loud[:int(0.5 * rate) - 1].any()
+    assert np.allclose(quiet, loud * 10 ** (-40.0 / 20.0), atol=1e-6)
+
+
+def test_presses_are_captured_in_order_and_voices_start_on_their_frame():
+    presses = PressBuffer(capacity=4)
+    for i in range(6):
+        presses.push(i * 0.01, 0.5, 0.5)
+        if i == 2:
+            assert np.allclose(presses.drain()[:, 0], [0.0, 0.01, 0.02])
+    assert presses.dropped == 0
+    assert np.allclose(presses.drain()[:, 0], [0.03, 0.04, 0.05])
+
+    # Large blocks keep the test well clear of the underrun threshold.
+    mixer = VoiceMixer(dtype=np.float32)
+    callback = mixer.callback()
+    blocks = [callback.send(4096)]
+    origin = counters_dict(mixer.counters)["clock_origin"]
+    start_frame = 2 * 4096 + 1234
+    mixer.add(np.ones((100, 2), dtype=np.float32), start_at=origin + start_frame / mixer.format.sample_rate)
+    blocks += [callback.send(4096) for _ in range(3)]
+    assert np.flatnonzero(np.concatenate(blocks)[:, 0])[0] == start_frame
+
+
+def test_voice_mixer_stop_keeps_what_is_queued_after_it():
+    mixer = VoiceMixer(dtype=np.float32)
+    callback = mixer.callback()
+    loop = np.full((64, 2), 0.25, dtype=np.float32)
+    idle = []
+    mixer.idle.connect(lambda: idle.append(True))
+    mixer.set_loop(loop)
+    mixer.add(np.ones((8, 2), dtype=np.float32))
+    callback.send(16)
+
+    mixer.stop()
+    mixer.set_loop(loop)
+    mixer.add(np.full((8, 2), 0.5, dtype=np.float32))
+    block = callback.send(16)
+    assert np.allclose(block[:8], 0.75) and np.allclose(block[8:], 0.25)
+    assert not idle
+
+    mixer.set_loop(loop)
+    mixer.stop()
+    assert not callback.send(16).any()
+    assert idle == [True]
+
+
+def test_loop_buffer_wraps_tails_and_updates_only_edited_steps():
+    renderer = _renderer()
+    tracks = [{"keys": [0.1, 0.5, 0.95]}, {"keys": [0.3]}]
+    loop = LoopBuffer(renderer, 0.0, 1.0)
+    assert loop.update(tracks) == 4
+    assert loop.update(tracks) == 0
+    # The step at 0.95 s rings on past the end of the loop, onto its start.
+    assert np.abs(loop.samples[:int(0.05 * loop.sample_rate)]).max() > 0
+
+    tracks[0]["keys"][1] = 0.6
+    assert loop.update(tracks) == 2
+    fresh = LoopBuffer(renderer, 0.0, 1.0)
+    fresh.update(tracks)
+    assert np.allclose(loop.samples, fresh.samples, atol=1e-5)
+
+
+def test_timeline_export_stitches_chunk_tails_the_same_for_any_worker_count(tmp_path, monkeypatch):
+    renderer = _renderer()
+    rate = renderer.bank.format.sample_rate
+    # A single key in the first chunk: its tail crosses many 10 ms chunks.
+    single = [{"keys": [0.004]}]
+    long_chunks = export_timeline(renderer, single, tmp_path / "long.wav", seed=5, chunk_sec=60.0)
+    short_chunks = export_timeline(renderer, single, tmp_path / "short.wav", seed=5, chunk_sec=0.01)
+    assert long_chunks == short_chunks > int(0.02 * rate)
+    assert (tmp_path / "long.wav").read_bytes() == (tmp_path / "short.wav").read_bytes()
+
+    monkeypatch.setattr("src.core.timeline_export._POOL_THRESHOLD", 0)
+    tracks = [{"keys": [0.0, 0.3, 0.61]}, {"keys": [0.2, 0.59, 2.0], "automation": TrackAutomation()}]
+    serial = export_timeline(renderer, tracks, tmp_path / "serial.wav", 0.1, 1.0, seed=7, workers=1, chunk_sec=0.25)
+    pooled = export_timeline(renderer, tracks, tmp_path / "pooled.wav", 0.1, 1.0, seed=7, workers=2, chunk_sec=0.25)
+    assert serial == pooled
+    assert (tmp_path / "serial.wav").read_bytes() == (tmp_path / "pooled.wav").read_bytes()
+    assert export_timeline(renderer, tracks, tmp_path / "empty.wav", 5.0, 6.0) == 0
+
+    # Materials evicted under the memory budget still reach the pool workers.
+    budgeted = SampleBank(memory_budget=1)
+    budgeted.load(materials())
+    assert budgeted.evictions
+    export_timeline(Renderer(budgeted), tracks, tmp_path / "budgeted_serial.wav", 0.1, 1.0, seed=7, workers=1)
+    export_timeline(Renderer(budgeted), tracks, tmp_path / "budgeted_pooled.wav", 0.1, 1.0, seed=7, workers=2)
+    assert (tmp_path / "budgeted_serial.wav").read_bytes() == (tmp_path / "budgeted_pooled.wav").read_bytes()
+
+
+def test_spectrogram_tiles_show_a_sine_in_its_bin_and_stay_blank_past_the_end():
+    rate = 48000
+    time = np.arange(rate) / rate
+    sine = (0.5 * np.sin(2 * np.pi * 3000 * time)).astype(np.float32)
+    samples = np.stack([sine, sine], axis=1)
+
+    level = spectrogram.fit_level(len(samples), 200)
+    assert (len(samples) >> level) <= 200 < (len(samples) >> (level - 1))
+    db = spectrogram.spectrum_columns(samples, level, 0)
+    # Columns whose window lies inside the signal.
+    inner = db[1:100]
+    assert np.all(np.argmax(inner, axis=1) == round(3000 / rate * spectrogram.FFT_SIZE))
+    assert np.allclose(inner.max(axis=1), 20 * np.log10(0.5), atol=0.1)
+
+    tile = spectrogram.render_tile(samples, level, 0)
+    assert tile.shape == (spectrogram.WAVEFORM_ROWS + spectrogram.SPECTRUM_ROWS, spectrogram.TILE_COLUMNS)
+    waveform = tile[:spectrogram.WAVEFORM_ROWS] == spectrogram.WAVEFORM_FOREGROUND
+    columns = -(-len(samples) >> level)
+    # Half scale covers the middle half of the strip.
+    assert abs(waveform[:, 0].sum() - spectrogram.WAVEFORM_ROWS // 2) <= 2
+    assert not waveform[:, columns:].any()
@@ -0,0 +1,42 @@
+"""Render service tests."""
+
+import threading
+
+import pytest
+
+from src.service.client import RenderClient
+from src.service.server import RenderService, create_server
+
+
+@pytest.fixture(scope="module")
+def client():
+    service = RenderService(workers=2, chunk_size=2)
+    service.start()
+    server = create_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield RenderClient(port=server.server_address[1])
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+def test_render_streams_requested_count_in_seed_order(client):
+    first = list(client.render(0.3, 0.4, count=5, seed=11, format="raw"))
+    second = list(client.render(0.3, 0.4, count=5, seed=11, format="raw"))
+    assert len(first) == 5
+    assert first == second
+
+
+def test_render_rejects_invalid_requests(client):
+    with pytest.raises(ValueError):
+        list(client.render(1.5, 0.0))
+    with pytest.raises(ValueError):
+        list(client.render(0.5, 0.5, materials=["floor", "lava", "wood", "gravel"]))
+
+
+def test_stats_report_latency(client):
+    list(client.render(0.5, 0.5, format="wav"))
+    stats = client.stats()
+    assert stats["completed"] >= 1
+    assert set(stats["latency_ms"]) == {"p50", "p95", "p99"}